@@ -12,6 +12,10 @@ setup(
         "requests==2.32.5",
         "singer-python==6.1.0",
         "backoff==2.2.1"],
+    extras_require={
+        "orjson": ["orjson>=3.8"],
+        "aiohttp": ["aiohttp>=3.9"],
+    },
     entry_points="""
         [console_scripts]
         tap-freshdesk=tap_freshdesk:main
@@ -1,7 +1,7 @@
 import sys
 import json
 import singer
-from tap_freshdesk.client import Client
+from tap_freshdesk.client import get_client
 from tap_freshdesk.discover import discover
 from tap_freshdesk.sync import sync
 
@@ -10,10 +10,10 @@ LOGGER = singer.get_logger()
 REQUIRED_CONFIG_KEYS = ["api_key", "domain", "start_date", "user_agent"]
 
 
-def do_discover():
+def do_discover(client):
 
     LOGGER.info("Starting discover")
-    catalog = discover()
+    catalog = discover(client)
     json.dump(catalog.to_dict(), sys.stdout, indent=2)
     LOGGER.info("Finished discover")
 
@@ -26,9 +26,9 @@ def main():
     if parsed_args.state:
         state = parsed_args.state
 
-    with Client(parsed_args.config) as client:
+    with get_client(parsed_args.config) as client:
         if parsed_args.discover:
-            do_discover()
+            do_discover(client)
         elif parsed_args.catalog:
             sync(
                 client=client,
@@ -0,0 +1,184 @@
+import asyncio
+import base64
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Mapping, Optional
+
+import backoff
+import requests
+from requests.structures import CaseInsensitiveDict
+from singer import get_logger, metrics
+
+from tap_freshdesk.client import Client, Page, get_next_url, raise_for_error, record_retry
+from tap_freshdesk.exceptions import freshdeskBackoffError
+from tap_freshdesk.telemetry import endpoint_template
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+LOGGER = get_logger()
+
+ASYNC_BACKOFF_EXCEPTIONS = (asyncio.TimeoutError, freshdeskBackoffError)
+if aiohttp is not None:
+    ASYNC_BACKOFF_EXCEPTIONS += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+
+class AsyncClient(Client):
+    """An aiohttp based client with the same `get()` contract as `Client`.
+    ~~~
+    Requests run on an event loop owned by a background thread, so callers
+    keep the blocking `get()` API while `submit()` lets them keep up to
+    `max_concurrent_requests` requests in flight. Responses go through the
+    same rate-limit pacing, error mapping and backoff as `Client`.
+    """
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        if aiohttp is None:
+            raise ImportError(
+                "`http_client: aiohttp` requires aiohttp, install it with "
+                "`pip install tap-freshdesk[aiohttp]`"
+            )
+        super().__init__(config)
+        self._aio_session = None
+        self._semaphore = None
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="freshdesk-aiohttp", daemon=True
+        )
+        self._loop_thread.start()
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        # Workers may still be waiting on requests running on the loop
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._aio_session is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._aio_session.close(), self._loop
+            ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        super().__exit__(exception_type, exception_value, traceback)
+
+    def send_get(
+        self,
+        endpoint: str,
+        params: Dict,
+        headers: Dict,
+        allow_not_modified: bool = False,
+    ) -> requests.Response:
+        """Runs the `GET` request on the event loop and waits for its
+        response."""
+        return asyncio.run_coroutine_threadsafe(
+            self._make_async_request(
+                "GET",
+                endpoint,
+                headers=headers,
+                params=params,
+                allow_not_modified=allow_not_modified,
+            ),
+            self._loop,
+        ).result()
+
+    def submit(
+        self,
+        endpoint: str,
+        params: Dict,
+        headers: Dict,
+        path: str = None,
+        use_cache: bool = False,
+        memo_version: Optional[str] = None,
+    ) -> Future:
+        """Schedules a `GET` request on the event loop and returns a future for
+        its `Page`."""
+        endpoint = endpoint or f"{self.base_url}/{path}"
+        if (use_cache and self.response_cache) or self.use_request_memo(endpoint, memo_version):
+            # The cache and the memo are only consulted by the blocking `get()`
+            return super().submit(endpoint, params, headers, path, use_cache, memo_version)
+        return asyncio.run_coroutine_threadsafe(
+            self.get_page_async(endpoint, dict(params or {}), dict(headers or {}), path),
+            self._loop,
+        )
+
+    async def get_page_async(
+        self, endpoint: str, params: Dict, headers: Dict, path: str = None
+    ) -> Page:
+        """Coroutine counterpart of `get_page()`."""
+        endpoint = endpoint or f"{self.base_url}/{path}"
+        response = await self._make_async_request(
+            "GET", endpoint, headers=headers, params=params
+        )
+        return Page(self.decode_json(response.content), get_next_url(response.headers))
+
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        if self._aio_session is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            credentials = base64.b64encode(f"{self.config['api_key']}:".encode()).decode()
+            self._aio_session = aiohttp.ClientSession(
+                headers={
+                    "Authorization": f"Basic {credentials}",
+                    "Accept-Encoding": self.accept_encoding,
+                },
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrent_requests),
+            )
+        return self._aio_session
+
+    @staticmethod
+    async def _to_response(aio_response: "aiohttp.ClientResponse") -> requests.Response:
+        """Copies an aiohttp response into a `requests.Response` so the error
+        mapping and rate-limit handling are shared with `Client`."""
+        response = requests.Response()
+        response.status_code = aio_response.status
+        response.headers = CaseInsensitiveDict(aio_response.headers)
+        response.url = str(aio_response.url)
+        response.encoding = aio_response.charset or "utf-8"
+        response._content = await aio_response.read()
+        return response
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=ASYNC_BACKOFF_EXCEPTIONS,
+        max_tries=5,
+        factor=2,
+        on_backoff=record_retry,
+    )
+    async def _make_async_request(
+        self, method: str, endpoint: str, allow_not_modified: bool = False, **kwargs
+    ) -> requests.Response:
+        """Performs HTTP Operations on the event loop
+        Args:
+            method (str): HTTP method of the request
+            endpoint (str): url of the resource that needs to be fetched
+            allow_not_modified (bool): accept `304 Not Modified` responses
+            params (dict): A mapping for url params eg: ?name=Avery&age=3
+            headers (dict): A mapping for the headers that need to be sent
+
+        Returns:
+            requests.Response: the checked response
+        """
+        session = await self._get_session()
+        async with self._semaphore:
+            if self.shared_rate_limiter:
+                await self._loop.run_in_executor(None, self.shared_rate_limiter.acquire)
+            delay = self.rate_limit_governor.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            template = endpoint_template(endpoint, self.base_url)
+            with metrics.http_request_timer(template) as timer:
+                async with session.request(method, endpoint, **kwargs) as aio_response:
+                    response = await self._to_response(aio_response)
+                    self.record_response(template, response, timer.elapsed())
+                    # Older aiohttp releases do not count the bytes before
+                    # decoding, the wire size is then reported as unknown
+                    wire_bytes = getattr(aio_response.content, "total_raw_bytes", None)
+                self.record_transfer(endpoint, wire_bytes, len(response.content))
+                self.rate_limit_governor.update(response)
+                if not (allow_not_modified and response.status_code == 304):
+                    raise_for_error(response)
+
+        return response
@@ -0,0 +1,177 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional
+
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+
+class ResponseCache:
+    """On-disk cache of response bodies and their validators (`ETag`,
+    `Last-Modified`) for conditional requests.
+    ~~~
+    Each URL and params pair is stored in its own JSON file under
+    `directory`. Entries older than `ttl` seconds are dropped, so a page is
+    downloaded in full again at least that often even if the server keeps
+    answering `304 Not Modified`.
+    """
+
+    def __init__(self, directory: str, ttl: float = DEFAULT_CACHE_TTL) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self.hit_counter = metrics.Counter("response_cache_not_modified")
+        self.miss_counter = metrics.Counter("response_cache_downloaded")
+
+    def _path(self, url: str, params: Optional[Mapping]) -> str:
+        key = json.dumps([url, sorted((params or {}).items())], default=str)
+        return os.path.join(
+            self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+        )
+
+    def get(self, url: str, params: Optional[Mapping]) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for the request, if it is still fresh."""
+        path = self._path(url, params)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("stored_at", 0) > self.ttl:
+            # Another thread may have dropped the same entry already
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            return None
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Mapping]) -> Dict[str, str]:
+        """Validators to send so the server can answer `304 Not Modified`."""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(
+        self, url: str, params: Optional[Mapping], headers: Mapping, body: bytes
+    ) -> None:
+        """Store a response body if the server sent a validator for it."""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "link": headers.get("Link"),
+            "stored_at": time.time(),
+            "body": body.decode("utf-8"),
+        }
+        # Write to a temporary file first so a crash never leaves a torn entry
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, self._path(url, params))
+
+    def close(self) -> None:
+        """Flush the cache metrics."""
+        self.hit_counter.__exit__(None, None, None)
+        self.miss_counter.__exit__(None, None, None)
+
+
+def get_response_cache(config: Mapping[str, Any]) -> Optional[ResponseCache]:
+    """Build the response cache when `response_cache_dir` is configured."""
+    directory = config.get("response_cache_dir")
+    if not directory:
+        return None
+    ttl = config.get("response_cache_ttl")
+    return ResponseCache(directory, float(ttl) if ttl else DEFAULT_CACHE_TTL)
+
+
+class RequestMemo:
+    """Bounded in-run LRU of responses keyed on URL and params, which also
+    coalesces identical requests that are in flight at the same time.
+    ~~~
+    Bodies are kept as bytes and decoded by every caller, so records handed
+    out twice never share mutable state.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hit_counter = metrics.Counter("request_memo_hits")
+        self.miss_counter = metrics.Counter("request_memo_misses")
+
+    @staticmethod
+    def memoizable(template: str, version: Optional[str] = None) -> bool:
+        """Whether the responses of an endpoint template may be memoized.
+        Listings scoped to a parent record, such as `tickets/{}/conversations`,
+        only are under the `version` (`updated_at`) of their parent: once the
+        parent is updated, its children are fetched again."""
+        return version is not None or "{}" not in template
+
+    @staticmethod
+    def key(url: str, params: Optional[Mapping], version: Optional[str] = None) -> Hashable:
+        return url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())), version
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Return the memoized response for `key`, wait for an identical
+        request already in flight, or call `fetch` and memoize its result."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hit_counter.increment()
+                return self._entries[key]
+            pending = self._in_flight.get(key)
+            if pending is None:
+                pending = self._in_flight[key] = Future()
+                owner = True
+            else:
+                self.hit_counter.increment()
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        try:
+            body = fetch()
+        except BaseException as err:
+            with self._lock:
+                del self._in_flight[key]
+            pending.set_exception(err)
+            raise
+
+        with self._lock:
+            self.miss_counter.increment()
+            self._entries[key] = body
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._in_flight[key]
+        pending.set_result(body)
+        return body
+
+    def close(self) -> None:
+        """Flush the memo metrics."""
+        self.hit_counter.__exit__(None, None, None)
+        self.miss_counter.__exit__(None, None, None)
+
+
+def get_request_memo(config: Mapping[str, Any]) -> Optional[RequestMemo]:
+    """Build the in-run request memo when `request_memo_size` is set."""
+    max_entries = int(config.get("request_memo_size") or 0)
+    return RequestMemo(max_entries) if max_entries > 0 else None
@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+from typing import Any, Mapping, Optional
+
+from singer import get_logger
+from singer.utils import strptime_to_utc
+
+LOGGER = get_logger()
+
+COMMIT_EVERY = 500
+
+
+class ChildSyncIndex:
+    """SQLite index of the parent `updated_at` for which each child stream
+    was last synced, per parent id.
+    ~~~
+    The state is only written once a whole tickets filter pass is done, so
+    a run that fails midway restarts from the old bookmark. The index lets
+    that run skip the children of the tickets which have not changed since
+    they were processed. Each entry holds the `scope` it was synced under,
+    the start date and bookmark the run started from, and only counts for
+    the same scope: once the state moves on, is reset or the start date
+    changes, the children are fetched again. Writes are committed every
+    `COMMIT_EVERY` entries and on `close()`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        columns = [
+            row[1] for row in self._connection.execute("PRAGMA table_info(child_sync)")
+        ]
+        if columns and "scope" not in columns:
+            # Entries written without a scope cannot be trusted
+            self._connection.execute("DROP TABLE child_sync")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS child_sync ("
+            " stream TEXT NOT NULL,"
+            " parent_id INTEGER NOT NULL,"
+            " parent_updated_at TEXT NOT NULL,"
+            " scope TEXT NOT NULL,"
+            " PRIMARY KEY (stream, parent_id)"
+            ") WITHOUT ROWID"
+        )
+        self._connection.commit()
+        self._pending = 0
+
+    def get(self, stream: str, parent_id: int, scope: str) -> Optional[str]:
+        """The parent `updated_at` the stream was last synced for in `scope`."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT parent_updated_at FROM child_sync"
+                " WHERE stream = ? AND parent_id = ? AND scope = ?",
+                (stream, parent_id, scope),
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_current(
+        self, stream: str, parent_id: int, parent_updated_at: str, scope: str
+    ) -> bool:
+        """Whether the stream was synced for this version of the parent in
+        `scope`."""
+        synced_at = self.get(stream, parent_id, scope)
+        return synced_at is not None and strptime_to_utc(synced_at) >= strptime_to_utc(
+            parent_updated_at
+        )
+
+    def mark_synced(
+        self, stream: str, parent_id: int, parent_updated_at: str, scope: str
+    ) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO child_sync VALUES (?, ?, ?, ?)",
+                (stream, parent_id, parent_updated_at, scope),
+            )
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._connection.commit()
+                self._pending = 0
+
+    def clear(self, stream: str) -> None:
+        """Forget every entry of the stream."""
+        with self._lock:
+            self._connection.execute("DELETE FROM child_sync WHERE stream = ?", (stream,))
+            self._connection.commit()
+            self._pending = 0
+
+    def __enter__(self) -> "ChildSyncIndex":
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+
+def get_child_sync_index(config: Mapping[str, Any]) -> Optional[ChildSyncIndex]:
+    """Open the child sync index when `child_sync_index` is configured."""
+    path = config.get("child_sync_index")
+    return ChildSyncIndex(path) if path else None
@@ -0,0 +1,203 @@
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+
+COMMIT_EVERY = 100
+LOG_EVERY = 100
+DEFAULT_CHILD_QUEUE_SIZE = 100
+
+
+class ChildWorkQueue:
+    """Persistent FIFO of child sync work items: a child stream, the id and
+    `updated_at` of its parent, the parent's bookmark category and the
+    cutoff its child records were to be written from.
+    ~~~
+    Items are stored in a SQLite file and only deleted once their child
+    records have been written, so the work left by a failed run is found
+    again by the next one. Changes are committed every `COMMIT_EVERY`
+    operations and on `close()`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS child_work ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " stream TEXT NOT NULL,"
+            " parent_id INTEGER NOT NULL,"
+            " parent_updated_at TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " enqueued_at REAL NOT NULL,"
+            " cutoff TEXT"
+            ")"
+        )
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(child_work)")]
+        if "cutoff" not in columns:
+            # Items queued before the cutoff was kept are emitted from the
+            # bookmarks of the run resuming them
+            self._connection.execute("ALTER TABLE child_work ADD COLUMN cutoff TEXT")
+        self._connection.commit()
+        self._operations = 0
+        self._done = 0
+
+    def _changed(self) -> None:
+        self._operations += 1
+        if self._operations >= COMMIT_EVERY:
+            self._connection.commit()
+            self._operations = 0
+
+    def push(
+        self,
+        stream: str,
+        parent_id: int,
+        parent_updated_at: str,
+        category: str,
+        cutoff: Optional[str] = None,
+    ) -> int:
+        cursor = self._connection.execute(
+            "INSERT INTO child_work"
+            " (stream, parent_id, parent_updated_at, category, enqueued_at, cutoff)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (stream, parent_id, parent_updated_at, category, time.time(), cutoff),
+        )
+        self._changed()
+        return cursor.lastrowid
+
+    def done(self, seq: int) -> None:
+        self._connection.execute("DELETE FROM child_work WHERE seq = ?", (seq,))
+        self._changed()
+        self._done += 1
+        if self._done % LOG_EVERY == 0:
+            self.log_metrics()
+
+    def pending(self) -> List[Tuple[int, str, int, str, str, Optional[str]]]:
+        """Items not done yet, oldest first."""
+        return self._connection.execute(
+            "SELECT seq, stream, parent_id, parent_updated_at, category, cutoff"
+            " FROM child_work ORDER BY seq"
+        ).fetchall()
+
+    def stats(self) -> Dict[str, float]:
+        """Number of items left and age in seconds of the oldest one."""
+        depth, oldest = self._connection.execute(
+            "SELECT COUNT(*), MIN(enqueued_at) FROM child_work"
+        ).fetchone()
+        return {
+            "child_queue_depth": depth,
+            "child_queue_age": round(time.time() - oldest, 3) if oldest else 0,
+        }
+
+    def log_metrics(self) -> None:
+        for name, value in self.stats().items():
+            metrics.log(LOGGER, metrics.Point("gauge", name, value, {}))
+
+    def __enter__(self) -> "ChildWorkQueue":
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.log_metrics()
+        self._connection.commit()
+        self._connection.close()
+
+
+def get_child_work_queue(config: Mapping[str, Any]) -> Optional[ChildWorkQueue]:
+    """Open the child work queue when `child_work_queue` is configured."""
+    path = config.get("child_work_queue")
+    return ChildWorkQueue(path) if path else None
+
+
+class ChildStage:
+    """Fetches queued child work on `executor` and hands the results, in
+    queue order, to `emit` on the caller's thread.
+    ~~~
+    `push` only blocks once `max_pending` items are in flight, so the
+    parent listing carries on while children are fetched. Results that are
+    ready are emitted on every push, the rest by `drain()`.
+
+    Work left by a failed run belongs to a pass whose bookmark was not
+    written, so the parent listing plans it again. Pushes of items already
+    resumed are dropped, so each of them is only fetched once. Resumed items
+    are emitted with the cutoff they were queued with, so their output does
+    not depend on when the previous run failed.
+    """
+
+    def __init__(
+        self,
+        work_queue: ChildWorkQueue,
+        executor: Executor,
+        emit: Callable[[Any, Dict, List[Dict], Optional[str]], None],
+        max_pending: int = DEFAULT_CHILD_QUEUE_SIZE,
+    ) -> None:
+        self.work_queue = work_queue
+        self.executor = executor
+        self.emit = emit
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._resumed = set()
+
+    def resume(self, children: Mapping[str, Any]) -> int:
+        """Schedules the work left by a previous run for the selected
+        `children`, by stream name, and drops the rest. Returns the number
+        of items resumed."""
+        resumed = 0
+        for seq, stream, parent_id, parent_updated_at, category, cutoff in (
+            self.work_queue.pending()
+        ):
+            child = children.get(stream)
+            if child is None:
+                self.work_queue.done(seq)
+                continue
+            parent_obj = {"id": parent_id, "updated_at": parent_updated_at}
+            if category:
+                parent_obj["filter"] = category.lstrip("_")
+            self._schedule(seq, child, parent_obj, cutoff)
+            self._resumed.add((stream, parent_id, category))
+            resumed += 1
+        if resumed:
+            LOGGER.info("Resuming %s child sync items left by the previous run", resumed)
+        return resumed
+
+    def push(self, child, parent_obj: Dict, category: str, cutoff: Optional[str] = None) -> None:
+        key = (child.tap_stream_id, parent_obj["id"], category)
+        if key in self._resumed:
+            # Fetched from the work left by the previous run
+            self._resumed.discard(key)
+            return
+        seq = self.work_queue.push(
+            child.tap_stream_id, parent_obj["id"], parent_obj["updated_at"], category, cutoff
+        )
+        self._schedule(seq, child, parent_obj, cutoff)
+
+    def _schedule(self, seq: int, child, parent_obj: Dict, cutoff: Optional[str]) -> None:
+        while len(self._pending) >= self.max_pending:
+            self._emit_next()
+        future = self.executor.submit(child.fetch, parent_obj)
+        self._pending.append((seq, child, parent_obj, cutoff, future))
+        while self._pending and self._pending[0][4].done():
+            self._emit_next()
+
+    def _emit_next(self) -> None:
+        seq, child, parent_obj, cutoff, future = self._pending.popleft()
+        self.emit(child, parent_obj, future.result(), cutoff)
+        self.work_queue.done(seq)
+
+    def drain(self) -> None:
+        """Emits every item in flight."""
+        while self._pending:
+            self._emit_next()
+
+    def close(self) -> None:
+        """Cancels the fetches in flight, their items stay queued."""
+        for *_, future in self._pending:
+            future.cancel()
+        self._pending.clear()
@@ -1,19 +1,40 @@
-from typing import Any, Dict, Mapping, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
 
 import backoff
 import requests
 from requests import session
 from requests.exceptions import Timeout, ConnectionError, ChunkedEncodingError
+from requests.utils import parse_header_links
 from singer import get_logger, metrics
+from urllib3.util.request import ACCEPT_ENCODING
 
+from tap_freshdesk.cache import get_request_memo, get_response_cache
+from tap_freshdesk.connection_pool import log_connection_stats, mount_pooling_adapter
+from tap_freshdesk.decoding import get_json_decoder, iter_json_array
 from tap_freshdesk.exceptions import (
     ERROR_CODE_EXCEPTION_MAPPING,
     freshdeskError,
     freshdeskBackoffError,
 )
+from tap_freshdesk.rate_limit import (
+    DEFAULT_RESERVE_RATIO,
+    RateLimitGovernor,
+    get_header_int,
+    get_shared_rate_limiter,
+)
+from tap_freshdesk.telemetry import (
+    PaginationStats,
+    RequestStats,
+    TransferStats,
+    endpoint_template,
+)
+from tap_freshdesk.utils import config_flag
 
 LOGGER = get_logger()
 REQUEST_TIMEOUT = 300
+MAX_CONCURRENT_REQUESTS = 5
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 def raise_for_error(response: requests.Response) -> None:
@@ -23,11 +44,13 @@ def raise_for_error(response: requests.Response) -> None:
 
     :param resp: requests.Response object
     """
-    try:
-        response_json = response.json()
-    except Exception:
-        response_json = {}
     if response.status_code != 200:
+        # Only error bodies are decoded here, successful bodies are decoded once
+        # by the caller
+        try:
+            response_json = response.json()
+        except Exception:
+            response_json = {}
         if response_json.get("error"):
             message = f"HTTP-error-code: {response.status_code}, Error: {response_json.get('error')}"
         else:
@@ -45,6 +68,42 @@ def raise_for_error(response: requests.Response) -> None:
         raise exc(message, response) from None
 
 
+class Page(NamedTuple):
+    """The records of a list page and the URL of the next page, taken from
+    the `Link: <...>; rel="next"` response header when the API sent one."""
+
+    records: Iterable[Any]
+    next_url: Optional[str] = None
+
+
+def get_next_url(headers: Mapping[str, str]) -> Optional[str]:
+    """URL of the `rel="next"` entry of a `Link` header, if any."""
+    link = headers.get("Link")
+    if not link:
+        return None
+    for entry in parse_header_links(link):
+        if entry.get("rel") == "next":
+            return entry.get("url")
+    return None
+
+
+def get_wire_bytes(response: requests.Response, default: int) -> int:
+    """Number of body bytes received on the wire, before content decoding."""
+    tell = getattr(response.raw, "tell", None)
+    if callable(tell):
+        try:
+            return tell()
+        except (OSError, ValueError):
+            pass
+    return default
+
+
+def record_retry(details: Dict) -> None:
+    """`on_backoff` handler counting the retries of each endpoint template."""
+    client, _method, endpoint = details["args"][:3]
+    client.request_stats.record_retry(endpoint_template(endpoint, client.base_url))
+
+
 class Client:
     """A Wrapper class.
     ~~~
@@ -65,26 +124,178 @@ class Client:
             float(config_request_timeout) if config_request_timeout else REQUEST_TIMEOUT
         )
 
+        reserve_ratio = config.get("rate_limit_reserve_ratio")
+        self.rate_limit_governor = RateLimitGovernor(
+            reserve_ratio=(
+                float(reserve_ratio) if reserve_ratio is not None else DEFAULT_RESERVE_RATIO
+            )
+        )
+        self.shared_rate_limiter = get_shared_rate_limiter(config)
+        self.decode_json = get_json_decoder(config.get("json_decoder"))
+        self.stream_records = config_flag(config, "stream_records")
+        self.prefetch_pages = int(config.get("prefetch_pages") or 0)
+        self.response_cache = get_response_cache(config)
+        self.request_memo = get_request_memo(config)
+
+        self.max_concurrent_requests = int(
+            config.get("max_concurrent_requests") or MAX_CONCURRENT_REQUESTS
+        )
+        self._executor = None
+        self._adapter = mount_pooling_adapter(
+            self._session, config, self.max_concurrent_requests
+        )
+
+        # urllib3 advertises brotli (and zstd) only when it can decode them
+        self.accept_encoding = config.get("accept_encoding") or ACCEPT_ENCODING
+        self._session.headers["Accept-Encoding"] = self.accept_encoding
+        self.transfer_stats = TransferStats()
+        self.request_stats = RequestStats()
+        self.pagination_stats = PaginationStats()
+
     def __enter__(self):
         self.check_api_credentials()
+        self.prewarm_connections()
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        log_connection_stats(self._adapter)
+        self.request_stats.log_summary()
         self._session.close()
+        self.rate_limit_governor.close()
+        if self.shared_rate_limiter:
+            self.shared_rate_limiter.close()
+        if self.response_cache:
+            self.response_cache.close()
+        if self.request_memo:
+            self.request_memo.close()
 
     def check_api_credentials(self) -> None:
         pass
 
-    def get(self, endpoint: str, params: Dict, headers: Dict, path: str = None) -> Any:
-        """Calls the make_request method with a prefixed method type `GET`"""
+    def prewarm_connections(self) -> None:
+        """Opens `prewarm_connections` connections to the account domain up
+        front so their TLS handshakes are not paid by the first requests."""
+        count = int(self.config.get("prewarm_connections") or 0)
+        if count:
+            opened = self._adapter.prewarm(self._session, self.base_url, count)
+            LOGGER.info("Pre-warmed %s connections to %s", opened, self.base_url)
+
+    def get(
+        self,
+        endpoint: str,
+        params: Dict,
+        headers: Dict,
+        path: str = None,
+        use_cache: bool = False,
+        memo_version: Optional[str] = None,
+    ) -> Any:
+        """Performs a `GET` request and returns the parsed body. With
+        `use_cache`, the request is made conditional on the cached copy when
+        a response cache is configured. `memo_version` is the `updated_at` of
+        the parent record a child listing belongs to, see `use_request_memo`."""
+        return self.get_page(endpoint, params, headers, path, use_cache, memo_version).records
+
+    def get_page(
+        self,
+        endpoint: str,
+        params: Dict,
+        headers: Dict,
+        path: str = None,
+        use_cache: bool = False,
+        memo_version: Optional[str] = None,
+    ) -> Page:
+        """Same as `get()`, also returning the next page URL of the `Link`
+        header."""
         endpoint = endpoint or f"{self.base_url}/{path}"
-        return self.__make_request(
+
+        def fetch() -> Tuple[bytes, Optional[str]]:
+            if use_cache and self.response_cache:
+                return self.get_with_cache(endpoint, params, headers)
+            response = self.send_get(endpoint, params, headers)
+            return response.content, get_next_url(response.headers)
+
+        if self.use_request_memo(endpoint, memo_version):
+            body, next_url = self.request_memo.get_or_fetch(
+                self.request_memo.key(endpoint, params, memo_version), fetch
+            )
+        else:
+            body, next_url = fetch()
+        return Page(self.decode_json(body), next_url)
+
+    def use_request_memo(self, endpoint: str, memo_version: Optional[str] = None) -> bool:
+        """Whether responses of `endpoint` are served from the request memo.
+        Child listings are only memoized with the `memo_version` of their
+        parent, so an updated parent has its children fetched again."""
+        return bool(self.request_memo) and self.request_memo.memoizable(
+            endpoint_template(endpoint, self.base_url), memo_version
+        )
+
+    def get_with_cache(
+        self, endpoint: str, params: Dict, headers: Dict
+    ) -> Tuple[bytes, Optional[str]]:
+        """Sends `If-None-Match`/`If-Modified-Since` from the cached entry and
+        returns the cached body and next page URL when the server answers
+        `304 Not Modified`."""
+        entry = self.response_cache.get(endpoint, params)
+        response = self.send_get(
+            endpoint,
+            params,
+            {**(headers or {}), **self.response_cache.conditional_headers(entry)},
+            allow_not_modified=entry is not None,
+        )
+        if response.status_code == 304:
+            self.response_cache.hit_counter.increment()
+            return entry["body"].encode("utf-8"), get_next_url({"Link": entry.get("link")})
+
+        self.response_cache.miss_counter.increment()
+        self.response_cache.put(endpoint, params, response.headers, response.content)
+        return response.content, get_next_url(response.headers)
+
+    def send_get(
+        self,
+        endpoint: str,
+        params: Dict,
+        headers: Dict,
+        allow_not_modified: bool = False,
+    ) -> requests.Response:
+        """Sends a `GET` request and returns the checked response."""
+        return self.__send(
             "GET",
             endpoint,
             headers=headers,
             params=params,
             auth=(self.config["api_key"], ""),
             timeout=self.request_timeout,
+            allow_not_modified=allow_not_modified,
+        )
+
+    def submit(
+        self,
+        endpoint: str,
+        params: Dict,
+        headers: Dict,
+        path: str = None,
+        use_cache: bool = False,
+        memo_version: Optional[str] = None,
+    ) -> Future:
+        """Schedules a `GET` request and returns a future for its `Page`,
+        allowing callers to keep up to `max_concurrent_requests` requests in
+        flight."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_requests,
+                thread_name_prefix="freshdesk-request",
+            )
+        return self._executor.submit(
+            self.get_page,
+            endpoint,
+            dict(params or {}),
+            dict(headers or {}),
+            path,
+            use_cache=use_cache,
+            memo_version=memo_version,
         )
 
     def post(
@@ -100,6 +311,65 @@ class Client:
             timeout=self.request_timeout,
         )
 
+    def stream_page(
+        self, endpoint: str, params: Dict, headers: Dict, path: str = None
+    ) -> Page:
+        """Performs a `GET` request and returns a `Page` whose records are
+        decoded while the body is still being received.
+
+        Retries only cover the request up to the response headers, an error
+        while reading the body is raised to the caller.
+        """
+        endpoint = endpoint or f"{self.base_url}/{path}"
+        response = self.__send(
+            "GET",
+            endpoint,
+            headers=headers,
+            params=params,
+            auth=(self.config["api_key"], ""),
+            timeout=self.request_timeout,
+            stream=True,
+        )
+        decoded_bytes = 0
+
+        def iter_chunks():
+            nonlocal decoded_bytes
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                decoded_bytes += len(chunk)
+                yield chunk
+
+        def iter_page_records():
+            try:
+                yield from iter_json_array(iter_chunks())
+            finally:
+                self.record_transfer(
+                    endpoint, get_wire_bytes(response, decoded_bytes), decoded_bytes
+                )
+                response.close()
+
+        return Page(iter_page_records(), get_next_url(response.headers))
+
+    def record_response(
+        self, template: str, response: requests.Response, seconds: float
+    ) -> None:
+        """Adds a response to the per-endpoint request statistics."""
+        self.request_stats.record_response(
+            template,
+            response.status_code,
+            seconds,
+            remaining=get_header_int(response, "X-RateLimit-Remaining"),
+            total=get_header_int(response, "X-RateLimit-Total"),
+        )
+
+    def record_transfer(
+        self, endpoint: str, wire_bytes: Optional[int], decoded_bytes: int
+    ) -> None:
+        """Adds a response's size to the per-endpoint transfer accounting.
+        `wire_bytes` is `None` when the size on the wire is unknown."""
+        self.transfer_stats.record(
+            endpoint_template(endpoint, self.base_url), wire_bytes, decoded_bytes
+        )
+
     @backoff.on_exception(
         wait_gen=backoff.expo,
         exception=(
@@ -111,7 +381,32 @@ class Client:
         ),
         max_tries=5,
         factor=2,
+        on_backoff=record_retry,
     )
+    def __send(
+        self, method: str, endpoint: str, allow_not_modified: bool = False, **kwargs
+    ) -> requests.Response:
+        """Sends the request once the rate limiters allow it and raises the
+        mapped exception for error responses. A `304 Not Modified` is only
+        accepted for conditional requests (`allow_not_modified`)."""
+        if self.shared_rate_limiter:
+            self.shared_rate_limiter.acquire()
+        self.rate_limit_governor.wait()
+        template = endpoint_template(endpoint, self.base_url)
+        with metrics.http_request_timer(template) as timer:
+            response = self._session.request(method, endpoint, **kwargs)
+            self.record_response(template, response, timer.elapsed())
+            if not kwargs.get("stream"):
+                decoded_bytes = len(response.content)
+                self.record_transfer(
+                    endpoint, get_wire_bytes(response, decoded_bytes), decoded_bytes
+                )
+            self.rate_limit_governor.update(response)
+            if not (allow_not_modified and response.status_code == 304):
+                raise_for_error(response)
+
+        return response
+
     def __make_request(
         self, method: str, endpoint: str, **kwargs
     ) -> Optional[Mapping[Any, Any]]:
@@ -126,8 +421,19 @@ class Client:
         Returns:
             Dict,List,None: Returns a `Json Parsed` HTTP Response or None if exception
         """
-        with metrics.http_request_timer(endpoint) as timer:
-            response = self._session.request(method, endpoint, **kwargs)
-            raise_for_error(response)
+        response = self.__send(method, endpoint, **kwargs)
+        return self.decode_json(response.content)
+
+def get_client(config: Mapping[str, Any]) -> Client:
+    """Returns the HTTP client selected by the `http_client` config option."""
+    http_client = config.get("http_client") or "requests"
+    if http_client == "requests":
+        return Client(config)
+    if http_client == "aiohttp":
+        # Imported lazily, aiohttp is an optional dependency
+        from tap_freshdesk.async_client import AsyncClient
 
-        return response.json()
+        return AsyncClient(config)
+    raise ValueError(
+        f"Unsupported http_client `{http_client}`, expected `requests` or `aiohttp`"
+    )
@@ -0,0 +1,108 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+_DONE = object()
+
+
+class BackgroundIterator:
+    """Iterates `factory()` on a worker thread and hands the items to a
+    single consumer through a queue of at most `maxsize` items.
+    ~~~
+    The iterable is produced by whichever side claims it first: a worker
+    started with `submit()`, or the consumer itself, which then iterates it
+    inline. A consumer waiting on an iterator that no free worker has
+    picked up yet therefore never deadlocks. Exceptions raised by the
+    iterable are re-raised to the consumer, and `close()` stops the worker
+    at its next item.
+    """
+
+    def __init__(self, factory: Callable[[], Iterable[Any]], maxsize: int) -> None:
+        self._factory = factory
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._claimed = False
+        self._closed = threading.Event()
+
+    def _claim(self) -> bool:
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+            return True
+
+    def submit(self, executor: Executor) -> None:
+        """Start producing the items on one of the executor's workers."""
+        executor.submit(self._produce)
+
+    def _put(self, item: Any) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        if not self._claim():
+            return
+        try:
+            for item in self._factory():
+                if not self._put((item, None)):
+                    return
+        except BaseException as err:  # pylint: disable=broad-except
+            self._put((_DONE, err))
+            return
+        self._put((_DONE, None))
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._claim():
+            yield from self._factory()
+            return
+        while True:
+            item, error = self._queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+
+    def close(self) -> None:
+        """Stop the worker, discarding the items it has not handed over."""
+        self._closed.set()
+
+
+def imap_ordered(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    executor: Optional[Executor] = None,
+    window: int = 1,
+) -> Iterator[Tuple[Any, Any]]:
+    """Yields `(item, func(item))` for each item, in the order of `items`.
+    ~~~
+    The calls run on `executor`, up to `window` items ahead of the consumer,
+    so the consumer processes one result while the next ones are computed.
+    Without an executor the calls run inline. Calls not consumed when the
+    iteration stops are cancelled.
+    """
+    if executor is None:
+        for item in items:
+            yield item, func(item)
+        return
+
+    pending = deque()
+    try:
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= window:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
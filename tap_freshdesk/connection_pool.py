@@ -0,0 +1,129 @@
+import socket
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from requests import Request, Session
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from singer import get_logger, metrics
+from urllib3.connection import HTTPConnection
+
+from tap_freshdesk.utils import config_flag
+
+LOGGER = get_logger()
+
+# Default, spam and deleted tickets listings
+TICKET_FILTER_PASSES = 3
+
+
+def get_keepalive_socket_options(idle: int) -> List[Tuple[int, int, int]]:
+    """Socket options enabling TCP keepalive probes after `idle` seconds of
+    inactivity, on top of urllib3's defaults."""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Not every platform lets the probe timings be tuned
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(idle // 4, 1)))
+    if hasattr(socket, "TCP_KEEPCNT"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 4))
+    return options
+
+
+class PoolingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections can keep idle TCP sessions alive, so
+    pooled connections and their TLS sessions survive slow pages."""
+
+    def __init__(self, socket_options: Optional[List] = None, **kwargs) -> None:
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.socket_options is not None:
+            pool_kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Counts connections opened and requests served by the live pools.
+        Every request beyond the opened connections reused a connection."""
+        opened = requests_sent = 0
+        for key in list(self.poolmanager.pools.keys()):
+            pool = self.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+        return {
+            "new": opened,
+            "reused": max(requests_sent - opened, 0),
+        }
+
+    def prewarm(self, session: Session, url: str, count: int) -> int:
+        """Opens up to `count` connections (TCP and TLS handshakes) to the host
+        of `url` and parks them in its pool. Returns the number opened."""
+        # Resolve the pool the way `session.request` does so that the TLS
+        # settings, and therefore the pool key, match later requests
+        settings = session.merge_environment_settings(
+            url, {}, None, session.verify, session.cert
+        )
+        pool = self.get_connection_with_tls_context(
+            Request("GET", url).prepare(),
+            settings["verify"],
+            proxies=settings["proxies"],
+            cert=settings["cert"],
+        )
+        self.cert_verify(pool, url, settings["verify"], settings["cert"])
+        connections = []
+        try:
+            for _ in range(min(count, pool.pool.maxsize)):
+                conn = pool._get_conn()
+                connections.append(conn)
+                conn.connect()
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.warning("Could not pre-warm connections to %s: %s", url, err)
+        finally:
+            for conn in connections:
+                pool._put_conn(conn)
+        return len(connections)
+
+
+def get_request_concurrency(config: Mapping[str, Any], max_concurrent_requests: int) -> int:
+    """Most requests the tap's threads can have in flight at once: the
+    client's request workers, the tickets listings, each fetched by its
+    own shard threads with `ticket_shards`, and the child fetch threads."""
+    listings = TICKET_FILTER_PASSES if config_flag(config, "concurrent_ticket_filters") else 1
+    if int(config.get("ticket_shards") or 0) >= 2:
+        listings *= max_concurrent_requests
+    children = int(config.get("child_fetch_concurrency") or 0)
+    if config.get("child_work_queue"):
+        # Queued child work is always fetched off the main thread
+        children = max(children, 1)
+    return max_concurrent_requests + listings + children
+
+
+def mount_pooling_adapter(
+    session: Session, config: Mapping[str, Any], max_concurrent_requests: int
+) -> PoolingHTTPAdapter:
+    """Mounts a `PoolingHTTPAdapter` tuned from the config on the session."""
+    keepalive_idle = config.get("tcp_keepalive_idle")
+    adapter = PoolingHTTPAdapter(
+        socket_options=(
+            get_keepalive_socket_options(int(keepalive_idle)) if keepalive_idle else None
+        ),
+        pool_connections=int(config.get("pool_connections") or DEFAULT_POOLSIZE),
+        pool_maxsize=int(
+            config.get("pool_maxsize")
+            or max(DEFAULT_POOLSIZE, get_request_concurrency(config, max_concurrent_requests))
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
+
+
+def log_connection_stats(adapter: PoolingHTTPAdapter) -> None:
+    """Emits the new and reused connection counts as metrics."""
+    for kind, value in adapter.connection_stats().items():
+        metrics.log(
+            LOGGER,
+            metrics.Point("counter", f"http_connections_{kind}", value, {}),
+        )
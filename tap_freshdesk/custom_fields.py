@@ -0,0 +1,166 @@
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from singer import get_logger, metadata
+
+LOGGER = get_logger()
+
+DEFAULT_CUSTOM_FIELDS_CACHE_TTL = 24 * 60 * 60
+
+# Endpoints listing the field definitions of the streams with custom fields
+FIELD_ENDPOINTS = {
+    "tickets": "ticket_fields",
+    "contacts": "contact_fields",
+    "companies": "company_fields",
+}
+
+DATE_TIME_SCHEMA = {"type": ["null", "string"], "format": "date-time"}
+
+FIELD_TYPE_SCHEMAS = {
+    "custom_checkbox": {"type": ["null", "boolean"]},
+    "custom_number": {"type": ["null", "integer"]},
+    "custom_decimal": {"type": ["null", "number"]},
+    "custom_date": DATE_TIME_SCHEMA,
+    "custom_date_time": DATE_TIME_SCHEMA,
+}
+
+STRING_SCHEMA = {"type": ["null", "string"]}
+
+# Metadata marking a stream whose custom fields are flattened, and the name
+# of the custom field each flattened property holds
+TYPED_CUSTOM_FIELDS_KEY = "typed-custom-fields"
+CUSTOM_FIELD_NAME_KEY = "custom-field-name"
+
+
+def get_property_name(field_name: str) -> str:
+    """Name of the property holding a custom field. Ticket custom fields are
+    already prefixed with `cf_`; the others get the prefix so they cannot
+    clash with the standard properties."""
+    return field_name if field_name.startswith("cf_") else "cf_" + field_name
+
+
+def get_custom_field_schemas(definitions: List[Dict]) -> Dict[str, Tuple[str, Dict]]:
+    """Property name, and the custom field name and schema it holds, for
+    each custom field of a field definitions listing. The levels below the
+    first one of nested fields are custom fields of their own."""
+    schemas = {}
+    for definition in definitions:
+        if definition.get("default"):
+            continue
+        schema = FIELD_TYPE_SCHEMAS.get(definition.get("type"), STRING_SCHEMA)
+        schemas[get_property_name(definition["name"])] = (definition["name"], dict(schema))
+        for nested in definition.get("nested_ticket_fields") or []:
+            schemas[get_property_name(nested["name"])] = (nested["name"], dict(STRING_SCHEMA))
+    return schemas
+
+
+def add_custom_field_properties(
+    schema: Dict, mdata: Dict, definitions: List[Dict]
+) -> Tuple[Dict, Dict]:
+    """Replace the `custom_fields` array of a stream's schema with one typed
+    property per custom field, and mark them in the metadata."""
+    properties = {
+        name: property_schema
+        for name, property_schema in schema["properties"].items()
+        if name != "custom_fields"
+    }
+    mdata.pop(("properties", "custom_fields"), None)
+    for property_name, (field_name, property_schema) in get_custom_field_schemas(
+        definitions
+    ).items():
+        if property_name in properties:
+            LOGGER.warning(
+                "Custom field %s clashes with property %s, skipping it",
+                field_name,
+                property_name,
+            )
+            continue
+        properties[property_name] = property_schema
+        mdata = metadata.write(mdata, ("properties", property_name), "inclusion", "available")
+        mdata = metadata.write(
+            mdata, ("properties", property_name), CUSTOM_FIELD_NAME_KEY, field_name
+        )
+    mdata = metadata.write(mdata, (), TYPED_CUSTOM_FIELDS_KEY, True)
+    return {**schema, "properties": properties}, mdata
+
+
+def get_custom_field_table(mdata: Dict) -> Optional[List[Tuple[str, str]]]:
+    """Custom field name and property name pairs of the selected custom
+    fields of a stream discovered with typed custom fields, or `None` when
+    its custom fields are kept as a `custom_fields` array."""
+    if not metadata.get(mdata, (), TYPED_CUSTOM_FIELDS_KEY):
+        return None
+    return [
+        (entry[CUSTOM_FIELD_NAME_KEY], breadcrumb[1])
+        for breadcrumb, entry in mdata.items()
+        if len(breadcrumb) == 2
+        and CUSTOM_FIELD_NAME_KEY in entry
+        and entry.get("selected") is not False
+    ]
+
+
+class CustomFieldCache:
+    """Field definitions stored in a local JSON file per account, keyed on
+    the account's API base URL, so that discovery only lists them again
+    once they are older than `ttl` seconds."""
+
+    def __init__(self, path: str, ttl: float = DEFAULT_CUSTOM_FIELDS_CACHE_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                accounts = json.load(file).get("accounts")
+        except (OSError, ValueError, AttributeError):
+            return {}
+        return accounts if isinstance(accounts, dict) else {}
+
+    def get(self, account: str) -> Optional[Dict[str, List[Dict]]]:
+        """Return the cached definitions of `account`, if they are still
+        fresh."""
+        entry = self._read().get(account)
+        if not entry or time.time() - entry.get("stored_at", 0) > self.ttl:
+            return None
+        return entry["definitions"]
+
+    def put(self, account: str, definitions: Dict[str, List[Dict]]) -> None:
+        accounts = self._read()
+        accounts[account] = {"stored_at": time.time(), "definitions": definitions}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a torn file
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump({"accounts": accounts}, file)
+        os.replace(tmp_path, self.path)
+
+
+def get_custom_field_cache(config: Dict[str, Any]) -> Optional[CustomFieldCache]:
+    """Build the field definitions cache when `custom_fields_cache` is set."""
+    path = config.get("custom_fields_cache")
+    if not path:
+        return None
+    ttl = config.get("custom_fields_cache_ttl")
+    return CustomFieldCache(path, float(ttl) if ttl else DEFAULT_CUSTOM_FIELDS_CACHE_TTL)
+
+
+def get_field_definitions(client) -> Dict[str, List[Dict]]:
+    """Field definitions of the account for each stream of `FIELD_ENDPOINTS`,
+    from the cache when it holds fresh ones."""
+    cache = get_custom_field_cache(client.config)
+    definitions = cache.get(client.base_url) if cache else None
+    if definitions is not None:
+        LOGGER.info("Using the custom field definitions cached in %s", cache.path)
+        return definitions
+
+    definitions = {
+        stream_name: client.get(None, {}, {}, path=endpoint)
+        for stream_name, endpoint in FIELD_ENDPOINTS.items()
+    }
+    if cache:
+        cache.put(client.base_url, definitions)
+    return definitions
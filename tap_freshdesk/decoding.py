@@ -0,0 +1,90 @@
+import codecs
+import json
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+JSON_DECODERS = {"json": json.loads}
+if orjson is not None:
+    JSON_DECODERS["orjson"] = orjson.loads
+
+DEFAULT_JSON_DECODER = "orjson" if orjson is not None else "json"
+
+
+def get_json_decoder(name: Optional[str] = None) -> Callable[[bytes], Any]:
+    """Return the function used to decode response bodies.
+
+    `orjson` is used when it is installed, the standard library otherwise. A
+    decoder can be forced with the `json_decoder` config option.
+    """
+    name = name or DEFAULT_JSON_DECODER
+    if name not in JSON_DECODERS:
+        raise ValueError(
+            f"Unsupported json_decoder `{name}`, available: {sorted(JSON_DECODERS)}"
+        )
+    return JSON_DECODERS[name]
+
+
+_WHITESPACE = " \t\n\r"
+
+
+def _skip_whitespace(buffer: str, index: int) -> int:
+    while index < len(buffer) and buffer[index] in _WHITESPACE:
+        index += 1
+    return index
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Incrementally decode a top-level JSON array from a stream of byte
+    chunks, yielding each element as soon as it has been received.
+
+    An element is only accepted once the delimiter that follows it (`,` or
+    `]`) has arrived, so a value cut by a chunk boundary is never yielded
+    early. Only the part of the body that has not been yielded yet is kept
+    in memory.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    index = 0
+    started = finished = False
+
+    for chunk in chunks:
+        buffer = buffer[index:] + text_decoder.decode(chunk)
+        index = 0
+        while not finished:
+            index = _skip_whitespace(buffer, index)
+            if index >= len(buffer):
+                break
+            if not started:
+                if buffer[index] != "[":
+                    raise ValueError("Expected a JSON array in the response body")
+                started = True
+                index += 1
+                continue
+            if buffer[index] == "]":
+                finished = True
+                index += 1
+                break
+            if buffer[index] == ",":
+                index += 1
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                # The element is not complete yet
+                break
+            delimiter = _skip_whitespace(buffer, end)
+            if delimiter >= len(buffer):
+                break
+            if buffer[delimiter] not in ",]":
+                raise ValueError(f"Unexpected character {buffer[delimiter]!r} in JSON array")
+            index = delimiter
+            yield value
+
+    buffer = buffer[index:] + text_decoder.decode(b"", final=True)
+    if not started or not finished or buffer.strip():
+        raise ValueError("Truncated or malformed JSON array in the response body")
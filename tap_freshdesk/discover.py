@@ -1,14 +1,21 @@
 import singer
 from singer import metadata
 from singer.catalog import Catalog, CatalogEntry, Schema
+from tap_freshdesk.custom_fields import get_field_definitions
 from tap_freshdesk.schema import get_schemas
+from tap_freshdesk.utils import config_flag
 
 LOGGER = singer.get_logger()
 
 
-def discover() -> Catalog:
-    """Run the discovery mode, prepare the catalog file and return the catalog."""
-    schemas, field_metadata = get_schemas()
+def discover(client=None) -> Catalog:
+    """Run the discovery mode, prepare the catalog file and return the catalog.
+    With `typed_custom_fields`, the account's custom fields are listed with
+    `client` and become typed properties."""
+    field_definitions = None
+    if client is not None and config_flag(client.config, "typed_custom_fields"):
+        field_definitions = get_field_definitions(client)
+    schemas, field_metadata = get_schemas(field_definitions)
     catalog = Catalog([])
 
     for stream_name, schema_dict in schemas.items():
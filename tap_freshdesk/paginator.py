@@ -0,0 +1,128 @@
+from collections import deque
+from typing import Any, Dict, Iterator, Optional
+
+from singer import get_logger
+
+from tap_freshdesk.client import Client, Page
+from tap_freshdesk.telemetry import endpoint_template
+
+LOGGER = get_logger()
+
+
+class Paginator:
+    """Page-number pagination of a Freshdesk list endpoint.
+    ~~~
+    Iterating a paginator yields the records of every page, starting at
+    `params["page"]`. It stops after an empty page, a page with fewer than
+    `page_size` records, or a full page without a `Link: rel="next"` header
+    on an endpoint that is known to send one. The last rule saves the
+    request for an empty trailing page when the final page is exactly full.
+
+    With the client's `prefetch_pages` set, once a page came back full,
+    that many following pages are requested in the background while the
+    current one is consumed. Listings that fit on their first page, as most
+    child listings do, therefore cost a single request. Requests still
+    pending when pagination stops are cancelled.
+
+    With `max_pages`, iteration stops after that many pages and `truncated`
+    tells whether more pages were left. `memo_version` is handed to the
+    client's request memo, see `Client.use_request_memo`.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        url: str,
+        params: Dict,
+        headers: Dict,
+        path: str = None,
+        page_size: int = 100,
+        use_cache: bool = False,
+        max_pages: Optional[int] = None,
+        memo_version: Optional[str] = None,
+    ) -> None:
+        self.client = client
+        self.url = url
+        self.params = dict(params)
+        self.headers = headers
+        self.path = path
+        self.page_size = page_size
+        self.use_cache = use_cache
+        self.max_pages = max_pages
+        self.memo_version = memo_version
+        self.truncated = False
+        self.template = endpoint_template(url, client.base_url)
+
+    def request_page(self, page_number: int) -> Page:
+        """Requests one page. With `stream_records` enabled its records are
+        decoded while the page is being received."""
+        params = {**self.params, "page": page_number}
+        if self.client.stream_records and not self.use_cache:
+            return self.client.stream_page(self.url, params, self.headers, self.path)
+        return self.client.get_page(
+            self.url,
+            params,
+            self.headers,
+            self.path,
+            use_cache=self.use_cache,
+            memo_version=self.memo_version,
+        )
+
+    def submit_page(self, page_number: int):
+        """Schedules the request of one page and returns its future."""
+        return self.client.submit(
+            self.url,
+            {**self.params, "page": page_number},
+            self.headers,
+            self.path,
+            use_cache=self.use_cache,
+            memo_version=self.memo_version,
+        )
+
+    def has_next_page(self, page: Page, record_count: int) -> bool:
+        if record_count < self.page_size:
+            return False
+        if page.next_url is None and self.client.pagination_stats.sends_links(self.template):
+            self.client.pagination_stats.record_empty_page_avoided(self.template)
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[Any]:
+        depth = self.client.prefetch_pages
+        page_number = self.params.get("page", 1)
+        pending = deque()
+        # Only prefetch once a full page showed that more may follow
+        prefetch = False
+        try:
+            while True:
+                LOGGER.info("Calling Page %s", page_number)
+                if prefetch:
+                    while len(pending) <= depth and not (
+                        self.max_pages and page_number + len(pending) > self.max_pages
+                    ):
+                        pending.append(self.submit_page(page_number + len(pending)))
+                    page = pending.popleft().result()
+                else:
+                    page = self.request_page(page_number)
+                self.client.pagination_stats.record_page(self.template, page.next_url)
+
+                record_count = 0
+                for record in page.records:
+                    record_count += 1
+                    yield record
+
+                if not record_count:
+                    LOGGER.warning("No records found on Page %s", page_number)
+                    break
+
+                if not self.has_next_page(page, record_count):
+                    break
+                if self.max_pages and page_number >= self.max_pages:
+                    self.truncated = True
+                    break
+                page_number += 1
+                prefetch = bool(depth)
+                LOGGER.info("Fetching Page %s", page_number)
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,223 @@
+import fcntl
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+
+# Freshdesk enforces its API limits per account over a one minute window
+RATE_LIMIT_WINDOW = 60
+DEFAULT_RESERVE_RATIO = 0.1
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a `Retry-After` header given either as delta-seconds or as an
+    HTTP-date and return the number of seconds to wait."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def get_header_int(response: requests.Response, name: str) -> Optional[int]:
+    try:
+        return int(response.headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RateLimitGovernor:
+    """Paces API calls using the rate-limit headers sent with every response.
+    ~~~
+    Freshdesk reports the plan limit in `X-RateLimit-Total` and the calls left
+    in the current window in `X-RateLimit-Remaining`. While more than
+    `reserve_ratio` of the budget is left, requests go out without delay. Below
+    that, requests are spaced at the steady plan rate (`window / total`) so the
+    budget refills as fast as it is spent, and once it is exhausted the
+    governor waits for the reserve to refill. A `Retry-After` header holds
+    every request until it expires.
+
+    Decisions are reported as singer counter metrics.
+    """
+
+    def __init__(
+        self,
+        window: float = RATE_LIMIT_WINDOW,
+        reserve_ratio: float = DEFAULT_RESERVE_RATIO,
+    ) -> None:
+        self.window = window
+        self.reserve_ratio = reserve_ratio
+        self.total = None
+        self.remaining = None
+        self._next_request_at = 0.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.throttled_counter = metrics.Counter("rate_limit_throttled_requests")
+        self.wait_counter = metrics.Counter("rate_limit_wait_seconds")
+        self.retry_after_counter = metrics.Counter("rate_limit_retry_after")
+
+    def _interval(self) -> float:
+        """Minimum spacing to keep between two requests given the last known
+        budget."""
+        if not self.total or self.remaining is None:
+            return 0.0
+        reserve = self.total * self.reserve_ratio
+        if self.remaining > reserve:
+            return 0.0
+        steady_interval = self.window / self.total
+        if self.remaining <= 0:
+            return steady_interval * max(reserve, 1)
+        return steady_interval
+
+    def reserve(self) -> float:
+        """Claim the next send slot and return how many seconds the caller
+        must wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_request_at, self._blocked_until)
+            self._next_request_at = send_at + self._interval()
+            delay = send_at - now
+            if delay > 0:
+                self.throttled_counter.increment()
+                self.wait_counter.increment(delay)
+        return delay
+
+    def wait(self) -> float:
+        """Block until the next request may be sent and return the number of
+        seconds slept."""
+        delay = self.reserve()
+        if delay > 0:
+            LOGGER.debug("Rate limit governor sleeping for %.2f seconds", delay)
+            time.sleep(delay)
+        return delay
+
+    def update(self, response: requests.Response) -> None:
+        """Record the budget reported by a response."""
+        total = get_header_int(response, "X-RateLimit-Total")
+        remaining = get_header_int(response, "X-RateLimit-Remaining")
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+        with self._lock:
+            if total is not None:
+                self.total = total
+            if remaining is not None:
+                self.remaining = remaining
+            if retry_after is not None:
+                self._blocked_until = max(
+                    self._blocked_until, time.monotonic() + retry_after
+                )
+                self.retry_after_counter.increment()
+                LOGGER.warning(
+                    "Rate limit reached, holding requests for %s seconds", retry_after
+                )
+
+    def close(self) -> None:
+        """Flush the governor metrics."""
+        for counter in (
+            self.throttled_counter,
+            self.wait_counter,
+            self.retry_after_counter,
+        ):
+            counter.__exit__(None, None, None)
+
+
+class SharedTokenBucket:
+    """A token bucket persisted in a lock file so that every tap process on a
+    host pointing at the same file shares one request budget.
+    ~~~
+    The file holds the number of available tokens and the time they were last
+    refilled. Each request takes an exclusive `flock` on the file, refills the
+    bucket for the time elapsed since the last update and consumes one token,
+    or releases the lock and sleeps until a token is due.
+
+    To keep every sliding minute within `requests_per_minute`, the bucket holds
+    a burst of a tenth of the budget and refills at the remaining rate.
+    """
+
+    def __init__(self, path: str, requests_per_minute: float) -> None:
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be greater than zero.")
+        self.path = path
+        self.capacity = max(1.0, float(int(requests_per_minute // 10)))
+        self.refill_rate = max(requests_per_minute - self.capacity, 1.0) / RATE_LIMIT_WINDOW
+        self._lock = threading.Lock()
+        self.wait_counter = metrics.Counter("shared_rate_limit_wait_seconds")
+
+    def _read(self, file) -> tuple:
+        file.seek(0)
+        content = file.read().split()
+        try:
+            return float(content[0]), float(content[1])
+        except (IndexError, ValueError):
+            return self.capacity, time.time()
+
+    def _write(self, file, tokens: float, updated_at: float) -> None:
+        file.seek(0)
+        file.truncate()
+        file.write(f"{tokens} {updated_at}")
+        file.flush()
+
+    def _try_consume(self) -> float:
+        """Take a token if one is available. Returns 0 on success, otherwise
+        the number of seconds until the next token is due."""
+        with open(self.path, "a+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                tokens, updated_at = self._read(file)
+                now = time.time()
+                tokens = min(
+                    self.capacity,
+                    tokens + max(now - updated_at, 0.0) * self.refill_rate,
+                )
+                # Tolerate float rounding so a full refill is never short of a token
+                if tokens >= 1 - 1e-9:
+                    self._write(file, max(tokens - 1, 0.0), now)
+                    return 0.0
+                self._write(file, tokens, now)
+                return (1 - tokens) / self.refill_rate
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def acquire(self) -> float:
+        """Block until a token is consumed and return the seconds slept."""
+        waited = 0.0
+        with self._lock:
+            while True:
+                delay = self._try_consume()
+                if not delay:
+                    break
+                time.sleep(delay)
+                waited += delay
+            if waited:
+                self.wait_counter.increment(waited)
+        return waited
+
+    def close(self) -> None:
+        """Flush the bucket metrics."""
+        self.wait_counter.__exit__(None, None, None)
+
+
+def get_shared_rate_limiter(config) -> Optional[SharedTokenBucket]:
+    """Build the cross-process rate limiter selected in the config, if any."""
+    path = config.get("rate_limit_file")
+    if not path:
+        return None
+    requests_per_minute = config.get("rate_limit_per_minute")
+    if not requests_per_minute:
+        raise ValueError(
+            "`rate_limit_per_minute` is required when `rate_limit_file` is set."
+        )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return SharedTokenBucket(path, float(requests_per_minute))
@@ -1,8 +1,9 @@
 import os
 import json
 import singer
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 from singer import metadata
+from tap_freshdesk.custom_fields import add_custom_field_properties
 from tap_freshdesk.streams import STREAMS
 
 LOGGER = singer.get_logger()
@@ -33,9 +34,10 @@ def load_schema_references() -> Dict:
     return refs
 
 
-def get_schemas() -> Tuple[Dict, Dict]:
+def get_schemas(field_definitions: Dict[str, List[Dict]] = None) -> Tuple[Dict, Dict]:
     """Load the schema references, prepare metadata for each streams and return
-    schema and metadata for the catalog."""
+    schema and metadata for the catalog. The custom fields of the streams in
+    `field_definitions` are flattened into typed properties."""
     schemas = {}
     field_metadata = {}
 
@@ -64,6 +66,12 @@ def get_schemas() -> Tuple[Dict, Dict]:
                     mdata, ("properties", field_name), "inclusion", "automatic"
                 )
 
+        if field_definitions and stream_name in field_definitions:
+            schema, mdata = add_custom_field_properties(
+                schema, mdata, field_definitions[stream_name]
+            )
+            schemas[stream_name] = schema
+
         mdata = metadata.to_list(mdata)
         field_metadata[stream_name] = mdata
 
@@ -0,0 +1,189 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+from singer import get_logger
+from singer.utils import strptime_to_utc
+
+from tap_freshdesk.concurrency import BackgroundIterator
+from tap_freshdesk.utils import strftime
+
+LOGGER = get_logger()
+
+# Freshdesk does not serve list pages past this depth, deeper listings are
+# restarted from the last timestamp reached
+MAX_LIST_PAGES = 300
+DEFAULT_SHARD_MAX_RECORDS = 10000
+MIN_SHARD_SECONDS = 60
+SHARD_BUFFER_PAGES = 2
+
+
+def _truncate(value: datetime) -> datetime:
+    return value.replace(microsecond=0)
+
+
+class Shard:
+    """The `[start, end)` window of a sharded listing. The last shard has no
+    `end` and runs up to the newest record."""
+
+    def __init__(self, start: datetime, end: Optional[datetime]) -> None:
+        self.start = start
+        self.end = end
+        self.iterator = None
+
+    def __repr__(self) -> str:
+        return f"Shard({strftime(self.start)}, {self.end and strftime(self.end)})"
+
+
+class ShardedListing:
+    """Lists the records of a stream, ordered by its replication key from
+    `since` to now, as time windows fetched concurrently.
+    ~~~
+    The window is first split into `shards` equal shards. Each shard lists
+    the endpoint with `updated_since` set to its start and stops at the
+    first record reaching the start of the next shard. When the first page
+    of a shard shows it holds more than `max_records` records, the rest of
+    the shard is split further, so dense periods get more and shorter
+    shards than quiet ones. Listings deeper than `MAX_LIST_PAGES` pages are
+    restarted from the last timestamp reached.
+
+    Shards are fetched by up to `workers` threads through the client, and
+    so under its rate limiting, into buffers of `SHARD_BUFFER_PAGES` pages.
+    Records are yielded shard after shard on the consumer's thread, in the
+    same order as a single listing.
+    """
+
+    def __init__(
+        self,
+        stream,
+        url: str,
+        params: Dict,
+        since: str,
+        shards: int,
+        max_records: int = DEFAULT_SHARD_MAX_RECORDS,
+        workers: int = 1,
+    ) -> None:
+        self.stream = stream
+        self.url = url
+        self.params = params
+        self.key = stream.replication_keys[0]
+        self.max_records = max_records
+        self.workers = workers
+        self.until = _truncate(datetime.now(timezone.utc))
+        self.shards = self.plan(_truncate(strptime_to_utc(since)), shards)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def plan(self, start: datetime, count: int) -> List[Shard]:
+        """Split `[start, until)` into `count` shards of equal duration."""
+        step = (self.until - start) / max(count, 1)
+        bounds = [start]
+        for index in range(1, count):
+            bound = _truncate(start + step * index)
+            if (bound - bounds[-1]).total_seconds() >= MIN_SHARD_SECONDS:
+                bounds.append(bound)
+        return [
+            Shard(bound, bounds[index + 1] if index + 1 < len(bounds) else None)
+            for index, bound in enumerate(bounds)
+        ]
+
+    def _start(self, shard: Shard) -> None:
+        shard.iterator = BackgroundIterator(
+            lambda: self._iter_shard(shard),
+            maxsize=SHARD_BUFFER_PAGES * self.stream.page_size,
+        )
+        shard.iterator.submit(self._executor)
+
+    def _split(self, shard: Shard, reached: datetime) -> None:
+        """Split the part of `shard` after `reached` according to the record
+        density of its first page."""
+        end = shard.end or self.until
+        covered = (reached - shard.start).total_seconds()
+        remaining = (end - reached).total_seconds()
+        estimate = self.stream.page_size * (end - shard.start).total_seconds() / max(covered, 1)
+        pieces = min(math.ceil(estimate / self.max_records), self.workers + 1)
+        if pieces < 2 or remaining < MIN_SHARD_SECONDS * pieces:
+            return
+
+        step = timedelta(seconds=remaining / pieces)
+        bounds = [_truncate(reached + step * index) for index in range(1, pieces)]
+        new_shards = [
+            Shard(bound, bounds[index + 1] if index + 1 < len(bounds) else shard.end)
+            for index, bound in enumerate(bounds)
+        ]
+        with self._lock:
+            if self._executor is None:
+                return
+            shard.end = bounds[0]
+            position = self.shards.index(shard) + 1
+            self.shards[position:position] = new_shards
+            for new_shard in new_shards:
+                self._start(new_shard)
+        LOGGER.info("Split %s into %s more shards", shard, len(new_shards))
+
+    def _iter_shard(self, shard: Shard) -> Iterator[Dict]:
+        since, seen_at_since, first_listing = shard.start, set(), True
+        while True:
+            paginator = self.stream.paginator_class(
+                self.stream.client,
+                self.url,
+                {
+                    **self.params,
+                    "updated_since": strftime(since),
+                    "per_page": self.stream.page_size,
+                    "page": 1,
+                },
+                self.stream.headers,
+                self.stream.path,
+                page_size=self.stream.page_size,
+                max_pages=MAX_LIST_PAGES,
+            )
+            last, seen_at_last, count = since, set(), 0
+            for record in paginator:
+                timestamp = strptime_to_utc(record[self.key])
+                if shard.end and timestamp >= shard.end:
+                    return
+                count += 1
+                if first_listing and count == self.stream.page_size:
+                    self._split(shard, timestamp)
+                if timestamp == since and record["id"] in seen_at_since:
+                    # Already yielded before the listing was restarted
+                    continue
+                if timestamp != last:
+                    last, seen_at_last = timestamp, set()
+                seen_at_last.add(record["id"])
+                yield record
+
+            if not paginator.truncated:
+                return
+            if last == since:
+                raise RuntimeError(
+                    f"More than {MAX_LIST_PAGES} pages of records updated at {strftime(since)}"
+                )
+            since, seen_at_since, first_listing = last, seen_at_last, False
+
+    def __iter__(self) -> Iterator[Dict]:
+        LOGGER.info("Listing %s in %s shards", self.stream.tap_stream_id, len(self.shards))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="freshdesk-shard"
+        )
+        with self._lock:
+            for shard in self.shards:
+                self._start(shard)
+        try:
+            index = 0
+            while True:
+                with self._lock:
+                    if index >= len(self.shards):
+                        break
+                    shard = self.shards[index]
+                yield from shard.iterator
+                index += 1
+        finally:
+            with self._lock:
+                executor, self._executor = self._executor, None
+                for shard in self.shards:
+                    shard.iterator.close()
+            executor.shutdown(wait=True, cancel_futures=True)
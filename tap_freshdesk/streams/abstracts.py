@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Tuple, List
-import copy
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, List
 
 from singer import (
     metadata,
@@ -14,8 +16,25 @@ from singer import (
 )
 from singer.utils import strftime, strptime_to_utc
 
+from tap_freshdesk.child_index import get_child_sync_index
+from tap_freshdesk.child_queue import (
+    DEFAULT_CHILD_QUEUE_SIZE,
+    ChildStage,
+    ChildWorkQueue,
+    get_child_work_queue,
+)
+from tap_freshdesk.concurrency import BackgroundIterator, imap_ordered
+from tap_freshdesk.custom_fields import get_custom_field_table
+from tap_freshdesk.paginator import Paginator
+from tap_freshdesk.sharding import DEFAULT_SHARD_MAX_RECORDS, ShardedListing
+from tap_freshdesk.transform import RecordTransform, normalize_bookmark, normalize_datetime
+from tap_freshdesk.utils import batched, config_flag
+
 LOGGER = get_logger()
 
+FILTER_PASS_BUFFER_PAGES = 2
+DEFAULT_BULK_CHILD_LOOKBACK_DAYS = 7
+
 
 class BaseStream(ABC):
     """A Base Class providing structure and boilerplate for generic streams
@@ -35,12 +54,16 @@ class BaseStream(ABC):
     children = []
     parent = ""
     bookmark_value = None
+    use_response_cache = False
+    paginator_class = Paginator
 
     def __init__(self, client=None, catalog=None) -> None:
         self.client = client
         self.catalog = catalog
         self.schema = catalog.schema.to_dict()
         self.metadata = metadata.to_map(catalog.metadata)
+        self.record_transform = RecordTransform(self.schema, self.metadata)
+        self.custom_field_table = get_custom_field_table(self.metadata)
         self.child_to_sync = []
         self.params = {}
 
@@ -107,32 +130,28 @@ class BaseStream(ABC):
          - https://github.com/singer-io/getting-started/blob/master/docs/SYNC_MODE.md
         """
 
+    def get_params(self, state: Dict = None) -> Dict:
+        """Query params of the listing, other than the page params."""
+        return dict(self.params)
+
+    def paginate(
+        self, extraction_url: str, params: Dict, memo_version: Optional[str] = None
+    ) -> Paginator:
+        """Returns the stream's paginator over `extraction_url`."""
+        return self.paginator_class(
+            self.client,
+            extraction_url,
+            {**params, "per_page": self.page_size, "page": 1},
+            self.headers,
+            self.path,
+            page_size=self.page_size,
+            use_cache=self.use_response_cache and self.client.response_cache is not None,
+            memo_version=memo_version,
+        )
+
     def get_records(self) -> List:
         """Interacts with api client interaction and pagination."""
-        extraction_url = self.url_endpoint
-        page_count = 1
-
-        # Set initial params
-        self.params.update({"per_page": self.page_size, "page": page_count})
-
-        while True:
-            LOGGER.info("Calling Page %s", page_count)
-            response = self.client.get(
-                extraction_url, self.params, self.headers, self.path
-            )
-            raw_records = response
-
-            if not raw_records:
-                LOGGER.warning("No records found on Page %s", page_count)
-                break
-            yield from raw_records
-
-            if len(raw_records) == self.page_size:
-                LOGGER.info("Fetching Page %s", page_count)
-                page_count += 1
-                self.params["page"] = page_count
-            else:
-                break
+        yield from self.paginate(self.url_endpoint, self.get_params())
 
     def write_schema(self):
         """Write a schema message."""
@@ -171,6 +190,52 @@ class BaseStream(ABC):
             result.append({key_field: key, value_field: value})
         return result
 
+    def iter_pages(self, records: Iterable[Dict]) -> Iterator[List[Dict]]:
+        """Groups `records` into pages of `page_size` for the page-batched
+        transform. With `stream_records`, records are handed on one at a
+        time instead, so they are still written while their page is being
+        received."""
+        return batched(records, 1 if self.client.stream_records else self.page_size)
+
+    def modify_page(self, records: List[Dict], parent_record: Dict = None) -> List[Dict]:
+        """`modify_object` over a page of records. Unless the stream overrides
+        `modify_object`, the `object_to_id` fields are flattened one field at
+        a time across the page."""
+        if type(self).modify_object is not BaseStream.modify_object:
+            return [self.modify_object(record, parent_record) for record in records]
+        for key in self.object_to_id:
+            id_key = key + "_id"
+            for record in records:
+                value = record[key]
+                record[id_key] = None if value is None else value["id"]
+        return records
+
+    def modify_page_custom_fields(self, records: List[Dict]) -> List[Dict]:
+        """Turns the `custom_fields` object of each record of a page into name
+        and value pairs, as `modify_object_custom_fields` with
+        `force_to_string`. When the stream was discovered with typed custom
+        fields, the selected ones are moved to their own properties instead."""
+        if self.custom_field_table is not None:
+            for record in records:
+                values = record.pop("custom_fields", None) or {}
+                for field_name, property_name in self.custom_field_table:
+                    record[property_name] = values.get(field_name)
+            return records
+        for record in records:
+            if "custom_fields" in record:
+                record["custom_fields"] = [
+                    {"name": key, "value": str(value).lower()}
+                    for key, value in record["custom_fields"].items()
+                ]
+        return records
+
+    def transform_page(
+        self, transformer: Transformer, records: List[Dict]
+    ) -> Iterator[Tuple[Dict, Dict]]:
+        """Pairs each record of a page with its transformed copy, the copies
+        being converted a field at a time across the page."""
+        return zip(records, self.record_transform.transform_page(transformer, records))
+
     def get_url_endpoint(self, parent_obj: Dict = None) -> str:
         """Get the URL endpoint for the stream"""
         return self.url_endpoint
@@ -179,6 +244,12 @@ class BaseStream(ABC):
 class IncrementalStream(BaseStream):
     """Base Class for Incremental Stream."""
 
+    def __init__(self, client=None, catalog=None) -> None:
+        super().__init__(client, catalog)
+        self.discarded_counter = metrics.Counter(
+            "records_discarded_before_transform", {metrics.Tag.endpoint: self.tap_stream_id}
+        )
+
     replication_method = "INCREMENTAL"
     forced_replication_method = "INCREMENTAL"
     config_start_key = "start_date"
@@ -208,49 +279,27 @@ class IncrementalStream(BaseStream):
         value = max(current_bookmark, value)
         return write_bookmark(state, stream, key or self.replication_keys[0], value)
 
+    def get_params(self, state: Dict = None) -> Dict:
+        """Query params of the listing, filtered on the stream's bookmark."""
+        return {**self.params, "updated_since": self.get_bookmark(state, self.tap_stream_id)}
+
     def get_records(self, state: Dict) -> List:
         """Interacts with api client interaction and pagination."""
-        extraction_url = self.url_endpoint
-        page_count = 1
-
-        # Set initial params
-        if self.tap_stream_id in [
-            "conversations",
-            "satisfaction_ratings",
-            "time_entries",
-        ]:
-            self.params = {"per_page": self.page_size, "page": page_count}
-        elif self.tap_stream_id == "tickets":
-            self.params.update({"per_page": self.page_size, "page": page_count})
-        else:
-            # Fetch the bookmark for incremental sync
-            updated_since = self.get_bookmark(state, self.tap_stream_id)
-            self.params.update(
-                {
-                    "per_page": self.page_size,
-                    "updated_since": updated_since,
-                    "page": page_count,
-                }
-            )
-
-        while True:
-            LOGGER.info("Calling Page %s", page_count)
-            response = self.client.get(
-                extraction_url, self.params, self.headers, self.path
-            )
-            raw_records = response
-
-            if not raw_records:
-                LOGGER.warning("No records found on Page %s", page_count)
-                break
-            yield from raw_records
-
-            if len(raw_records) == self.page_size:
-                LOGGER.info("Fetching Page %s", page_count)
-                page_count += 1
-                self.params["page"] = page_count
-            else:
-                break
+        yield from self.paginate(self.url_endpoint, self.get_params(state))
+
+    def is_before_bookmark(self, record: Dict, bookmark_date: str) -> bool:
+        """Whether the raw replication key of `record` is older than
+        `bookmark_date`, so the record can be discarded without being
+        transformed. Values that are not plain UTC timestamps are left for
+        the comparison after the transform."""
+        record_timestamp = normalize_datetime(record.get(self.replication_keys[0]))
+        if record_timestamp is None:
+            return False
+        bookmark_timestamp = normalize_bookmark(bookmark_date)
+        if bookmark_timestamp is None or record_timestamp >= bookmark_timestamp:
+            return False
+        self.discarded_counter.increment()
+        return True
 
     def sync(
         self,
@@ -263,29 +312,27 @@ class IncrementalStream(BaseStream):
         current_max_bookmark_date = bookmark_date
         self.url_endpoint = self.get_url_endpoint(parent_obj)
 
-        with metrics.record_counter(self.tap_stream_id) as counter:
-            for record in self.get_records(state):
-                record = self.modify_object(record, parent_obj)
-                if "custom_fields" in record:
-                    record["custom_fields"] = self.modify_object_custom_fields(
-                        record["custom_fields"], force_to_string=True
-                    )
-                transformed_record = transformer.transform(
-                    copy.deepcopy(record), self.schema, self.metadata
-                )
-
-                record_timestamp = transformed_record[self.replication_keys[0]]
-                if record_timestamp >= bookmark_date:
-                    write_record(self.tap_stream_id, transformed_record)
-                    current_max_bookmark_date = max(
-                        current_max_bookmark_date, record_timestamp
-                    )
-                    counter.increment()
-
-                    for child in self.child_to_sync:
-                        child.sync(
-                            state=state, transformer=transformer, parent_obj=record
+        with metrics.record_counter(self.tap_stream_id) as counter, self.discarded_counter:
+            for page in self.iter_pages(self.get_records(state)):
+                page = [
+                    record
+                    for record in page
+                    if not self.is_before_bookmark(record, bookmark_date)
+                ]
+                page = self.modify_page_custom_fields(self.modify_page(page, parent_obj))
+                for record, transformed_record in self.transform_page(transformer, page):
+                    record_timestamp = transformed_record[self.replication_keys[0]]
+                    if record_timestamp >= bookmark_date:
+                        write_record(self.tap_stream_id, transformed_record)
+                        current_max_bookmark_date = max(
+                            current_max_bookmark_date, record_timestamp
                         )
+                        counter.increment()
+
+                        for child in self.child_to_sync:
+                            child.sync(
+                                state=state, transformer=transformer, parent_obj=record
+                            )
 
             state = self.write_bookmark(state, self.tap_stream_id, value=current_max_bookmark_date)
             return counter.value
@@ -298,6 +345,9 @@ class FullTableStream(BaseStream):
     forced_replication_method = "FULL_TABLE"
     valid_replication_keys = None
     replication_keys = None
+    # Agents, groups and roles rarely change, pages are revalidated with
+    # conditional requests instead of being downloaded again
+    use_response_cache = True
 
     total_records = 0
 
@@ -305,17 +355,51 @@ class FullTableStream(BaseStream):
         """Abstract implementation for `type: Fulltable` stream."""
         self.url_endpoint = self.get_url_endpoint()
         with metrics.record_counter(self.tap_stream_id) as counter:
-            for record in self.get_records():
-                transformed_record = transformer.transform(
-                    record, self.schema, self.metadata
-                )
-                write_record(self.tap_stream_id, transformed_record)
-                counter.increment()
+            for page in self.iter_pages(self.get_records()):
+                for _, transformed_record in self.transform_page(transformer, page):
+                    write_record(self.tap_stream_id, transformed_record)
+                    counter.increment()
             return counter.value
 
 class ParentBaseStream(IncrementalStream):
     """Base Class for Parent Stream."""
 
+    filter_values = [{}, {"filter": "spam"}, {"filter": "deleted"}]
+    # Objects the listing can embed in every record with `include`, each in
+    # the property of the same name
+    embeds = ("requester", "company", "stats")
+
+    def get_params(self, state: Dict = None) -> Dict:
+        """Query params set by `sync` for the current filter pass."""
+        return dict(self.params)
+
+    def get_records(self, state: Dict) -> List:
+        """Lists the records of the current filter pass."""
+        yield from self.list_records(self.get_params(state))
+
+    def list_records(self, params: Dict) -> Iterator[Dict]:
+        """Lists the records matching `params`, as concurrently fetched time
+        shards when `ticket_shards` is set."""
+        shards = int(self.client.config.get("ticket_shards") or 0)
+        if shards < 2:
+            yield from self.paginate(self.url_endpoint, params)
+            return
+
+        params = dict(params)
+        since = params.pop("updated_since")
+        yield from ShardedListing(
+            self,
+            self.url_endpoint,
+            params,
+            since,
+            shards,
+            max_records=int(
+                self.client.config.get("ticket_shard_max_records")
+                or DEFAULT_SHARD_MAX_RECORDS
+            ),
+            workers=self.client.max_concurrent_requests,
+        )
+
     def get_bookmark(self, state: Dict, stream: str, key: Any = None) -> int:
         """A wrapper for singer.get_bookmark to deal with compatibility for
         bookmark values or start values."""
@@ -362,6 +446,111 @@ class ParentBaseStream(IncrementalStream):
 
         return state
 
+    def iter_transformed(
+        self, records: Iterable[Dict], transformer: Transformer, bookmark_date: str
+    ) -> Iterator[Tuple[Dict, Dict]]:
+        """Yields each record and its transformed copy, skipping the records
+        older than `bookmark_date`."""
+        for page in self.iter_pages(records):
+            page = [
+                record for record in page if not self.is_before_bookmark(record, bookmark_date)
+            ]
+            self.modify_page_custom_fields(page)
+            for record, transformed_record in self.transform_page(transformer, page):
+                if transformed_record[self.replication_keys[0]] >= bookmark_date:
+                    yield record, transformed_record
+
+    def get_includes(self, children: List["ChildBaseStream"], skip_inactive: bool) -> List[str]:
+        """Embeds to request with the listing: the selected properties among
+        `embeds` when the stream itself is selected, and the ones the
+        `children` read to skip their fetches."""
+        includes = set()
+        if self.is_selected():
+            includes.update(
+                name
+                for name in self.embeds
+                if metadata.get(self.metadata, ("properties", name), "selected") is not False
+                and metadata.get(self.metadata, ("properties", name), "inclusion") != "unsupported"
+            )
+        if skip_inactive:
+            for child in children:
+                includes.update(child.get_parent_includes())
+        return [name for name in self.embeds if name in includes]
+
+    def log_includes(self, includes: List[str], skipped: Dict["ChildBaseStream", int]) -> None:
+        """Logs what the embeds of the listing saved: the per-record child
+        requests `skipped` from them, and the time those requests take at
+        their median latency, next to the bytes of the listing pages, from
+        the client's request and transfer stats."""
+        totals = self.client.transfer_stats.totals([self.path])
+        if not totals["responses"]:
+            return
+        latencies = self.client.request_stats.summary()
+        saved_ms = sum(
+            count * latencies.get(child.path, {}).get("p50_ms", 0)
+            for child, count in skipped.items()
+        )
+        LOGGER.info(
+            "Listed %s with include=%s, leaving out %s: %s bytes in %s pages,"
+            " %s child requests skipped (about %.0f ms)",
+            self.tap_stream_id,
+            ",".join(includes),
+            ",".join(name for name in self.embeds if name not in includes),
+            totals["decoded_bytes"],
+            totals["responses"],
+            sum(skipped.values()),
+            saved_ms,
+        )
+
+    def get_filter_key(self, value: Dict) -> str:
+        """Bookmark key of a filter pass."""
+        if value:
+            return self.tap_stream_id + "_" + value["filter"]
+        return self.tap_stream_id  # Default key when value is None or empty
+
+    def iter_filter_passes(self, state: Dict) -> Iterator[Tuple[str, Any, Iterable[Dict]]]:
+        """Yields the bookmark key, the bookmark and the records of each
+        filter pass, in the order of `filter_values`.
+        ~~~
+        With `concurrent_ticket_filters` enabled, every pass is listed on its
+        own thread as soon as the sync starts, into a buffer of
+        `FILTER_PASS_BUFFER_PAGES` pages, and the bookmarks of all passes are
+        read up front. Otherwise each pass is listed once the previous one
+        has been processed.
+        """
+        if not config_flag(self.client.config, "concurrent_ticket_filters"):
+            for value in self.filter_values:
+                ticket_key = self.get_filter_key(value)
+                bookmark_date = self.get_bookmark(state, ticket_key)
+                yield ticket_key, bookmark_date, self.list_records(
+                    {**self.params, "updated_since": bookmark_date, **value}
+                )
+            return
+
+        passes = []
+        for value in self.filter_values:
+            ticket_key = self.get_filter_key(value)
+            bookmark_date = self.get_bookmark(state, ticket_key)
+            # Each pass gets its own params, bound now rather than when listed
+            params = {**self.params, "updated_since": bookmark_date, **value}
+            records = BackgroundIterator(
+                lambda params=params: self.list_records(params),
+                maxsize=FILTER_PASS_BUFFER_PAGES * self.page_size,
+            )
+            passes.append((ticket_key, bookmark_date, records))
+
+        executor = ThreadPoolExecutor(
+            max_workers=len(passes), thread_name_prefix="freshdesk-filter"
+        )
+        try:
+            for _, _, records in passes:
+                records.submit(executor)
+            yield from passes
+        finally:
+            for _, _, records in passes:
+                records.close()
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def sync(
     self,
     state: Dict,
@@ -371,67 +560,219 @@ class ParentBaseStream(IncrementalStream):
         """Implementation for `type: Incremental` stream."""
         self.url_endpoint = self.get_url_endpoint(parent_obj)
 
+        # Sync only selected child streams, the ones with an account-wide
+        # listing are synced from it once instead of for every record
+        children = []
+        for child in self.child_to_sync:
+            if not self.is_child_selected(child):
+                continue
+            if child.use_bulk_listing():
+                child.sync_bulk(state, transformer)
+            else:
+                children.append(child)
+        if not children and not self.is_selected():
+            # Only children with an account-wide listing were selected
+            return 0
+
+        with ExitStack() as stores:
+            # The child sync stores are opened for this sync only
+            sync_index = get_child_sync_index(self.client.config) if children else None
+            work_queue = get_child_work_queue(self.client.config) if children else None
+            for store in (sync_index, work_queue):
+                if store:
+                    stores.enter_context(store)
+            for child in children:
+                child.sync_index = sync_index
+            return self.sync_records(state, transformer, children, work_queue)
+
+    def sync_records(
+        self,
+        state: Dict,
+        transformer: Transformer,
+        children: List["ChildBaseStream"],
+        work_queue: Optional[ChildWorkQueue],
+    ) -> int:
+        """Writes the new records of every filter pass and syncs their
+        `children`, through `work_queue` when one is configured."""
+        skip_inactive = config_flag(self.client.config, "skip_inactive_children")
+        for child in children:
+            child.reset_sync_index(state)
+            if skip_inactive and child.uses_activity_stats():
+                LOGGER.warning(
+                    "%s is set: %s changes that do not move the %s of the %s stats"
+                    " are not synced",
+                    child.activity_stats_flag,
+                    child.tap_stream_id,
+                    "/".join(child.activity_stats),
+                    self.tap_stream_id,
+                )
+        includes = self.get_includes(children, skip_inactive)
+
         # Set initial parameters for API call
-        self.params.update(
-            {
-                "order_by": self.replication_keys[0],
-                "order_type": "asc",
-                "include": "requester,company,stats",
-            }
+        self.params.update({"order_by": self.replication_keys[0], "order_type": "asc"})
+        self.params.pop("include", None)
+        if includes:
+            self.params["include"] = ",".join(includes)
+        workers = int(self.client.config.get("child_fetch_concurrency") or 0)
+        if work_queue:
+            # Queued child work is always fetched off this thread
+            workers = max(workers, 1)
+        executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="freshdesk-child")
+            if children and (workers > 1 or work_queue)
+            else None
         )
 
-        with metrics.record_counter(self.tap_stream_id) as counter:
-            filter_values = [{}, {"filter": "spam"}, {"filter": "deleted"}]
-            for value in filter_values:
-                if value:
-                    ticket_key = self.tap_stream_id + "_" + value["filter"]
-                else:
-                    ticket_key = (
-                        self.tap_stream_id
-                    )  # Default key when value is None or empty
-                current_max_bookmark_date = bookmark_date = updated_since = (
-                    self.get_bookmark(state, ticket_key)
-                )
-                self.params.update({"updated_since": updated_since})
-                self.params.update(**value)
-                for record in self.get_records(state):
-                    if "custom_fields" in record:
-                        record["custom_fields"] = self.modify_object_custom_fields(
-                            record["custom_fields"], force_to_string=True
-                        )
-                    transformed_record = transformer.transform(
-                        record, self.schema, self.metadata
-                    )
+        fetched_counters = {
+            child: metrics.Counter("child_fetches", {metrics.Tag.endpoint: child.tap_stream_id})
+            for child in children
+        }
+        skipped_counters = {
+            child: metrics.Counter(
+                "child_fetches_skipped", {metrics.Tag.endpoint: child.tap_stream_id}
+            )
+            for child in children
+        }
+        # Fetches skipped from the embeds of the listing, for `log_includes`
+        skipped_by_includes = {child: 0 for child in children}
+
+        def plan_children(new_records):
+            # Runs on this thread, the children to skip are decided from the
+            # bookmarks before any fetch is submitted
+            for record, transformed_record in new_records:
+                skipped = set()
+                for child in children:
+                    if child.is_synced(state, record):
+                        skipped.add(child)
+                    elif skip_inactive and not child.may_have_changed(
+                        record, child.get_cutoff(state, record)
+                    ):
+                        skipped.add(child)
+                        skipped_by_includes[child] += 1
+                yield record, transformed_record, skipped
+
+        def fetch_children(item):
+            record, _, skipped = item
+            return [None if child in skipped else child.fetch(record) for child in children]
+
+        def emit_child(child, record, records_of_child, cutoff=None):
+            # `None` stands for a skipped fetch
+            if records_of_child is None:
+                skipped_counters[child].increment()
+                records_of_child = []
+            else:
+                fetched_counters[child].increment()
+            child.emit(state, transformer, record, records_of_child, cutoff)
+            child.mark_synced(state, record)
+
+        child_stage = (
+            ChildStage(
+                work_queue,
+                executor,
+                emit_child,
+                max_pending=int(
+                    self.client.config.get("child_queue_size") or DEFAULT_CHILD_QUEUE_SIZE
+                ),
+            )
+            if work_queue
+            else None
+        )
 
-                    record_timestamp = transformed_record[self.replication_keys[0]]
-                    if record_timestamp >= bookmark_date:
-                        # Only write parent records if parent is selected
-                        if self.is_selected():
-                            write_record(self.tap_stream_id, transformed_record)
-                            counter.increment()
+        try:
+            with metrics.record_counter(self.tap_stream_id) as counter:
 
-                        # Sync only selected child streams
-                        for child in self.child_to_sync:
-                            if self.is_child_selected(child):
-                                child.sync(
-                                    state=state,
-                                    transformer=transformer,
-                                    parent_obj=record
-                                )
+                def write_parent(transformed_record):
+                    # Only write parent records if parent is selected
+                    if self.is_selected():
+                        write_record(self.tap_stream_id, transformed_record)
+                        counter.increment()
 
-                        current_max_bookmark_date = max(
-                            current_max_bookmark_date, record_timestamp
-                        )
+                if child_stage:
+                    child_stage.resume({child.tap_stream_id: child for child in children})
 
-                state = self.write_bookmark(
-                    state, ticket_key, value=current_max_bookmark_date
-                )
-            return counter.value
+                for ticket_key, bookmark_date, records in self.iter_filter_passes(state):
+                    current_max_bookmark_date = bookmark_date
+                    new_records = plan_children(
+                        self.iter_transformed(records, transformer, bookmark_date)
+                    )
+                    if child_stage:
+                        # Children are queued and written once fetched, the
+                        # listing does not wait for them
+                        for record, transformed_record, skipped in new_records:
+                            write_parent(transformed_record)
+                            for child in children:
+                                if child in skipped:
+                                    emit_child(child, record, None)
+                                else:
+                                    child_stage.push(
+                                        child,
+                                        record,
+                                        child.get_category_suffix(record),
+                                        child.get_cutoff(state, record),
+                                    )
+                            current_max_bookmark_date = max(
+                                current_max_bookmark_date,
+                                transformed_record[self.replication_keys[0]],
+                            )
+                        child_stage.drain()
+                    else:
+                        for (record, transformed_record, _), child_records in imap_ordered(
+                            fetch_children, new_records, executor, window=2 * workers
+                        ):
+                            write_parent(transformed_record)
+                            for child, records_of_child in zip(children, child_records):
+                                emit_child(child, record, records_of_child)
+                            current_max_bookmark_date = max(
+                                current_max_bookmark_date,
+                                transformed_record[self.replication_keys[0]],
+                            )
+
+                    state = self.write_bookmark(
+                        state, ticket_key, value=current_max_bookmark_date
+                    )
+                self.log_includes(includes, skipped_by_includes)
+                return counter.value
+        finally:
+            if child_stage:
+                child_stage.close()
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+            for stream_counter in [
+                self.discarded_counter,
+                *(child.discarded_counter for child in children),
+                *fetched_counters.values(),
+                *skipped_counters.values(),
+            ]:
+                stream_counter.__exit__(None, None, None)
 
 
 class ChildBaseStream(IncrementalStream):
     """Base Class for Child Stream."""
 
+    # Account-wide listing of the stream and its lower bound param, for the
+    # child streams the API can list without going through every parent
+    bulk_path = None
+    bulk_since_param = None
+    # Timestamps of the parent's `stats` that move whenever a record of the
+    # stream is added, see `may_have_changed`
+    activity_stats = ()
+    # Config flag allowing the `activity_stats` check. The timestamps miss
+    # some changes, so the check must be opted into separately
+    activity_stats_flag = None
+    # Embeds of the parent listing that `may_have_changed` reads
+    parent_includes = ()
+    parent_updated_at = None
+    # Child sync index set by the parent's sync, when one is configured
+    sync_index = None
+
+    def use_bulk_listing(self) -> bool:
+        """Whether the stream is synced from its account-wide listing."""
+        return bool(self.bulk_path) and config_flag(self.client.config, "bulk_child_streams")
+
+    def get_params(self, state: Dict = None) -> Dict:
+        """Child endpoints list every record of their parent."""
+        return {}
+
     def get_url_endpoint(self, parent_obj=None):
         """Prepare URL endpoint for child streams."""
         return f"{self.client.base_url}/{self.path.format(parent_obj['id'])}"
@@ -495,31 +836,203 @@ class ChildBaseStream(IncrementalStream):
         if parent_obj is None:
             return 0  # No parent object means nothing to sync
 
-        category_suffix = ""
+        if self.is_synced(state, parent_obj):
+            return self.emit(state, transformer, parent_obj, [])
+
+        self.url_endpoint = self.get_url_endpoint(parent_obj)
+        self.parent_updated_at = parent_obj.get("updated_at")
+        count = self.emit(state, transformer, parent_obj, self.get_records(state))
+        self.mark_synced(state, parent_obj)
+        return count
+
+    def get_records(self, state: Dict) -> List:
+        """Lists the records of the parent set by `sync`, memoized under the
+        parent's `updated_at`."""
+        yield from self.paginate(
+            self.url_endpoint, self.get_params(state), memo_version=self.parent_updated_at
+        )
+
+    def has_bookmark(self, state: Dict) -> bool:
+        """Whether the state holds a bookmark of the stream, for any
+        category."""
+        return any(
+            key == self.tap_stream_id or key.startswith(f"{self.tap_stream_id}_")
+            for key in state.get("bookmarks", {})
+        )
+
+    def reset_sync_index(self, state: Dict) -> None:
+        """Forgets the child sync index entries of the stream when the state
+        holds no bookmark of it, e.g. after the state was cleared."""
+        index = self.sync_index
+        if index and not self.has_bookmark(state):
+            index.clear(self.tap_stream_id)
+
+    def get_sync_index_scope(self, state: Dict, parent_obj: Dict) -> Optional[str]:
+        """Start date and parent bookmark the children of `parent_obj` are
+        synced from. Index entries only count within the same scope, and
+        the index is not used while the stream has no bookmark."""
+        if not self.has_bookmark(state):
+            return None
+        parent_bookmark = self.get_parent_bookmark_for_category(
+            state, self.get_category_suffix(parent_obj)
+        )
+        return f"{self.client.config.get(self.config_start_key)}|{parent_bookmark}"
+
+    def is_synced(self, state: Dict, parent_obj: Dict) -> bool:
+        """Whether the child sync index shows the stream already synced for
+        this version of `parent_obj`, from the same bookmark."""
+        index = self.sync_index
+        if not index:
+            return False
+        scope = self.get_sync_index_scope(state, parent_obj)
+        return scope is not None and index.is_current(
+            self.tap_stream_id, parent_obj["id"], parent_obj["updated_at"], scope
+        )
+
+    def mark_synced(self, state: Dict, parent_obj: Dict) -> None:
+        """Records in the child sync index that the stream is synced for this
+        version of `parent_obj`."""
+        index = self.sync_index
+        if not index:
+            return
+        scope = self.get_sync_index_scope(state, parent_obj)
+        if scope is not None:
+            index.mark_synced(
+                self.tap_stream_id, parent_obj["id"], parent_obj["updated_at"], scope
+            )
+
+    def get_bulk_since(self, bookmark: str) -> str:
+        """Lower bound of the account-wide listing. `bulk_since_param` does
+        not filter on `updated_at`, so the listing starts
+        `bulk_child_lookback_days` before the bookmark, to catch the records
+        updated after the bookmark that were created up to that long before
+        it."""
+        days = self.client.config.get("bulk_child_lookback_days")
+        lookback = timedelta(
+            days=float(days) if days is not None else DEFAULT_BULK_CHILD_LOOKBACK_DAYS
+        )
+        return strftime(strptime_to_utc(bookmark) - lookback)
+
+    def sync_bulk(self, state: Dict, transformer) -> int:
+        """Syncs the stream from its account-wide listing, from the child's
+        own bookmark, instead of once per parent record. The bookmark keeps
+        the per-parent format, under the default category."""
+        bookmark = self.get_bookmark(state, self.tap_stream_id)
+        last_record_timestamp = bookmark
+        url = f"{self.client.base_url}/{self.bulk_path}"
+        # Records can move between pages while the listing is read
+        seen_ids = set()
+
+        with metrics.record_counter(self.tap_stream_id) as counter, self.discarded_counter:
+            records = self.paginate(url, {self.bulk_since_param: self.get_bulk_since(bookmark)})
+            for page in self.iter_pages(records):
+                new_records = []
+                for record in page:
+                    if self.is_before_bookmark(record, bookmark) or record["id"] in seen_ids:
+                        continue
+                    seen_ids.add(record["id"])
+                    # Each record belongs to its own ticket
+                    new_records.append(
+                        self.modify_object(record, {"id": record.get("ticket_id")})
+                    )
+                page = new_records
+                for _, transformed_record in self.transform_page(transformer, page):
+                    record_timestamp = transformed_record[self.replication_keys[0]]
+                    if record_timestamp >= bookmark:
+                        write_record(self.tap_stream_id, transformed_record)
+                        counter.increment()
+                        last_record_timestamp = max(last_record_timestamp, record_timestamp)
+
+            self.write_child_bookmark_with_parent(state, "", last_record_timestamp, None)
+            # The parent writes this value back when it propagates its bookmark
+            self.bookmark_value = last_record_timestamp
+            return counter.value
+
+    def get_category_suffix(self, parent_obj: Dict) -> str:
         if "spam" in parent_obj.get("filter", ""):
-            category_suffix = "_spam"
-        elif "deleted" in parent_obj.get("filter", ""):
-            category_suffix = "_deleted"
+            return "_spam"
+        if "deleted" in parent_obj.get("filter", ""):
+            return "_deleted"
+        return ""
+
+    def get_cutoff(self, state: Dict, parent_obj: Dict) -> str:
+        """Oldest `updated_at` of the child records of `parent_obj` that are
+        still to be written: the newer of the child's and the parent's
+        bookmarks."""
+        category_suffix = self.get_category_suffix(parent_obj)
+        parent_bookmark = self.get_parent_bookmark_for_category(state, category_suffix)
+        child_bookmark = self.get_bookmark(state, f"{self.tap_stream_id}{category_suffix}")
+        return max(filter(None, [child_bookmark, parent_bookmark]))
+
+    def may_have_changed(self, parent_obj: Dict, cutoff: str) -> bool:
+        """Whether the parent's `stats` allow child records newer than
+        `cutoff`. Streams without `activity_stats`, or whose
+        `activity_stats_flag` is not set, and parents listed without `stats`
+        are always fetched."""
+        stats = parent_obj.get("stats")
+        if not self.uses_activity_stats() or not isinstance(stats, dict):
+            return True
+        timestamps = [stats[name] for name in self.activity_stats if stats.get(name)]
+        return any(
+            strptime_to_utc(timestamp) >= strptime_to_utc(cutoff) for timestamp in timestamps
+        )
+
+    def get_parent_includes(self) -> Tuple[str, ...]:
+        """Embeds of the parent listing that `may_have_changed` reads. Those
+        of streams checking `activity_stats` are only needed once their
+        `activity_stats_flag` is set."""
+        if self.activity_stats and not self.uses_activity_stats():
+            return ()
+        return self.parent_includes
+
+    def uses_activity_stats(self) -> bool:
+        """Whether `may_have_changed` may skip parents from `activity_stats`."""
+        return bool(self.activity_stats) and config_flag(
+            self.client.config, self.activity_stats_flag
+        )
+
+    def fetch(self, parent_obj: Dict) -> List[Dict]:
+        """Lists every record of the child endpoint of `parent_obj`. Unlike
+        `sync`, it leaves the stream untouched and can run on any thread."""
+        return list(
+            self.paginate(
+                self.get_url_endpoint(parent_obj),
+                self.get_params(),
+                memo_version=parent_obj.get("updated_at"),
+            )
+        )
+
+    def emit(
+        self,
+        state: Dict,
+        transformer,
+        parent_obj: Dict,
+        records: Iterable[Dict],
+        cutoff: Optional[str] = None,
+    ) -> int:
+        """Writes the child `records` of `parent_obj` newer than `cutoff`,
+        by default `get_cutoff`, and their bookmark."""
+        category_suffix = self.get_category_suffix(parent_obj)
 
         parent_bookmark = self.get_parent_bookmark_for_category(state, category_suffix)
 
         # Get child's existing bookmark for this category
         child_bookmark = self.get_bookmark(state, f"{self.tap_stream_id}{category_suffix}")
 
-        self.url_endpoint = self.get_url_endpoint(parent_obj)
-
         last_record_timestamp = child_bookmark  # Default to existing bookmark if no new records
+        # Compare against whichever is newer: child's own or parent's
+        cutoff = cutoff or max(filter(None, [child_bookmark, parent_bookmark]))
 
         with metrics.record_counter(self.tap_stream_id) as counter:
-            for record in self.get_records(state):
-                transformed_record = transformer.transform(record, self.schema, self.metadata)
-                record_timestamp = transformed_record[self.replication_keys[0]]
+            for page in self.iter_pages(records):
+                page = [record for record in page if not self.is_before_bookmark(record, cutoff)]
+                for _, transformed_record in self.transform_page(transformer, page):
+                    record_timestamp = transformed_record[self.replication_keys[0]]
 
-                # Compare against whichever is newer: child's own or parent's
-                if record_timestamp >= max(filter(None, [child_bookmark, parent_bookmark])):
-                    write_record(self.tap_stream_id, transformed_record)
-                    counter.increment()
-                    last_record_timestamp = record_timestamp
+                    if record_timestamp >= cutoff:
+                        write_record(self.tap_stream_id, transformed_record)
+                        counter.increment()
+                        last_record_timestamp = record_timestamp
 
             # Update bookmark with both child's and parent's dates
             self.write_child_bookmark_with_parent(
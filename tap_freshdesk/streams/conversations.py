@@ -13,6 +13,11 @@ class Conversations(ChildBaseStream):
     replication_keys = ["updated_at"]
     path = "tickets/{}/conversations"
     parent = "tickets"
+    # Replies move these, private notes and edits of existing conversations
+    # do not, so skipping on them loses those
+    activity_stats = ("agent_responded_at", "requester_responded_at")
+    activity_stats_flag = "skip_conversations_without_replies"
+    parent_includes = ("stats",)
 
     def modify_object(self, record: Dict, parent_record: Dict = None) -> Dict:
         """Modify the record before writing to the stream."""
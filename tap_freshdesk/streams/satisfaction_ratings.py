@@ -6,6 +6,9 @@ from tap_freshdesk.streams.abstracts import ChildBaseStream
 
 LOGGER = get_logger()
 
+# Ticket statuses `Resolved` and `Closed`
+RESOLVED_STATUSES = (4, 5)
+
 
 class SatisfactionRatings(ChildBaseStream):
     tap_stream_id = "satisfaction_ratings"
@@ -13,6 +16,24 @@ class SatisfactionRatings(ChildBaseStream):
     replication_keys = ["updated_at"]
     path = "tickets/{}/satisfaction_ratings"
     parent = "tickets"
+    bulk_path = "surveys/satisfaction_ratings"
+    bulk_since_param = "created_since"
+    parent_includes = ("stats",)
+
+    def may_have_changed(self, parent_obj: Dict, cutoff: str) -> bool:
+        """Surveys are only sent with agent replies and on resolution, so a
+        ticket without either cannot have been rated. A rating can arrive
+        long after the survey was sent, so rated tickets are always
+        fetched."""
+        stats = parent_obj.get("stats")
+        if not isinstance(stats, dict):
+            return True
+        return bool(
+            stats.get("agent_responded_at")
+            or stats.get("resolved_at")
+            or stats.get("closed_at")
+            or parent_obj.get("status") in RESOLVED_STATUSES
+        )
 
     def modify_object(self, record: Dict, parent_record: Dict = None) -> Dict:
         """Modify the record before writing to the stream."""
@@ -13,6 +13,8 @@ class TimeEntries(ChildBaseStream):
     replication_keys = ["updated_at"]
     path = "tickets/{}/time_entries"
     parent = "tickets"
+    # No account-wide listing: `time_entries` filters on `executed_at`, so
+    # backdated entries and timers stopped after the bookmark would be lost
 
     def modify_object(self, record: Dict, parent_record: Dict = None) -> Dict:
         """Modify the record before writing to the stream."""
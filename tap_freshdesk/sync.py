@@ -30,6 +30,16 @@ def collect_child_to_sync(stream, client, selected_streams, catalog) -> None:
             collect_child_to_sync(child_obj, client, selected_streams, catalog)
 
 
+def log_stream_stats(client: Client, stream_names) -> None:
+    """Report the bytes transferred and the pages fetched for each synced
+    stream's endpoint."""
+    for stream_name in stream_names:
+        stream = STREAMS[stream_name]
+        templates = [t for t in (stream.path, getattr(stream, "bulk_path", None)) if t]
+        client.transfer_stats.log_stream_totals(stream_name, templates)
+        client.pagination_stats.log_stream_totals(stream_name, templates)
+
+
 def sync(client: Client, config: Dict, catalog: singer.Catalog, state) -> None:
     """Sync selected streams from catalog"""
 
@@ -56,3 +66,5 @@ def sync(client: Client, config: Dict, catalog: singer.Catalog, state) -> None:
 
             update_currently_syncing(state, None)
             LOGGER.info(f"FINISHED Syncing: {stream_name}, total_records: {total_records}")
+
+    log_stream_stats(client, streams_to_sync)
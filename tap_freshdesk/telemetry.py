@@ -0,0 +1,259 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+
+def endpoint_template(url: str, base_url: str = "") -> str:
+    """Reduce a request URL to its endpoint template, e.g.
+    `https://x.freshdesk.com/api/v2/tickets/42/conversations?page=2` becomes
+    `tickets/{}/conversations`, matching the streams' `path` attribute."""
+    if base_url and url.startswith(base_url):
+        url = url[len(base_url):]
+    path = urlsplit(url).path
+    segments = [
+        "{}" if _ID_SEGMENT.match(segment) else segment
+        for segment in path.strip("/").split("/")
+    ]
+    return "/".join(segments)
+
+
+class TransferStats:
+    """Thread-safe accounting of the bytes received per endpoint template,
+    both as sent on the wire and after content decoding. Responses whose
+    wire size is unknown are counted apart, and the compression ratio only
+    covers the measured ones."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.wire_bytes = defaultdict(int)
+        self.decoded_bytes = defaultdict(int)
+        self.responses = defaultdict(int)
+        self.unmeasured_responses = defaultdict(int)
+        self.unmeasured_decoded_bytes = defaultdict(int)
+
+    def record(self, template: str, wire_bytes: Optional[int], decoded_bytes: int) -> None:
+        with self._lock:
+            self.responses[template] += 1
+            self.decoded_bytes[template] += decoded_bytes
+            if wire_bytes is None:
+                self.unmeasured_responses[template] += 1
+                self.unmeasured_decoded_bytes[template] += decoded_bytes
+            else:
+                self.wire_bytes[template] += wire_bytes
+
+    def totals(self, templates: Iterable[str]) -> Dict[str, int]:
+        """Sum the counters of the given endpoint templates."""
+        templates = set(templates)
+        with self._lock:
+            return {
+                "responses": sum(self.responses[t] for t in templates if t in self.responses),
+                "wire_bytes": sum(self.wire_bytes[t] for t in templates if t in self.wire_bytes),
+                "decoded_bytes": sum(
+                    self.decoded_bytes[t] for t in templates if t in self.decoded_bytes
+                ),
+                "unmeasured_responses": sum(
+                    self.unmeasured_responses[t]
+                    for t in templates
+                    if t in self.unmeasured_responses
+                ),
+            }
+
+    def log_stream_totals(self, stream_name: str, templates: Iterable[str]) -> Optional[Dict]:
+        """Emit the transfer totals of a stream's endpoints as metrics."""
+        templates = set(templates)
+        totals = self.totals(templates)
+        if not totals["responses"]:
+            return None
+        with self._lock:
+            measured_decoded_bytes = totals["decoded_bytes"] - sum(
+                self.unmeasured_decoded_bytes[t]
+                for t in templates
+                if t in self.unmeasured_decoded_bytes
+            )
+        tags = {metrics.Tag.endpoint: stream_name}
+        metrics.log(LOGGER, metrics.Point("counter", "http_bytes_wire", totals["wire_bytes"], tags))
+        metrics.log(
+            LOGGER, metrics.Point("counter", "http_bytes_decoded", totals["decoded_bytes"], tags)
+        )
+        ratio = (
+            measured_decoded_bytes / totals["wire_bytes"] if totals["wire_bytes"] else 0
+        )
+        LOGGER.info(
+            "Transfer for %s: %s responses, %s bytes on the wire, %s bytes decoded"
+            " (compression ratio %.1fx), %s responses of unknown wire size",
+            stream_name,
+            totals["responses"],
+            totals["wire_bytes"],
+            totals["decoded_bytes"],
+            ratio,
+            totals["unmeasured_responses"],
+        )
+        return totals
+
+
+class LatencyHistogram:
+    """Log-scale latency histogram. Buckets grow by `BUCKET_GROWTH` from
+    `MIN_LATENCY`, so percentiles are reported within ~5% of the true value
+    with constant memory whatever the number of requests."""
+
+    MIN_LATENCY = 0.001
+    BUCKET_GROWTH = 1.1
+
+    def __init__(self) -> None:
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.MIN_LATENCY:
+            return 0
+        return math.ceil(math.log(seconds / self.MIN_LATENCY, self.BUCKET_GROWTH))
+
+    def record(self, seconds: float) -> None:
+        self.buckets[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket holding the given percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.MIN_LATENCY * self.BUCKET_GROWTH ** bucket, self.max)
+        return self.max
+
+
+class EndpointStats:
+    """Request statistics of one endpoint template."""
+
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.status_codes = Counter()
+        self.retries = 0
+        self.min_headroom = None
+
+    def summary(self) -> Dict:
+        return {
+            "requests": self.latency.count,
+            "p50_ms": round(self.latency.percentile(50) * 1000),
+            "p95_ms": round(self.latency.percentile(95) * 1000),
+            "p99_ms": round(self.latency.percentile(99) * 1000),
+            "status_codes": dict(sorted(self.status_codes.items())),
+            "retries": self.retries,
+            "min_rate_limit_headroom": self.min_headroom,
+        }
+
+
+class RequestStats:
+    """Thread-safe per endpoint template latency histograms, status code
+    counts, retry counts and lowest rate-limit headroom, i.e. the fraction
+    of `X-RateLimit-Total` left in `X-RateLimit-Remaining`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints = defaultdict(EndpointStats)
+
+    def record_response(
+        self,
+        template: str,
+        status_code: int,
+        seconds: float,
+        remaining: Optional[int] = None,
+        total: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            stats = self.endpoints[template]
+            stats.latency.record(seconds)
+            stats.status_codes[status_code] += 1
+            if remaining is not None and total:
+                headroom = round(remaining / total, 3)
+                if stats.min_headroom is None or headroom < stats.min_headroom:
+                    stats.min_headroom = headroom
+
+    def record_retry(self, template: str) -> None:
+        with self._lock:
+            self.endpoints[template].retries += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                template: stats.summary()
+                for template, stats in sorted(self.endpoints.items())
+            }
+
+    def log_summary(self) -> List[str]:
+        """Log one compact line per endpoint template, slowest p95 first."""
+        summary = self.summary()
+        lines = [
+            f"{template}: requests={s['requests']} p50={s['p50_ms']}ms"
+            f" p95={s['p95_ms']}ms p99={s['p99_ms']}ms retries={s['retries']}"
+            f" status={s['status_codes']} min_headroom={s['min_rate_limit_headroom']}"
+            for template, s in sorted(
+                summary.items(), key=lambda item: item[1]["p95_ms"], reverse=True
+            )
+        ]
+        if lines:
+            LOGGER.info("HTTP request summary:\n  %s", "\n  ".join(lines))
+        return lines
+
+
+class PaginationStats:
+    """Thread-safe count of the list pages fetched per endpoint template and
+    of the trailing empty pages that were not requested because the `Link`
+    header showed there was no next page."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.pages = defaultdict(int)
+        self.empty_pages_avoided = defaultdict(int)
+        self.link_templates = set()
+
+    def record_page(self, template: str, next_url: Optional[str]) -> None:
+        with self._lock:
+            self.pages[template] += 1
+            if next_url:
+                self.link_templates.add(template)
+
+    def record_empty_page_avoided(self, template: str) -> None:
+        with self._lock:
+            self.empty_pages_avoided[template] += 1
+
+    def sends_links(self, template: str) -> bool:
+        """Whether the endpoint has been seen announcing a next page with a
+        `Link` header, so that a full page without one is the last page."""
+        with self._lock:
+            return template in self.link_templates
+
+    def log_stream_totals(self, stream_name: str, templates: Iterable[str]) -> Optional[Dict]:
+        """Emit the page counts of a stream's endpoints as metrics."""
+        templates = set(templates)
+        with self._lock:
+            totals = {
+                "pages_fetched": sum(self.pages[t] for t in templates if t in self.pages),
+                "empty_pages_avoided": sum(
+                    self.empty_pages_avoided[t]
+                    for t in templates
+                    if t in self.empty_pages_avoided
+                ),
+            }
+        if not totals["pages_fetched"]:
+            return None
+        tags = {metrics.Tag.endpoint: stream_name}
+        for name, value in totals.items():
+            metrics.log(LOGGER, metrics.Point("counter", name, value, tags))
+        return totals
@@ -0,0 +1,437 @@
+import datetime
+import functools
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from singer import Transformer, get_logger
+from singer.transform import NO_INTEGER_DATETIME_PARSING, breadcrumb_path, string_to_datetime
+
+LOGGER = get_logger()
+
+
+def get_mutated_paths(mdata: Dict[Tuple, Dict]) -> FrozenSet[Tuple]:
+    """Breadcrumbs of the objects `Transformer.filter_data_by_metadata`
+    removes fields from, i.e. every ancestor of a deselected or unsupported
+    field. The transformer only ever mutates its input there."""
+    paths = set()
+    for breadcrumb, entry in mdata.items():
+        if not breadcrumb or entry.get("inclusion") == "automatic":
+            continue
+        if entry.get("selected") is False or entry.get("inclusion") == "unsupported":
+            paths.update(breadcrumb[:end] for end in range(len(breadcrumb) - 1))
+    return frozenset(paths)
+
+
+def copy_on_write(data: Any, mutated_paths: FrozenSet[Tuple], parent: Tuple = ()) -> Any:
+    """Copy `data` and the objects and arrays along `mutated_paths` below
+    it, sharing everything else, so a record can be handed to the
+    transformer without the fields it drops disappearing from `data`.
+
+    `data` itself is always copied: it is cheap, and the transformer
+    reassigns its array fields even when nothing is deselected."""
+    if isinstance(data, dict):
+        copied = dict(data)
+        if mutated_paths:
+            for key, value in data.items():
+                path = parent + ("properties", key)
+                if path in mutated_paths:
+                    copied[key] = copy_on_write(value, mutated_paths, path)
+        return copied
+    if isinstance(data, list):
+        path = parent + ("items",)
+        if path in mutated_paths:
+            return [copy_on_write(item, mutated_paths, path) for item in data]
+        return list(data)
+    return data
+
+
+class CompileError(Exception):
+    """The schema or metadata uses a feature `compile_transform` does not
+    reproduce, the stream keeps using `singer.Transformer`."""
+
+
+class Mismatch(Exception):
+    """A value does not match its schema."""
+
+
+_ISO_DATETIME = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(?:Z|\+00:?00)\Z"
+)
+
+
+def normalize_datetime(value: Any) -> Optional[str]:
+    """The date-time string `singer.Transformer` outputs for a UTC ISO 8601
+    timestamp as sent by the API, or `None` for any other value."""
+    if not isinstance(value, str):
+        return None
+    match = _ISO_DATETIME.match(value)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    try:
+        datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
+    microsecond = int((fraction or "0").ljust(6, "0"))
+    return f"{year}-{month}-{day}T{hour}:{minute}:{second}.{microsecond:06d}Z"
+
+
+@functools.lru_cache(maxsize=256)
+def normalize_bookmark(value: str) -> Optional[str]:
+    """`normalize_datetime`, memoized for the few bookmark values records
+    are compared with."""
+    return normalize_datetime(value)
+
+
+def _convert_datetime(data: Any) -> str:
+    """`Transformer._transform_datetime`, skipping dateutil for the
+    timestamps `normalize_datetime` handles."""
+    if data is None or data == "":
+        raise Mismatch
+    value = normalize_datetime(data)
+    if value is None:
+        value = string_to_datetime(data)
+    if value is None:
+        raise Mismatch
+    return value
+
+
+def _convert_string(data: Any) -> str:
+    if data is None:
+        raise Mismatch
+    if type(data) is str:
+        return data
+    try:
+        return str(data)
+    except Exception as err:
+        raise Mismatch from err
+
+
+def _convert_integer(data: Any) -> int:
+    if type(data) is int:
+        return data
+    if isinstance(data, str):
+        data = data.replace(",", "")
+    try:
+        return int(data)
+    except Exception as err:
+        raise Mismatch from err
+
+
+def _convert_number(data: Any) -> float:
+    if isinstance(data, str):
+        data = data.replace(",", "")
+    try:
+        return float(data)
+    except Exception as err:
+        raise Mismatch from err
+
+
+def _convert_boolean(data: Any) -> bool:
+    if isinstance(data, str) and data.lower() == "false":
+        return False
+    try:
+        return bool(data)
+    except Exception as err:
+        raise Mismatch from err
+
+
+_SCALAR_CONVERTERS = {
+    "string": _convert_string,
+    "integer": _convert_integer,
+    "number": _convert_number,
+    "boolean": _convert_boolean,
+}
+
+# Values of these exact types come out of the converter of the type unchanged
+_PASSTHROUGH_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool}
+
+
+def _fail(data: Any) -> Any:
+    raise Mismatch
+
+
+class _Compiler:
+    """Builds the conversion function of a schema node, following the order
+    in which `singer.Transformer` tries types and filters fields.
+
+    Every function takes the value and, for objects and arrays, its path in
+    the record as a tuple; scalars get `None`. It returns the converted
+    value or raises `Mismatch`. Scalar functions may carry a `passthrough`
+    attribute, the Python type whose values they return unchanged and
+    whether `None` is returned unchanged too. `filtered` and `removed`
+    collect the paths the transformer would report."""
+
+    def __init__(self, mdata: Dict[Tuple, Dict]) -> None:
+        self.mdata = mdata
+        self.mutated_paths = get_mutated_paths(mdata) if mdata else frozenset()
+        self.filtered = set()
+        self.removed = set()
+        self.page_converter = None
+
+    def compile(self, schema: Dict, breadcrumb: Tuple, filtering: bool) -> Tuple[Callable, bool]:
+        """Returns the function of a node and whether it takes a path."""
+        if filtering and breadcrumb in self.mutated_paths and not self._filterable(schema):
+            raise CompileError(f"Cannot filter fields below {breadcrumb}")
+        if "anyOf" in schema:
+            return self._compile_any_of(schema, breadcrumb, filtering)
+        if "type" not in schema:
+            return (lambda data, path: data), False
+
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        converters = [
+            self._compile_type(typ, schema, breadcrumb, filtering)
+            for typ in types
+            if typ != "null"
+        ]
+        nullable = "null" in types
+        takes_path = any(takes for _, takes in converters)
+        converters = [converter for converter, _ in converters]
+        # Only booleans accept `None`, every other type falls through to null
+        none_is_null = nullable and "boolean" not in types
+
+        if len(converters) == 1 and not nullable:
+            convert = converters[0]
+        else:
+            def convert(data, path):
+                if none_is_null and data is None:
+                    return None
+                for converter in converters:
+                    try:
+                        return converter(data, path)
+                    except Mismatch:
+                        pass
+                if nullable and (data is None or data == ""):
+                    return None
+                raise Mismatch
+
+        first_type = next((typ for typ in types if typ != "null"), None)
+        if first_type in _PASSTHROUGH_TYPES and "format" not in schema:
+            convert.passthrough = _PASSTHROUGH_TYPES[first_type], none_is_null
+        return convert, takes_path
+
+    def _filterable(self, schema: Dict) -> bool:
+        """Whether fields dropped by the metadata filter below this node are
+        dropped the same way when converting it as an object or array."""
+        if "anyOf" in schema:
+            return all(self._filterable(subschema) for subschema in schema["anyOf"])
+        types = schema.get("type")
+        types = types if isinstance(types, list) else [types]
+        if types == ["array"] or sorted(types) == ["array", "null"]:
+            return True
+        return (
+            sorted(t for t in types if t != "null") == ["object"]
+            and bool(schema.get("properties"))
+            and "format" not in schema
+        )
+
+    def _compile_any_of(self, schema, breadcrumb, filtering):
+        compiled = [self.compile(subschema, breadcrumb, filtering) for subschema in schema["anyOf"]]
+        converters = [converter for converter, _ in compiled]
+
+        def convert(data, path):
+            for converter in converters:
+                try:
+                    return converter(data, path)
+                except Mismatch:
+                    pass
+            raise Mismatch
+
+        return convert, any(takes for _, takes in compiled)
+
+    def _compile_type(self, typ, schema, breadcrumb, filtering):
+        if schema.get("format") == "date-time":
+            return (lambda data, path: _convert_datetime(data)), False
+        if schema.get("format") == "singer.decimal" or "patternProperties" in schema:
+            raise CompileError(f"Unsupported schema at {breadcrumb}")
+        if typ == "object":
+            return self._compile_object(schema.get("properties", {}), breadcrumb, filtering)
+        if typ == "array":
+            return self._compile_array(schema["items"], breadcrumb, filtering)
+        scalar = _SCALAR_CONVERTERS.get(typ, _fail)
+        return (lambda data, path: scalar(data)), False
+
+    def _compile_object(self, properties, breadcrumb, filtering):
+        if not properties:
+            def convert_untyped(data, path):
+                if not isinstance(data, dict):
+                    raise Mismatch
+                return data
+
+            return convert_untyped, False
+
+        dropped = {}
+        if filtering:
+            for field_breadcrumb, entry in self.mdata.items():
+                if field_breadcrumb[:-1] != breadcrumb + ("properties",):
+                    continue
+                if entry.get("inclusion") == "automatic":
+                    continue
+                if entry.get("selected") is False or entry.get("inclusion") == "unsupported":
+                    dropped[field_breadcrumb[-1]] = breadcrumb_path(field_breadcrumb)
+
+        fields = {}
+        for name, subschema in properties.items():
+            field_breadcrumb = breadcrumb + ("properties", name)
+            # The metadata filter does not descend into automatic fields
+            automatic = self.mdata.get(field_breadcrumb, {}).get("inclusion") == "automatic"
+            fields[name] = self.compile(subschema, field_breadcrumb, filtering and not automatic)
+        filtered, removed = self.filtered, self.removed
+
+        def convert(data, path):
+            if not isinstance(data, dict):
+                raise Mismatch
+            result = {}
+            for key, value in data.items():
+                if key in dropped:
+                    filtered.add(dropped[key])
+                    continue
+                field = fields.get(key)
+                if field is None:
+                    removed.add(".".join(map(str, path + (key,))))
+                    continue
+                converter, takes_path = field
+                result[key] = converter(value, path + (key,) if takes_path else None)
+            return result
+
+        if breadcrumb == ():
+            self.page_converter = self._compile_page(dropped, fields)
+        return convert, True
+
+    def _compile_page(self, dropped, fields):
+        """Converts a page of records a field at a time, for pages whose
+        records all list their fields in the same order."""
+        filtered, removed = self.filtered, self.removed
+
+        def convert_column(key, records):
+            converter, takes_path = fields[key]
+            values = [record[key] for record in records]
+            passthrough = getattr(converter, "passthrough", None)
+            if passthrough is None:
+                path = (key,) if takes_path else None
+                return [converter(value, path) for value in values]
+            typ, none_is_null = passthrough
+            if none_is_null:
+                return [
+                    value if value is None or type(value) is typ else converter(value, None)
+                    for value in values
+                ]
+            return [value if type(value) is typ else converter(value, None) for value in values]
+
+        def convert_page(records, convert_record):
+            keys = tuple(records[0]) if type(records[0]) is dict else None
+            if keys is None or any(
+                type(record) is not dict or tuple(record) != keys for record in records
+            ):
+                return [convert_record(record, ()) for record in records]
+            output_keys = []
+            columns = []
+            for key in keys:
+                if key in dropped:
+                    filtered.add(dropped[key])
+                elif key not in fields:
+                    removed.add(str(key))
+                else:
+                    output_keys.append(key)
+                    columns.append(convert_column(key, records))
+            if not columns:
+                return [{} for _ in records]
+            return [dict(zip(output_keys, row)) for row in zip(*columns)]
+
+        return convert_page
+
+    def _compile_array(self, items, breadcrumb, filtering):
+        converter, takes_path = self.compile(items, breadcrumb + ("items",), filtering)
+
+        def convert(data, path):
+            if not isinstance(data, list):
+                raise Mismatch
+            if takes_path:
+                return [converter(item, path + (index,)) for index, item in enumerate(data)]
+            return [converter(item, None) for item in data]
+
+        return convert, takes_path
+
+
+class RecordTransform:
+    """`singer.Transformer.transform` for one stream, with the schema and
+    metadata compiled once into a conversion function.
+    ~~~
+    Records are converted into new objects without being modified, with the
+    same output as the transformer, and the filtered and removed paths are
+    reported to it. Records that do not match the schema, transformers with
+    a `pre_hook` or integer date-time parsing, and schemas using features the
+    compiler does not reproduce go through `singer.Transformer` instead.
+    """
+
+    def __init__(self, schema: Dict, mdata: Dict[Tuple, Dict]) -> None:
+        self.schema = schema
+        self.metadata = mdata
+        self.mutated_paths = get_mutated_paths(mdata)
+        compiler = _Compiler(mdata)
+        try:
+            self.convert, _ = compiler.compile(schema, (), bool(mdata))
+        except (CompileError, KeyError) as err:
+            LOGGER.info("Using the generic transformer: %s", err)
+            self.convert = None
+        self.convert_page = compiler.page_converter if self.convert else None
+        self.filtered = compiler.filtered
+        self.removed = compiler.removed
+
+    def is_compiled_for(self, transformer: Transformer) -> bool:
+        """Whether records transformed with `transformer` can be converted
+        by the compiled function."""
+        return (
+            self.convert is not None
+            and not transformer.pre_hook
+            and transformer.integer_datetime_fmt == NO_INTEGER_DATETIME_PARSING
+        )
+
+    def report_paths(self, transformer: Transformer) -> None:
+        """Hand the filtered and removed paths collected so far to the
+        transformer."""
+        if self.filtered:
+            transformer.filtered.update(self.filtered)
+            self.filtered.clear()
+        if self.removed:
+            transformer.removed.update(self.removed)
+            self.removed.clear()
+
+    def __call__(self, transformer: Transformer, record: Dict) -> Dict:
+        if not self.is_compiled_for(transformer):
+            return self.transform(transformer, record)
+        try:
+            result = self.convert(record, ())
+        except Mismatch:
+            # Let the transformer collect and raise its detailed errors
+            return self.transform(transformer, record)
+        finally:
+            self.report_paths(transformer)
+        return result
+
+    def transform_page(self, transformer: Transformer, records: List[Dict]) -> Iterator[Dict]:
+        """Yields the transformed `records` of a page, converted a field at
+        a time across the page. The output is the same as calling the
+        instance on every record, which is what happens for a page holding
+        a record the compiled function rejects, so that errors are raised
+        at that record."""
+        if not records:
+            return
+        results = None
+        if self.convert_page is not None and self.is_compiled_for(transformer):
+            try:
+                results = self.convert_page(records, self.convert)
+            except Mismatch:
+                self.filtered.clear()
+                self.removed.clear()
+            else:
+                self.report_paths(transformer)
+        if results is None:
+            results = (self(transformer, record) for record in records)
+        yield from results
+
+    def transform(self, transformer: Transformer, record: Dict) -> Dict:
+        """Transform the record with `singer.Transformer`."""
+        return transformer.transform(
+            copy_on_write(record, self.mutated_paths), self.schema, self.metadata
+        )
@@ -1,10 +1,8 @@
 import argparse
-import collections
 import datetime
-import functools
+import itertools
 import json
 import os
-import time
 
 DATETIME_FMT = "%Y-%m-%dT%H:%M:%SZ"
 
@@ -17,32 +15,20 @@ def strftime(dt):
     return dt.strftime(DATETIME_FMT)
 
 
-def ratelimit(limit, every):
-    def limitdecorator(fn):
-        times = collections.deque()
-
-        @functools.wraps(fn)
-        def wrapper(*args, **kwargs):
-            if len(times) >= limit:
-                t0 = times.pop()
-                t = time.time()
-                sleep_time = every - (t - t0)
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-
-            times.appendleft(time.time())
-            return fn(*args, **kwargs)
-
-        return wrapper
-
-    return limitdecorator
-
-
 def chunk(l, n):
     for i in range(0, len(l), n):
         yield l[i : i + n]
 
 
+def batched(iterable, n):
+    """Lists of `n` consecutive items of `iterable`, the last one shorter."""
+    iterator = iter(iterable)
+    batch = list(itertools.islice(iterator, n))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(iterator, n))
+
+
 def get_abs_path(path):
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), path)
 
@@ -91,3 +77,12 @@ def check_config(config, required_keys):
     missing_keys = [key for key in required_keys if key not in config]
     if missing_keys:
         raise Exception("Config is missing required keys: {}".format(missing_keys))
+
+
+def config_flag(config, key, default=False):
+    """Read a boolean option that may be given as a JSON boolean or as a
+    string such as "true"/"false"."""
+    value = config.get(key, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
@@ -0,0 +1,56 @@
+"""Records/sec of preparing and transforming pages of tickets with their
+custom fields as name and value pairs, and as typed properties.
+
+    python tests/benchmarks/bench_custom_fields.py
+"""
+import copy
+import time
+from unittest.mock import MagicMock
+
+from singer import Transformer
+
+from fixtures import tickets_page
+from tap_freshdesk.schema import get_schemas
+from tap_freshdesk.streams.tickets import Tickets
+
+ITERATIONS = 20
+
+TICKET_FIELDS = [
+    {"name": "cf_order_number", "type": "custom_text", "default": False},
+    {"name": "cf_refund", "type": "custom_checkbox", "default": False},
+    {"name": "cf_region", "type": "custom_dropdown", "default": False},
+    {"name": "cf_priority_score", "type": "custom_number", "default": False},
+]
+
+
+def get_stream(field_definitions):
+    schemas, field_metadata = get_schemas(field_definitions)
+    catalog = MagicMock()
+    catalog.schema.to_dict.return_value = schemas["tickets"]
+    catalog.metadata = field_metadata["tickets"]
+    for entry in catalog.metadata:
+        entry["metadata"]["selected"] = True
+    return Tickets(client=MagicMock(), catalog=catalog)
+
+
+def measure(stream, records):
+    pages = [copy.deepcopy(records) for _ in range(ITERATIONS)]
+    with Transformer() as transformer:
+        start = time.process_time()
+        for page in pages:
+            page = stream.modify_page_custom_fields(page)
+            for _ in stream.record_transform.transform_page(transformer, page):
+                pass
+        elapsed = time.process_time() - start
+    return len(records) * ITERATIONS / elapsed
+
+
+def main():
+    records = tickets_page()
+    before = measure(get_stream(None), records)
+    after = measure(get_stream({"tickets": TICKET_FIELDS}), records)
+    print(f"tickets {before:8.0f} -> {after:8.0f} records/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""CPU cost of decoding a page of tickets (`include=requester,company,stats`).
+
+Compares the previous client path, which decoded every successful body twice
+(once in `raise_for_error` and once for the return value), with a single
+decode through the stdlib and through orjson when it is installed.
+
+    python tests/benchmarks/bench_json_decode.py
+"""
+import json
+import time
+
+import requests
+
+from fixtures import tickets_page
+from tap_freshdesk.decoding import JSON_DECODERS
+
+ITERATIONS = 200
+
+
+def build_response(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.encoding = "utf-8"
+    return response
+
+
+def double_parse(response):
+    response.json()
+    return response.json()
+
+
+def measure(fn, response):
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        fn(response)
+    return (time.process_time() - start) / ITERATIONS * 1000
+
+
+def main():
+    body = json.dumps(tickets_page()).encode("utf-8")
+    response = build_response(body)
+    print(f"page size: {len(body) / 1024:.0f} KiB, {ITERATIONS} iterations")
+
+    baseline = measure(double_parse, response)
+    print(f"{'double response.json()':<28}{baseline:8.3f} ms/page")
+    for name, decode in JSON_DECODERS.items():
+        cost = measure(lambda r, decode=decode: decode(r.content), response)
+        print(
+            f"{'single ' + name + '.loads':<28}{cost:8.3f} ms/page"
+            f"  (saves {baseline - cost:.3f} ms, {baseline / cost:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Records/sec of `singer.Transformer` and of the per-stream compiled
+`RecordTransform` on pages of tickets, contacts and conversations, record by
+record and a page at a time.
+
+    python tests/benchmarks/bench_record_transform.py
+"""
+import time
+
+from singer import Transformer
+
+from bench_transform import as_synced, get_metadata, load_schema
+from fixtures import contacts_page, conversations_page, tickets_page
+from tap_freshdesk.transform import RecordTransform
+
+ITERATIONS = 20
+
+
+def measure(transform, records):
+    with Transformer() as transformer:
+        start = time.process_time()
+        for _ in range(ITERATIONS):
+            for record in records:
+                transform(transformer, record)
+        elapsed = time.process_time() - start
+    return len(records) * ITERATIONS / elapsed
+
+
+def measure_pages(record_transform, records):
+    with Transformer() as transformer:
+        start = time.process_time()
+        for _ in range(ITERATIONS):
+            for _ in record_transform.transform_page(transformer, records):
+                pass
+        elapsed = time.process_time() - start
+    return len(records) * ITERATIONS / elapsed
+
+
+def main():
+    cases = [
+        ("tickets", as_synced(tickets_page()), ()),
+        ("tickets, 2 deselected", as_synced(tickets_page()), ("description", "stats")),
+        ("contacts", as_synced(contacts_page()), ()),
+        ("conversations", conversations_page(), ()),
+    ]
+    for label, records, deselected in cases:
+        schema = load_schema(label.split(",")[0])
+        record_transform = RecordTransform(schema, get_metadata(schema, deselected))
+
+        before = measure(record_transform.transform, records)
+        after = measure(record_transform, records)
+        paged = measure_pages(record_transform, records)
+        print(
+            f"{label:<24}{before:8.0f} -> {after:8.0f} records/s ({after / before:.1f}x),"
+            f" by page {paged:8.0f} records/s ({paged / before:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Records/sec of the transform step of incremental streams on pages of
+contacts and conversations.
+
+Compares the previous path, which deep-copied every record before handing it
+to `singer.Transformer`, with `copy_on_write`, which only copies the objects
+the transformer removes deselected fields from.
+
+    python tests/benchmarks/bench_transform.py
+"""
+import copy
+import json
+import os
+import time
+
+from singer import Transformer
+
+from fixtures import contacts_page, conversations_page
+from tap_freshdesk.transform import copy_on_write, get_mutated_paths
+
+ITERATIONS = 20
+SCHEMAS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "tap_freshdesk", "schemas")
+
+
+def load_schema(name):
+    with open(os.path.join(SCHEMAS_DIR, name + ".json"), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def get_metadata(schema, deselected=()):
+    mdata = {(): {"selected": True}}
+    for field in schema["properties"]:
+        mdata[("properties", field)] = {
+            "inclusion": "available",
+            "selected": field not in deselected,
+        }
+    return mdata
+
+
+def as_synced(records):
+    """Records as the stream hands them to the transformer, with the
+    `custom_fields` object turned into name and value pairs."""
+    for record in records:
+        if "custom_fields" in record:
+            record["custom_fields"] = [
+                {"name": key, "value": str(value).lower()}
+                for key, value in record["custom_fields"].items()
+            ]
+    return records
+
+
+def measure(prepare, records, schema, mdata):
+    with Transformer() as transformer:
+        start = time.process_time()
+        for _ in range(ITERATIONS):
+            for record in records:
+                transformer.transform(prepare(record), schema, mdata)
+        elapsed = time.process_time() - start
+    return len(records) * ITERATIONS / elapsed
+
+
+def measure_copy(prepare, records):
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        for record in records:
+            prepare(record)
+    return (time.process_time() - start) / (len(records) * ITERATIONS) * 1e6
+
+
+def main():
+    cases = [
+        ("contacts", as_synced(contacts_page()), ()),
+        ("contacts, 2 deselected", as_synced(contacts_page()), ("avatar", "description")),
+        ("conversations", conversations_page(), ()),
+    ]
+    for label, records, deselected in cases:
+        schema = load_schema(label.split(",")[0])
+        mdata = get_metadata(schema, deselected)
+        paths = get_mutated_paths(mdata)
+
+        before = measure(copy.deepcopy, records, schema, mdata)
+        after = measure(lambda record: copy_on_write(record, paths), records, schema, mdata)
+        copy_before = measure_copy(copy.deepcopy, records)
+        copy_after = measure_copy(lambda record: copy_on_write(record, paths), records)
+        print(
+            f"{label:<26}{before:8.0f} -> {after:8.0f} records/s ({after / before:.2f}x),"
+            f" copy {copy_before:5.1f} -> {copy_after:4.1f} us/record"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Synthetic Freshdesk payloads shaped like real API responses, used by the
+benchmarks in this folder."""
+import random
+
+TIMESTAMP = "2024-0{month}-{day:02d}T{hour:02d}:15:42Z"
+
+
+def _timestamp(rnd):
+    return TIMESTAMP.format(
+        month=rnd.randint(1, 9), day=rnd.randint(1, 28), hour=rnd.randint(0, 23)
+    )
+
+
+def _text(rnd, words):
+    return " ".join(
+        rnd.choice(["ticket", "refund", "order", "delayed", "please", "thanks", "shipping", "invoice"])
+        for _ in range(words)
+    )
+
+
+def ticket(rnd, ticket_id):
+    """A ticket as returned with `include=requester,company,stats`."""
+    return {
+        "cc_emails": [f"cc{ticket_id}@example.com"],
+        "fwd_emails": [],
+        "reply_cc_emails": [f"cc{ticket_id}@example.com"],
+        "ticket_cc_emails": [],
+        "fr_escalated": False,
+        "spam": False,
+        "email_config_id": 101,
+        "group_id": rnd.randint(1, 50),
+        "priority": rnd.randint(1, 4),
+        "requester_id": 5000 + ticket_id,
+        "responder_id": rnd.randint(1, 200),
+        "source": rnd.randint(1, 10),
+        "company_id": rnd.randint(1, 300),
+        "status": rnd.randint(2, 5),
+        "subject": _text(rnd, 8),
+        "association_type": None,
+        "support_email": "support@example.com",
+        "to_emails": ["support@example.com"],
+        "product_id": None,
+        "id": ticket_id,
+        "type": "Question",
+        "due_by": _timestamp(rnd),
+        "fr_due_by": _timestamp(rnd),
+        "is_escalated": False,
+        "description": "<div>" + _text(rnd, 120) + "</div>",
+        "description_text": _text(rnd, 120),
+        "custom_fields": {
+            "cf_order_number": str(rnd.randint(100000, 999999)),
+            "cf_refund": rnd.choice([True, False]),
+            "cf_region": rnd.choice(["EMEA", "APAC", "AMER"]),
+            "cf_priority_score": rnd.randint(0, 100),
+        },
+        "created_at": _timestamp(rnd),
+        "updated_at": _timestamp(rnd),
+        "tags": ["vip", "billing"],
+        "attachments": [],
+        "requester": {
+            "email": f"requester{ticket_id}@example.com",
+            "id": 5000 + ticket_id,
+            "mobile": None,
+            "name": "Requester Name",
+            "phone": "+1 555 0100",
+        },
+        "company": {"id": rnd.randint(1, 300), "name": "Example Company"},
+        "stats": {
+            "agent_responded_at": _timestamp(rnd),
+            "requester_responded_at": _timestamp(rnd),
+            "first_responded_at": _timestamp(rnd),
+            "status_updated_at": _timestamp(rnd),
+            "reopened_at": None,
+            "resolved_at": _timestamp(rnd),
+            "closed_at": None,
+            "pending_since": None,
+        },
+    }
+
+
+def contact(rnd, contact_id):
+    return {
+        "active": True,
+        "address": "1 Example Street",
+        "avatar": {"avatar_url": "https://example.com/a.png", "content_type": "image/png", "id": contact_id, "name": "a.png", "size": 1024},
+        "company_id": rnd.randint(1, 300),
+        "view_all_tickets": False,
+        "custom_fields": {"cf_customer_tier": rnd.choice(["gold", "silver"]), "cf_newsletter": True},
+        "deleted": False,
+        "description": _text(rnd, 20),
+        "email": f"contact{contact_id}@example.com",
+        "id": contact_id,
+        "job_title": "Manager",
+        "language": "en",
+        "mobile": "+1 555 0101",
+        "name": "Contact Name",
+        "phone": "+1 555 0100",
+        "time_zone": "Eastern Time (US & Canada)",
+        "twitter_id": None,
+        "other_emails": [f"alt{contact_id}@example.com"],
+        "other_companies": [],
+        "tags": ["customer"],
+        "created_at": _timestamp(rnd),
+        "updated_at": _timestamp(rnd),
+    }
+
+
+def conversation(rnd, conversation_id, ticket_id):
+    return {
+        "body": "<div>" + _text(rnd, 80) + "</div>",
+        "body_text": _text(rnd, 80),
+        "id": conversation_id,
+        "incoming": rnd.choice([True, False]),
+        "private": False,
+        "user_id": rnd.randint(1, 200),
+        "support_email": "support@example.com",
+        "source": 0,
+        "category": 2,
+        "ticket_id": ticket_id,
+        "to_emails": ["customer@example.com"],
+        "from_email": "support@example.com",
+        "cc_emails": [],
+        "bcc_emails": [],
+        "attachments": [],
+        "created_at": _timestamp(rnd),
+        "updated_at": _timestamp(rnd),
+    }
+
+
+def tickets_page(size=100, seed=1):
+    rnd = random.Random(seed)
+    return [ticket(rnd, 1000 + i) for i in range(size)]
+
+
+def contacts_page(size=100, seed=1):
+    rnd = random.Random(seed)
+    return [contact(rnd, 2000 + i) for i in range(size)]
+
+
+def conversations_page(size=100, seed=1):
+    rnd = random.Random(seed)
+    return [conversation(rnd, 3000 + i, 1000 + i // 5) for i in range(size)]
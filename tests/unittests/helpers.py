@@ -0,0 +1,12 @@
+import json
+
+import requests
+
+
+def get_response(status_code=200, body=None, headers=None):
+    """A `requests.Response` with `body` as its JSON content."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode("utf-8") if body is not None else b""
+    response.headers.update(headers or {})
+    return response
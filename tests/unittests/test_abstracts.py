@@ -1,6 +1,14 @@
+import copy
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
+
+from tap_freshdesk.child_index import ChildSyncIndex
+from tap_freshdesk.child_queue import ChildWorkQueue
+from tap_freshdesk.client import Page
 from tap_freshdesk.streams.abstracts import ParentBaseStream, ChildBaseStream, IncrementalStream
+from tap_freshdesk.telemetry import RequestStats, TransferStats
 
 
 class ConcreteParentBaseStream(ParentBaseStream):
@@ -85,7 +93,7 @@ class TestParentBaseStream(unittest.TestCase):
         mock_catalog = MagicMock()
         mock_catalog.schema.to_dict.return_value = {"key": "value"}
         mock_catalog.metadata = "mock_metadata"
-        mock_to_map.return_value = {"metadata_key": "metadata_value"}
+        mock_to_map.return_value = {(): {"selected": True}}
 
         self.stream = ConcreteParentBaseStream(catalog=mock_catalog)
         self.stream.child_to_sync = []
@@ -183,7 +191,7 @@ class TestParentBaseStreamWriteBookmark(unittest.TestCase):
         mock_catalog = MagicMock()
         mock_catalog.schema.to_dict.return_value = {"key": "value"}
         mock_catalog.metadata = "mock_metadata"
-        mock_to_map.return_value = {"metadata_key": "metadata_value"}
+        mock_to_map.return_value = {(): {"selected": True}}
 
         self.stream = ConcreteParentBaseStream(catalog=mock_catalog)
         self.stream.child_to_sync = []
@@ -269,7 +277,7 @@ class TestChildBaseStream(unittest.TestCase):
         mock_catalog = MagicMock()
         mock_catalog.schema.to_dict.return_value = {"key": "value"}
         mock_catalog.metadata = "mock_metadata"
-        mock_to_map.return_value = {"metadata_key": "metadata_value"}
+        mock_to_map.return_value = {(): {"selected": True}}
 
         mock_client = MagicMock()
         mock_client.base_url = "https://domain.freshdesk.com/api/v2"
@@ -396,7 +404,7 @@ class TestIncrementalStream(unittest.TestCase):
         mock_catalog = MagicMock()
         mock_catalog.schema.to_dict.return_value = {"key": "value"}
         mock_catalog.metadata = "mock_metadata"
-        mock_to_map.return_value = {"metadata_key": "metadata_value"}
+        mock_to_map.return_value = {(): {"selected": True}}
 
         mock_client = MagicMock()
         mock_client.config = {"start_date": "2023-01-01"}
@@ -484,3 +492,485 @@ class TestIncrementalStream(unittest.TestCase):
         result = self.stream.get_bookmark(state, "test_stream")
         
         self.assertEqual(result, "2023-01-01")
+
+    def test_is_before_bookmark_compares_raw_timestamps(self):
+        self.stream.discarded_counter = MagicMock()
+        bookmark = "2024-01-01T00:00:00.000000Z"
+
+        self.assertTrue(self.stream.is_before_bookmark({"updated_at": "2023-12-31T23:59:59Z"}, bookmark))
+        self.assertFalse(self.stream.is_before_bookmark({"updated_at": "2024-01-01T00:00:00Z"}, bookmark))
+        self.assertFalse(
+            self.stream.is_before_bookmark({"updated_at": "2024-01-01T00:00:00Z"}, "2024-01-01T00:00:00Z")
+        )
+        # Values the transform parses with dateutil are left to it
+        self.assertFalse(self.stream.is_before_bookmark({"updated_at": "2023-12-31"}, bookmark))
+        self.assertFalse(self.stream.is_before_bookmark({"updated_at": None}, bookmark))
+        self.assertFalse(self.stream.is_before_bookmark({"updated_at": "2022-01-01T00:00:00Z"}, "2023-01-01"))
+        self.assertEqual(self.stream.discarded_counter.increment.call_count, 1)
+
+    def test_streamed_records_are_not_held_back_for_a_page(self):
+        def records():
+            yield {"id": 1}
+            raise AssertionError("the rest of the page was awaited")
+
+        self.stream.client.stream_records = True
+        self.assertEqual(next(self.stream.iter_pages(records())), [{"id": 1}])
+
+        self.stream.client.stream_records = False
+        self.assertEqual(
+            list(self.stream.iter_pages(iter([{"id": 1}, {"id": 2}]))), [[{"id": 1}, {"id": 2}]]
+        )
+
+    def test_page_modifications_match_record_modifications(self):
+        self.stream.object_to_id = ["requester"]
+        page = [
+            {"id": 1, "requester": {"id": 7}, "custom_fields": {"cf_flag": True, "cf_name": "A"}},
+            {"id": 2, "requester": None},
+        ]
+        expected = []
+        for record in [dict(record) for record in page]:
+            record = self.stream.modify_object(record)
+            if "custom_fields" in record:
+                record["custom_fields"] = self.stream.modify_object_custom_fields(
+                    record["custom_fields"], force_to_string=True
+                )
+            expected.append(record)
+
+        actual = self.stream.modify_page_custom_fields(self.stream.modify_page(page))
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual[1]["requester_id"], None)
+        self.assertEqual(actual[0]["custom_fields"][0], {"name": "cf_flag", "value": "true"})
+
+
+class TestGetRecords(unittest.TestCase):
+    """Test cases for the params of IncrementalStream.get_records"""
+
+    @patch("tap_freshdesk.streams.abstracts.metadata.to_map")
+    def setUp(self, _mock_to_map):
+        mock_client = MagicMock(
+            response_cache=None,
+            stream_records=False,
+            prefetch_pages=0,
+        )
+        mock_client.config = {"start_date": "2023-01-01"}
+        mock_client.base_url = "https://test.freshdesk.com/api/v2"
+        mock_client.get_page.return_value = Page([{"id": 1}])
+        self.client = mock_client
+
+    def test_incremental_stream_filters_on_bookmark(self):
+        stream = ConcreteIncrementalStream(catalog=MagicMock(), client=self.client)
+        list(stream.get_records({}))
+
+        params = self.client.get_page.call_args.args[1]
+        self.assertEqual(
+            params, {"updated_since": "2023-01-01", "per_page": 100, "page": 1}
+        )
+        # The stream's own params are not mutated by pagination
+        self.assertEqual(stream.params, {})
+
+    def test_child_stream_lists_all_records(self):
+        stream = ConcreteChildBaseStream(catalog=MagicMock(), client=self.client)
+        stream.params = {"stale": True}
+        list(stream.get_records({}))
+
+        self.assertEqual(self.client.get_page.call_args.args[1], {"per_page": 100, "page": 1})
+
+
+class TestParentBaseStreamFilterPasses(unittest.TestCase):
+    """Test cases for the filter passes of ParentBaseStream.sync"""
+
+    @patch("tap_freshdesk.streams.abstracts.metadata.to_map")
+    def setUp(self, _mock_to_map):
+        self.records = {
+            None: [{"id": 1, "updated_at": "2024-01-02T00:00:00Z"}],
+            "spam": [{"id": 2, "updated_at": "2024-01-03T00:00:00Z"}],
+            "deleted": [{"id": 3, "updated_at": "2024-01-04T00:00:00Z"}],
+        }
+        mock_client = MagicMock(
+            response_cache=None,
+            stream_records=False,
+            prefetch_pages=0,
+        )
+        mock_client.base_url = "https://test.freshdesk.com/api/v2"
+        mock_client.get_page.side_effect = lambda url, params, *args, **kwargs: Page(
+            self.records[params.get("filter")]
+        )
+        self.stream = ConcreteParentBaseStream(catalog=MagicMock(), client=mock_client)
+        self.stream.child_to_sync = []
+        self.transformer = MagicMock()
+        self.transformer.transform.side_effect = lambda record, *args: record
+
+    def sync(self, config):
+        self.stream.client.config = {"start_date": "2024-01-01T00:00:00Z", **config}
+        state = {}
+        with patch.object(ConcreteParentBaseStream, "is_selected", return_value=True), patch(
+            "tap_freshdesk.streams.abstracts.write_record"
+        ) as mock_write_record:
+            self.stream.sync(state, self.transformer)
+        return state, [call.args[1]["id"] for call in mock_write_record.call_args_list]
+
+    def test_passes_run_sequentially_by_default(self):
+        state, written = self.sync({})
+        self.assertEqual(written, [1, 2, 3])
+        self.assertEqual(
+            state["bookmarks"],
+            {
+                "tickets": {"updated_at": "2024-01-02T00:00:00Z"},
+                "tickets_spam": {"updated_at": "2024-01-03T00:00:00Z"},
+                "tickets_deleted": {"updated_at": "2024-01-04T00:00:00Z"},
+            },
+        )
+
+    def test_concurrent_passes_use_their_own_params(self):
+        sequential_state, _ = self.sync({})
+        state, written = self.sync({"concurrent_ticket_filters": True})
+
+        self.assertEqual(written, [1, 2, 3])
+        self.assertEqual(state, sequential_state)
+        filters = sorted(
+            str(call.args[1].get("filter")) for call in self.stream.client.get_page.call_args_list
+        )
+        self.assertEqual(filters, ["None", "None", "deleted", "deleted", "spam", "spam"])
+        self.assertNotIn("filter", self.stream.params)
+
+
+class TestParentBaseStreamChildFanOut(unittest.TestCase):
+    """Test cases for the child fan-out of ParentBaseStream.sync"""
+
+    @patch("tap_freshdesk.streams.abstracts.metadata.to_map")
+    def setUp(self, _mock_to_map):
+        tickets = [{"id": i, "updated_at": f"2024-01-0{i}T00:00:00Z"} for i in range(1, 6)]
+        mock_client = MagicMock(
+            response_cache=None,
+            stream_records=False,
+            prefetch_pages=0,
+        )
+        mock_client.base_url = "https://test.freshdesk.com/api/v2"
+
+        def get_page(url, params, *args, **kwargs):
+            if url.endswith("/tickets"):
+                return Page(tickets if not params.get("filter") else [])
+            ticket_id = int(url.split("/")[-2])
+            return Page([{"id": 10 * ticket_id, "updated_at": "2024-02-01T00:00:00Z"}])
+
+        mock_client.get_page.side_effect = get_page
+        self.stream = ConcreteParentBaseStream(catalog=MagicMock(), client=mock_client)
+        self.stream.url_endpoint = f"{mock_client.base_url}/tickets"
+        self.stream.get_url_endpoint = lambda parent_obj=None: f"{mock_client.base_url}/tickets"
+        child = ConcreteChildBaseStream(catalog=MagicMock(), client=mock_client)
+        self.stream.child_to_sync = [child]
+        self.transformer = MagicMock()
+        self.transformer.transform.side_effect = lambda record, *args: dict(record)
+
+    def sync(self, config, state=None):
+        self.stream.client.config = {"start_date": "2024-01-01T00:00:00Z", **config}
+        self.stream.child_to_sync[0].bookmark_value = None
+        state = {} if state is None else state
+        with patch.object(ConcreteParentBaseStream, "is_selected", return_value=True), patch.object(
+            ConcreteParentBaseStream, "is_child_selected", return_value=True
+        ), patch("tap_freshdesk.streams.abstracts.write_record") as mock_write_record:
+            self.stream.sync(state, self.transformer)
+        written = [(call.args[0], call.args[1]["id"]) for call in mock_write_record.call_args_list]
+        return state, written
+
+    def test_concurrent_fan_out_keeps_output_and_state(self):
+        sequential = self.sync({})
+        concurrent = self.sync({"child_fetch_concurrency": 3})
+
+        self.assertEqual(concurrent, sequential)
+        self.assertEqual(
+            concurrent[1][:4],
+            [("tickets", 1), ("conversations", 10), ("tickets", 2), ("conversations", 20)],
+        )
+
+    def test_queued_children_are_all_written(self):
+        sequential_state, sequential = self.sync({})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "queue.sqlite")
+            state, written = self.sync(
+                {"child_work_queue": path, "child_fetch_concurrency": 2, "child_queue_size": 2}
+            )
+            with ChildWorkQueue(path) as work_queue:
+                self.assertEqual(work_queue.pending(), [])
+
+        self.assertEqual(sorted(written), sorted(sequential))
+        self.assertEqual(state, sequential_state)
+
+    def test_child_sync_index_is_opened_for_the_sync(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.sqlite")
+            self.sync({"child_sync_index": path})
+
+            # Committed and closed once the sync is done. The tickets
+            # bookmark was not set yet when the children were synced
+            with ChildSyncIndex(path) as index:
+                self.assertEqual(
+                    index.get("conversations", 5, "2024-01-01T00:00:00Z|None"),
+                    "2024-01-05T00:00:00Z",
+                )
+
+    def test_work_left_by_a_crash_is_fetched_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "queue.sqlite")
+            # The previous run queued tickets 1 and 2 and failed
+            with ChildWorkQueue(path) as work_queue:
+                work_queue.push("conversations", 1, "2024-01-01T00:00:00Z", "")
+                work_queue.push("conversations", 2, "2024-01-02T00:00:00Z", "")
+
+            _, written = self.sync({"child_work_queue": path, "child_fetch_concurrency": 2})
+            with ChildWorkQueue(path) as work_queue:
+                self.assertEqual(work_queue.pending(), [])
+
+        child_urls = [
+            call.args[0]
+            for call in self.stream.client.get_page.call_args_list
+            if not call.args[0].endswith("/tickets")
+        ]
+        self.assertEqual(len(child_urls), len(set(child_urls)))
+        self.assertEqual(
+            sorted(w for w in written if w[0] == "conversations"),
+            [("conversations", 10 * i) for i in range(1, 6)],
+        )
+
+    def test_resumed_work_is_emitted_as_in_an_uninterrupted_run(self):
+        start_state = {"bookmarks": {"conversations": {"updated_at": "2024-01-15T00:00:00Z"}}}
+        # Older tickets have the newer conversations
+        conversations = {
+            i: [{"id": 10 * i, "updated_at": f"2024-02-0{6 - i}T00:00:00Z"}] for i in range(1, 6)
+        }
+        failing = {3}
+
+        def get_page(url, params, *args, **kwargs):
+            if url.endswith("/tickets"):
+                return Page(
+                    [{"id": i, "updated_at": f"2024-01-0{i}T00:00:00Z"} for i in range(1, 6)]
+                    if not params.get("filter")
+                    else []
+                )
+            ticket_id = int(url.split("/")[-2])
+            if ticket_id in failing:
+                raise ConnectionError("ticket 3 failed")
+            return Page(list(conversations[ticket_id]))
+
+        self.stream.client.get_page.side_effect = get_page
+        with tempfile.TemporaryDirectory() as directory:
+            config = {
+                "child_work_queue": os.path.join(directory, "queue.sqlite"),
+                "child_queue_size": 10,
+            }
+            failing.clear()
+            _, uninterrupted = self.sync(config, copy.deepcopy(start_state))
+
+            failing.add(3)
+            state = copy.deepcopy(start_state)
+            with self.assertRaises(ConnectionError):
+                self.sync(config, state)
+            failing.clear()
+            with ChildWorkQueue(config["child_work_queue"]) as work_queue:
+                left = {item[2] for item in work_queue.pending()}
+            # The next run starts from the state as the failed run left it
+            _, resumed = self.sync(config, state)
+
+        self.assertIn(3, left)
+        resumed_conversations = {w for w in resumed if w[0] == "conversations"}
+        self.assertLessEqual(resumed_conversations, set(uninterrupted))
+        # The work left by the failed run is written as it would have been
+        self.assertLessEqual({("conversations", 10 * i) for i in left}, resumed_conversations)
+
+    def list_tickets_with_stats(self):
+        child = self.stream.child_to_sync[0]
+        child.activity_stats = ("agent_responded_at",)
+        child.activity_stats_flag = "skip_on_replies"
+        # Only ticket 3 has a reply after the bookmarks
+        tickets = [
+            {
+                "id": i,
+                "updated_at": f"2024-01-0{i}T00:00:00Z",
+                "stats": {"agent_responded_at": "2024-03-01T00:00:00Z" if i == 3 else None},
+            }
+            for i in range(1, 6)
+        ]
+        get_page = self.stream.client.get_page.side_effect
+        self.stream.client.get_page.side_effect = lambda url, params, *args, **kwargs: (
+            Page(tickets if not params.get("filter") else [])
+            if url.endswith("/tickets")
+            else get_page(url, params)
+        )
+
+    def get_child_urls(self):
+        return [
+            call.args[0]
+            for call in self.stream.client.get_page.call_args_list
+            if not call.args[0].endswith("/tickets")
+        ]
+
+    def test_inactive_tickets_skip_child_fetches(self):
+        self.list_tickets_with_stats()
+
+        state, written = self.sync({"skip_inactive_children": True, "skip_on_replies": True})
+
+        self.assertIn(("conversations", 30), written)
+        self.assertEqual(len([w for w in written if w[0] == "conversations"]), 1)
+        self.assertEqual(
+            self.get_child_urls(), ["https://test.freshdesk.com/api/v2/tickets/3/conversations"]
+        )
+        self.assertIn("conversations", state["bookmarks"])
+
+    def test_bulk_children_alone_do_not_list_tickets(self):
+        child = self.stream.child_to_sync[0]
+        child.bulk_path = "surveys/satisfaction_ratings"
+        child.bulk_since_param = "created_since"
+        child.modify_object = lambda record, parent: record
+        self.stream.client.config = {
+            "start_date": "2024-01-01T00:00:00Z",
+            "bulk_child_streams": True,
+        }
+
+        with patch.object(ConcreteParentBaseStream, "is_selected", return_value=False), patch.object(
+            ConcreteParentBaseStream, "is_child_selected", return_value=True
+        ), patch.object(ChildBaseStream, "sync_bulk") as mock_sync_bulk:
+            self.assertEqual(self.stream.sync({}, self.transformer), 0)
+
+        mock_sync_bulk.assert_called_once()
+        self.stream.client.get_page.assert_not_called()
+
+    def test_activity_stats_are_ignored_without_their_flag(self):
+        self.list_tickets_with_stats()
+
+        self.sync({"skip_inactive_children": True})
+
+        self.assertEqual(len(self.get_child_urls()), 5)
+
+    def test_old_child_records_are_not_transformed(self):
+        get_page = self.stream.client.get_page.side_effect
+
+        def get_page_with_old_records(url, params, *args, **kwargs):
+            page = get_page(url, params)
+            if url.endswith("/conversations"):
+                page.records.append({"id": 99, "updated_at": "2023-06-01T00:00:00Z"})
+            return page
+
+        self.stream.client.get_page.side_effect = get_page_with_old_records
+        child = self.stream.child_to_sync[0]
+        child.discarded_counter = MagicMock()
+
+        _, written = self.sync({})
+
+        self.assertNotIn(("conversations", 99), written)
+        transformed_ids = [call.args[0]["id"] for call in self.transformer.transform.call_args_list]
+        self.assertNotIn(99, transformed_ids)
+        self.assertEqual(child.discarded_counter.increment.call_count, 5)
+
+
+    def test_include_follows_selection(self):
+        child = self.stream.child_to_sync[0]
+        child.parent_includes = ("stats",)
+        self.stream.metadata = {(): {"selected": True}, ("properties", "company"): {"selected": False}}
+
+        self.assertEqual(self.stream.get_includes([child], False), ["requester", "stats"])
+        with patch.object(ConcreteParentBaseStream, "is_selected", return_value=False):
+            self.assertEqual(self.stream.get_includes([child], False), [])
+            self.assertEqual(self.stream.get_includes([child], True), ["stats"])
+
+    def test_unselected_parent_lists_without_embeds(self):
+        self.stream.path = "tickets"
+        self.stream.client.transfer_stats = TransferStats()
+        self.stream.client.transfer_stats.record("tickets", 100, 400)
+        self.stream.client.config = {"start_date": "2024-01-01T00:00:00Z"}
+
+        with patch.object(ConcreteParentBaseStream, "is_selected", return_value=False), patch(
+            "tap_freshdesk.streams.abstracts.LOGGER"
+        ) as mock_logger:
+            self.stream.sync({}, self.transformer)
+
+        listing_params = [
+            call.args[1]
+            for call in self.stream.client.get_page.call_args_list
+            if call.args[0].endswith("/tickets")
+        ]
+        self.assertTrue(listing_params)
+        self.assertTrue(all("include" not in params for params in listing_params))
+        # The savings are logged without extra requests
+        self.stream.client.send_get.assert_not_called()
+        self.assertIn("leaving out", mock_logger.info.call_args.args[0])
+        self.assertEqual(mock_logger.info.call_args.args[4:6], (400, 1))
+
+    def test_child_requests_skipped_from_stats_are_logged(self):
+        self.list_tickets_with_stats()
+        self.stream.path = "tickets"
+        child = self.stream.child_to_sync[0]
+        child.path = "tickets/{}/conversations"
+        self.stream.client.transfer_stats = TransferStats()
+        self.stream.client.transfer_stats.record("tickets", 100, 400)
+        self.stream.client.request_stats = RequestStats()
+        self.stream.client.request_stats.record_response(child.path, 200, 0.2)
+
+        with patch("tap_freshdesk.streams.abstracts.LOGGER") as mock_logger:
+            self.sync({"skip_inactive_children": True, "skip_on_replies": True})
+
+        # Four of the five tickets had no reply after the bookmark
+        self.assertEqual(mock_logger.info.call_args.args[-2], 4)
+        self.assertGreater(mock_logger.info.call_args.args[-1], 0)
+
+
+class TestChildBaseStreamBulkListing(unittest.TestCase):
+    """Test cases for ChildBaseStream.sync_bulk"""
+
+    @patch("tap_freshdesk.streams.abstracts.metadata.to_map")
+    def setUp(self, _mock_to_map):
+        mock_client = MagicMock(
+            response_cache=None,
+            stream_records=False,
+            prefetch_pages=0,
+        )
+        mock_client.base_url = "https://test.freshdesk.com/api/v2"
+        mock_client.config = {"start_date": "2024-01-01T00:00:00Z", "bulk_child_streams": True}
+        mock_client.get_page.return_value = Page(
+            [
+                {"id": 1, "ticket_id": 7, "updated_at": "2023-12-01T00:00:00Z"},
+                {"id": 2, "ticket_id": 8, "updated_at": "2024-01-05T00:00:00Z"},
+            ]
+        )
+        self.stream = ConcreteChildBaseStream(catalog=MagicMock(), client=mock_client)
+        self.stream.bulk_path = "surveys/satisfaction_ratings"
+        self.stream.bulk_since_param = "created_since"
+        self.stream.modify_object = lambda record, parent: {**record, "parent_id": parent["id"]}
+        self.transformer = MagicMock()
+        self.transformer.transform.side_effect = lambda record, *args: record
+
+    def test_bulk_listing_is_enabled_by_config(self):
+        self.assertTrue(self.stream.use_bulk_listing())
+        self.stream.client.config = {"start_date": "2024-01-01T00:00:00Z"}
+        self.assertFalse(self.stream.use_bulk_listing())
+
+    @patch("tap_freshdesk.streams.abstracts.write_record")
+    def test_sync_bulk(self, mock_write_record):
+        state = {}
+        self.assertEqual(self.stream.sync_bulk(state, self.transformer), 1)
+
+        url, params = self.stream.client.get_page.call_args.args[:2]
+        self.assertEqual(url, "https://test.freshdesk.com/api/v2/surveys/satisfaction_ratings")
+        # Listed from a week before the bookmark
+        self.assertEqual(params["created_since"], "2023-12-25T00:00:00.000000Z")
+        self.assertEqual(mock_write_record.call_args.args[1]["parent_id"], 8)
+        self.assertEqual(
+            state, {"bookmarks": {"conversations": {"updated_at": "2024-01-05T00:00:00Z"}}}
+        )
+        self.assertEqual(self.stream.bookmark_value, "2024-01-05T00:00:00Z")
+
+    @patch("tap_freshdesk.streams.abstracts.write_record")
+    def test_sync_bulk_lookback_and_duplicates(self, mock_write_record):
+        self.stream.client.config["bulk_child_lookback_days"] = 30
+        rating = {"id": 2, "ticket_id": 8, "updated_at": "2024-01-05T00:00:00Z"}
+        # The rating moved to the second page while the listing was read
+        self.stream.client.get_page.side_effect = [
+            Page([dict(rating)] * 100),
+            Page([dict(rating)]),
+        ]
+
+        self.assertEqual(self.stream.sync_bulk({}, self.transformer), 1)
+
+        params = self.stream.client.get_page.call_args.args[1]
+        self.assertEqual(params["created_since"], "2023-12-02T00:00:00.000000Z")
+        self.assertEqual(mock_write_record.call_count, 1)
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from tap_freshdesk.client import Client, get_client
+from tap_freshdesk.exceptions import freshdeskNotFoundError
+
+try:
+    import aiohttp
+    from aiohttp import web
+
+    from tap_freshdesk.async_client import AsyncClient
+except ImportError:
+    aiohttp = None
+
+CONFIG = {"api_key": "key", "domain": "test", "start_date": "2024-01-01T00:00:00Z"}
+
+
+class LocalServer:
+    """Serves canned responses on localhost from a background event loop."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.runner = None
+        self.port = None
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def __enter__(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *args):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+class TestGetClient(unittest.TestCase):
+    """Test cases for get_client"""
+
+    def test_default_client(self):
+        self.assertIs(type(get_client(CONFIG)), Client)
+
+    def test_unknown_client(self):
+        with self.assertRaises(ValueError):
+            get_client({**CONFIG, "http_client": "curl"})
+
+
+@unittest.skipUnless(aiohttp, "aiohttp is not installed")
+class TestAsyncClient(unittest.TestCase):
+    """Test cases for AsyncClient against a local server"""
+
+    def test_get_returns_parsed_body(self):
+        async def handler(request):
+            return web.json_response([{"id": int(request.query["page"])}])
+
+        with LocalServer(handler) as url, get_client({**CONFIG, "http_client": "aiohttp"}) as client:
+            self.assertIsInstance(client, AsyncClient)
+            result = client.get(f"{url}/tickets", {"page": 3}, {})
+        self.assertEqual(result, [{"id": 3}])
+
+    def test_requests_run_concurrently(self):
+        in_flight = {"current": 0, "max": 0}
+
+        async def handler(request):
+            in_flight["current"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            await asyncio.sleep(0.05)
+            in_flight["current"] -= 1
+            return web.json_response([])
+
+        config = {**CONFIG, "http_client": "aiohttp", "max_concurrent_requests": 4}
+        with LocalServer(handler) as url, get_client(config) as client:
+            futures = [client.submit(f"{url}/tickets", {"page": i}, {}) for i in range(8)]
+            for future in futures:
+                future.result()
+        self.assertEqual(in_flight["max"], 4)
+
+    def test_error_mapping_is_shared(self):
+        async def handler(request):
+            return web.json_response({"message": "missing"}, status=404)
+
+        with LocalServer(handler) as url, AsyncClient(CONFIG) as client:
+            with self.assertRaises(freshdeskNotFoundError) as err:
+                client.get(f"{url}/tickets/1", {}, {})
+        self.assertEqual(err.exception.message, "HTTP-error-code: 404, Error: missing")
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    def test_backoff_retries_server_errors(self, _mock_sleep):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return web.json_response({}, status=503)
+            return web.json_response([{"id": 1}])
+
+        with LocalServer(handler) as url, AsyncClient(CONFIG) as client:
+            with patch("backoff._async.asyncio.sleep", new=AsyncMock()):
+                result = client.get(f"{url}/tickets", {}, {})
+        self.assertEqual(result, [{"id": 1}])
+        self.assertEqual(len(calls), 2)
+
+    def test_workers_finish_before_the_loop_stops(self):
+        async def handler(request):
+            await asyncio.sleep(0.1)
+            return web.json_response([{"id": 1}])
+
+        # With the memo, `submit` runs `get` on a worker thread
+        with LocalServer(handler) as url:
+            with AsyncClient({**CONFIG, "request_memo_size": 4}) as client:
+                pending = client.submit(f"{url}/tickets", {}, {})
+            self.assertEqual(pending.result(timeout=5).records, [{"id": 1}])
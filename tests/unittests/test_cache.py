@@ -0,0 +1,175 @@
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from helpers import get_response
+from tap_freshdesk.cache import RequestMemo, ResponseCache
+from tap_freshdesk.client import Client
+
+CONFIG = {"api_key": "key", "domain": "test", "start_date": "2024-01-01T00:00:00Z"}
+URL = "https://test.freshdesk.com/api/v2/agents"
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for ResponseCache"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmp_dir.name, ttl=60)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        self.cache.put(URL, {"page": 1}, {"ETag": '"abc"'}, b'[{"id": 1}]')
+        entry = self.cache.get(URL, {"page": 1})
+        self.assertEqual(entry["body"], '[{"id": 1}]')
+        self.assertEqual(self.cache.conditional_headers(entry), {"If-None-Match": '"abc"'})
+        self.assertIsNone(self.cache.get(URL, {"page": 2}))
+
+    def test_response_without_validator_is_not_stored(self):
+        self.cache.put(URL, {}, {}, b"[]")
+        self.assertIsNone(self.cache.get(URL, {}))
+
+    def test_expired_entry_is_dropped(self):
+        self.cache.put(URL, {}, {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, b"[]")
+        with patch("tap_freshdesk.cache.time.time", return_value=10 ** 10):
+            self.assertIsNone(self.cache.get(URL, {}))
+
+    def test_expired_entry_dropped_by_another_thread(self):
+        self.cache.put(URL, {}, {"ETag": '"v1"'}, b"[]")
+        with patch("tap_freshdesk.cache.time.time", return_value=10 ** 10), patch(
+            "tap_freshdesk.cache.os.remove", side_effect=FileNotFoundError
+        ):
+            self.assertIsNone(self.cache.get(URL, {}))
+
+
+class TestClientConditionalGet(unittest.TestCase):
+    """Test cases for Client.get with use_cache"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.client = Client({**CONFIG, "response_cache_dir": self.tmp_dir.name})
+        self.client._session = MagicMock()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_not_modified_reuses_cached_page(self):
+        self.client._session.request.side_effect = [
+            get_response(200, [{"id": 1}], {"ETag": '"v1"'}),
+            get_response(304),
+        ]
+
+        first = self.client.get(URL, {"page": 1}, {}, use_cache=True)
+        second = self.client.get(URL, {"page": 1}, {}, use_cache=True)
+
+        self.assertEqual(first, second)
+        sent_headers = self.client._session.request.call_args.kwargs["headers"]
+        self.assertEqual(sent_headers["If-None-Match"], '"v1"')
+        self.assertEqual(self.client.response_cache.hit_counter.value, 1)
+
+    def test_not_modified_is_an_error_without_cache(self):
+        self.client._session.request.return_value = get_response(304)
+        with self.assertRaises(Exception):
+            self.client.get(URL, {}, {})
+
+
+class TestRequestMemo(unittest.TestCase):
+    """Test cases for RequestMemo"""
+
+    def test_duplicate_requests_are_served_from_memo(self):
+        memo = RequestMemo(max_entries=2)
+        fetch = MagicMock(return_value=b"[]")
+        key = memo.key(URL, {"page": 1})
+
+        memo.get_or_fetch(key, fetch)
+        memo.get_or_fetch(memo.key(URL, {"page": 1}), fetch)
+
+        fetch.assert_called_once()
+        self.assertEqual((memo.hit_counter.value, memo.miss_counter.value), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        memo = RequestMemo(max_entries=2)
+        for page in (1, 2, 1, 3):
+            memo.get_or_fetch(memo.key(URL, {"page": page}), lambda: b"[]")
+        fetch = MagicMock(return_value=b"[]")
+        memo.get_or_fetch(memo.key(URL, {"page": 2}), fetch)
+        fetch.assert_called_once()
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        memo = RequestMemo(max_entries=2)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return b"[1]"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(memo.get_or_fetch, "key", fetch)
+            started.wait(5)
+            second = executor.submit(memo.get_or_fetch, "key", fetch)
+            release.set()
+            self.assertEqual(first.result(), second.result())
+        self.assertEqual(len(calls), 1)
+
+    def test_failed_fetch_is_not_memoized(self):
+        memo = RequestMemo(max_entries=2)
+        with self.assertRaises(ValueError):
+            memo.get_or_fetch("key", MagicMock(side_effect=ValueError))
+        self.assertEqual(memo.get_or_fetch("key", lambda: b"[]"), b"[]")
+
+    def test_client_decodes_memoized_body_per_call(self):
+        client = Client({**CONFIG, "request_memo_size": 10})
+        client._session = MagicMock()
+        client._session.request.return_value = get_response(200, [{"id": 1}])
+
+        first = client.get(URL, {"page": 1}, {})
+        first[0]["id"] = 2
+        second = client.get(URL, {"page": 1}, {})
+
+        self.assertEqual(second, [{"id": 1}])
+        client._session.request.assert_called_once()
+
+    def test_ticket_listed_again_has_its_children_fetched_again(self):
+        client = Client({**CONFIG, "request_memo_size": 10})
+        client._session = MagicMock()
+        reply = {"id": 1, "updated_at": "2024-01-02T00:00:00Z"}
+        new_reply = {"id": 2, "updated_at": "2024-01-03T00:00:00Z"}
+        client._session.request.side_effect = [
+            get_response(200, [reply]),
+            get_response(200, [reply, new_reply]),
+        ]
+        url = "https://test.freshdesk.com/api/v2/tickets/7/conversations"
+
+        # Ticket 7 is listed, then updated and listed again on a later page
+        client.get(url, {"page": 1}, {})
+        conversations = client.get(url, {"page": 1}, {})
+
+        self.assertEqual(conversations, [reply, new_reply])
+        self.assertEqual(client._session.request.call_count, 2)
+
+    def test_children_are_memoized_per_ticket_version(self):
+        client = Client({**CONFIG, "request_memo_size": 10})
+        client._session = MagicMock()
+        reply = {"id": 1, "updated_at": "2024-01-02T00:00:00Z"}
+        new_reply = {"id": 2, "updated_at": "2024-01-03T00:00:00Z"}
+        client._session.request.side_effect = [
+            get_response(200, [reply]),
+            get_response(200, [reply, new_reply]),
+        ]
+        url = "https://test.freshdesk.com/api/v2/tickets/7/conversations"
+
+        client.get(url, {"page": 1}, {}, memo_version="2024-01-02T00:00:00Z")
+        # Same ticket version, e.g. a retried pass: served from the memo
+        client.get(url, {"page": 1}, {}, memo_version="2024-01-02T00:00:00Z")
+        self.assertEqual(client._session.request.call_count, 1)
+
+        conversations = client.get(url, {"page": 1}, {}, memo_version="2024-01-03T00:00:00Z")
+        self.assertEqual(conversations, [reply, new_reply])
+        self.assertEqual(client._session.request.call_count, 2)
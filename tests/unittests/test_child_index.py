@@ -0,0 +1,100 @@
+import copy
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tap_freshdesk.child_index import ChildSyncIndex, get_child_sync_index
+from tap_freshdesk.streams.conversations import Conversations
+
+SCOPE = "2024-01-01T00:00:00Z|2024-01-01T00:00:00Z"
+STATE = {
+    "bookmarks": {
+        "tickets": {"updated_at": "2024-01-01T00:00:00Z"},
+        "conversations": {"updated_at": "2024-01-01T00:00:00Z"},
+    }
+}
+
+
+class TestChildSyncIndex(unittest.TestCase):
+    """Test cases for ChildSyncIndex"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "index.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_entries_survive_a_reopen(self):
+        index = ChildSyncIndex(self.path)
+        index.mark_synced("conversations", 1, "2024-01-02T00:00:00Z", SCOPE)
+        index.close()
+
+        index = ChildSyncIndex(self.path)
+        self.assertTrue(index.is_current("conversations", 1, "2024-01-02T00:00:00Z", SCOPE))
+        self.assertTrue(index.is_current("conversations", 1, "2024-01-01T00:00:00.000000Z", SCOPE))
+        self.assertFalse(index.is_current("conversations", 1, "2024-01-03T00:00:00Z", SCOPE))
+        self.assertFalse(index.is_current("time_entries", 1, "2024-01-02T00:00:00Z", SCOPE))
+        index.close()
+
+    def test_entries_only_count_in_their_scope(self):
+        index = ChildSyncIndex(self.path)
+        index.mark_synced("conversations", 1, "2024-01-02T00:00:00Z", SCOPE)
+        self.assertFalse(index.is_current("conversations", 1, "2024-01-02T00:00:00Z", "other"))
+
+        index.clear("conversations")
+        self.assertFalse(index.is_current("conversations", 1, "2024-01-02T00:00:00Z", SCOPE))
+        index.close()
+
+    def test_disabled_without_config(self):
+        self.assertIsNone(get_child_sync_index({}))
+
+    def get_stream(self, index, start_date="2024-01-01T00:00:00Z"):
+        client = MagicMock()
+        client.config = {"start_date": start_date}
+        stream = Conversations(client, MagicMock())
+        stream.sync_index = index
+        stream.get_records = MagicMock(return_value=[])
+        return stream
+
+    @patch("tap_freshdesk.streams.abstracts.metadata.to_map", MagicMock())
+    @patch("tap_freshdesk.streams.abstracts.write_record", MagicMock())
+    def test_child_sync_skips_synced_parents(self):
+        index = ChildSyncIndex(self.path)
+        stream = self.get_stream(index)
+        ticket = {"id": 5, "updated_at": "2024-01-02T00:00:00Z"}
+
+        stream.sync(copy.deepcopy(STATE), MagicMock(), ticket)
+        stream.sync(copy.deepcopy(STATE), MagicMock(), ticket)
+        stream.sync(copy.deepcopy(STATE), MagicMock(), {**ticket, "updated_at": "2024-01-03T00:00:00Z"})
+
+        self.assertEqual(stream.get_records.call_count, 2)
+        index.close()
+
+    @patch("tap_freshdesk.streams.abstracts.metadata.to_map", MagicMock())
+    @patch("tap_freshdesk.streams.abstracts.write_record", MagicMock())
+    def test_resyncs_ignore_the_index(self):
+        index = ChildSyncIndex(self.path)
+        ticket = {"id": 5, "updated_at": "2024-01-02T00:00:00Z"}
+        self.get_stream(index).sync(copy.deepcopy(STATE), MagicMock(), ticket)
+
+        # An earlier start date
+        stream = self.get_stream(index, start_date="2023-01-01T00:00:00Z")
+        stream.sync(copy.deepcopy(STATE), MagicMock(), ticket)
+        self.assertEqual(stream.get_records.call_count, 1)
+
+        # The state was cleared
+        stream = self.get_stream(index)
+        stream.reset_sync_index({})
+        stream.sync({}, MagicMock(), ticket)
+        stream.sync(copy.deepcopy(STATE), MagicMock(), ticket)
+        self.assertEqual(stream.get_records.call_count, 2)
+
+        # The tickets bookmark moved on
+        stream = self.get_stream(index)
+        moved = copy.deepcopy(STATE)
+        moved["bookmarks"]["tickets"]["updated_at"] = "2024-01-02T00:00:00Z"
+        stream.sync(moved, MagicMock(), ticket)
+        self.assertEqual(stream.get_records.call_count, 1)
+        index.close()
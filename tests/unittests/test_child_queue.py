@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from tap_freshdesk.child_queue import ChildStage, ChildWorkQueue
+
+
+class TestChildWorkQueue(unittest.TestCase):
+    """Test cases for ChildWorkQueue and ChildStage"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "queue.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unfinished_items_survive_a_reopen(self):
+        work_queue = ChildWorkQueue(self.path)
+        first = work_queue.push("conversations", 1, "2024-01-01T00:00:00Z", "")
+        work_queue.push("time_entries", 2, "2024-01-02T00:00:00Z", "_spam")
+        work_queue.done(first)
+        work_queue.close()
+
+        work_queue = ChildWorkQueue(self.path)
+        pending = work_queue.pending()
+        self.assertEqual(
+            [item[1:] for item in pending],
+            [("time_entries", 2, "2024-01-02T00:00:00Z", "_spam", None)],
+        )
+        self.assertEqual(work_queue.stats()["child_queue_depth"], 1)
+        work_queue.close()
+
+    def test_stage_emits_in_queue_order_and_resumes(self):
+        work_queue = ChildWorkQueue(self.path)
+        work_queue.push("conversations", 9, "2024-01-01T00:00:00Z", "_deleted")
+        child = MagicMock(tap_stream_id="conversations")
+        child.fetch.side_effect = lambda parent_obj: [{"parent": parent_obj["id"]}]
+        emitted = []
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            stage = ChildStage(
+                work_queue,
+                executor,
+                lambda child, parent_obj, records, cutoff: emitted.append((parent_obj, records)),
+                max_pending=2,
+            )
+            self.assertEqual(stage.resume({"conversations": child}), 1)
+            for parent_id in range(1, 4):
+                stage.push(child, {"id": parent_id, "updated_at": "2024-01-02T00:00:00Z"}, "")
+            stage.drain()
+
+        self.assertEqual([records[0]["parent"] for _, records in emitted], [9, 1, 2, 3])
+        self.assertEqual(emitted[0][0]["filter"], "deleted")
+        self.assertEqual(work_queue.pending(), [])
+        work_queue.close()
+
+    def test_resume_drops_items_of_unselected_streams(self):
+        work_queue = ChildWorkQueue(self.path)
+        work_queue.push("time_entries", 1, "2024-01-01T00:00:00Z", "")
+        stage = ChildStage(work_queue, MagicMock(), MagicMock())
+        self.assertEqual(stage.resume({}), 0)
+        self.assertEqual(work_queue.pending(), [])
+        work_queue.close()
+
+    def test_relisted_parents_of_resumed_items_are_not_fetched_again(self):
+        work_queue = ChildWorkQueue(self.path)
+        work_queue.push("conversations", 1, "2024-01-01T00:00:00Z", "")
+        work_queue.push("conversations", 2, "2024-01-01T00:00:00Z", "")
+        child = MagicMock(tap_stream_id="conversations")
+        child.fetch.return_value = []
+        emit = MagicMock()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            stage = ChildStage(work_queue, executor, emit)
+            stage.resume({"conversations": child})
+            # The failed pass is listed again from the same bookmark
+            for parent_id in range(1, 4):
+                stage.push(child, {"id": parent_id, "updated_at": "2024-01-01T00:00:00Z"}, "")
+            stage.drain()
+
+        fetched = [call.args[0]["id"] for call in child.fetch.call_args_list]
+        self.assertEqual(sorted(fetched), [1, 2, 3])
+        self.assertEqual(emit.call_count, 3)
+        self.assertEqual(work_queue.pending(), [])
+        work_queue.close()
+
+    def test_resumed_items_keep_their_cutoff(self):
+        work_queue = ChildWorkQueue(self.path)
+        work_queue.push("conversations", 1, "2024-01-01T00:00:00Z", "", "2023-12-01T00:00:00Z")
+        child = MagicMock(tap_stream_id="conversations")
+        child.fetch.return_value = []
+        emit = MagicMock()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            stage = ChildStage(work_queue, executor, emit)
+            stage.resume({"conversations": child})
+            stage.drain()
+
+        self.assertEqual(emit.call_args.args[3], "2023-12-01T00:00:00Z")
+        work_queue.close()
+
+    def test_queue_without_cutoffs_is_upgraded(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            "CREATE TABLE child_work (seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " stream TEXT NOT NULL, parent_id INTEGER NOT NULL,"
+            " parent_updated_at TEXT NOT NULL, category TEXT NOT NULL,"
+            " enqueued_at REAL NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO child_work (stream, parent_id, parent_updated_at, category,"
+            " enqueued_at) VALUES ('conversations', 1, '2024-01-01T00:00:00Z', '', 0)"
+        )
+        connection.commit()
+        connection.close()
+
+        with ChildWorkQueue(self.path) as work_queue:
+            self.assertEqual(
+                [item[1:] for item in work_queue.pending()],
+                [("conversations", 1, "2024-01-01T00:00:00Z", "", None)],
+            )
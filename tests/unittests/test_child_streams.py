@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from helpers import get_response
+from tap_freshdesk.client import Client
+from tap_freshdesk.streams.conversations import Conversations
+from tap_freshdesk.streams.satisfaction_ratings import SatisfactionRatings
+from tap_freshdesk.streams.time_entries import TimeEntries
+
+CUTOFF = "2024-01-10T00:00:00.000000Z"
+
+
+@patch("tap_freshdesk.streams.abstracts.metadata.to_map", MagicMock())
+class TestMayHaveChanged(unittest.TestCase):
+    """Test cases for the activity checks of the child streams"""
+
+    def test_conversations_follow_reply_timestamps(self):
+        client = MagicMock(config={"skip_conversations_without_replies": True})
+        stream = Conversations(client, MagicMock())
+        replied = {"stats": {"agent_responded_at": "2024-01-11T08:00:00Z"}}
+        stale = {
+            "stats": {
+                "agent_responded_at": "2024-01-02T08:00:00Z",
+                "requester_responded_at": None,
+                "closed_at": "2024-01-12T00:00:00Z",
+            }
+        }
+        self.assertTrue(stream.may_have_changed(replied, CUTOFF))
+        self.assertFalse(stream.may_have_changed(stale, CUTOFF))
+        self.assertFalse(stream.may_have_changed({"stats": {}}, CUTOFF))
+        # Without stats the ticket is always fetched
+        self.assertTrue(stream.may_have_changed({"id": 1}, CUTOFF))
+
+    def test_conversations_are_fetched_unless_the_lossy_check_is_allowed(self):
+        stream = Conversations(MagicMock(config={}), MagicMock())
+        stale = {"stats": {"agent_responded_at": "2024-01-02T08:00:00Z"}}
+        # Private notes and edits do not move the reply timestamps
+        self.assertTrue(stream.may_have_changed(stale, CUTOFF))
+
+    def test_conversations_only_need_stats_with_their_flag(self):
+        self.assertEqual(Conversations(MagicMock(config={}), MagicMock()).get_parent_includes(), ())
+        stream = Conversations(
+            MagicMock(config={"skip_conversations_without_replies": True}), MagicMock()
+        )
+        self.assertEqual(stream.get_parent_includes(), ("stats",))
+        ratings = SatisfactionRatings(MagicMock(config={}), MagicMock())
+        self.assertEqual(ratings.get_parent_includes(), ("stats",))
+
+    def test_satisfaction_ratings_need_a_reply_or_resolution(self):
+        stream = SatisfactionRatings(MagicMock(), MagicMock())
+        self.assertFalse(stream.may_have_changed({"status": 2, "stats": {}}, CUTOFF))
+        self.assertTrue(stream.may_have_changed({"status": 4, "stats": {}}, CUTOFF))
+        self.assertTrue(
+            stream.may_have_changed(
+                {"status": 2, "stats": {"agent_responded_at": "2023-01-01T00:00:00Z"}}, CUTOFF
+            )
+        )
+
+    def test_time_entries_are_always_fetched(self):
+        stream = TimeEntries(MagicMock(), MagicMock())
+        self.assertTrue(stream.may_have_changed({"stats": {}}, CUTOFF))
+
+
+@patch("tap_freshdesk.streams.abstracts.metadata.to_map", MagicMock())
+class TestChildFetch(unittest.TestCase):
+    """Test cases for ChildBaseStream.fetch with the request memo"""
+
+    def test_children_are_memoized_per_ticket_version(self):
+        client = Client(
+            {"api_key": "key", "domain": "test", "start_date": CUTOFF, "request_memo_size": 10}
+        )
+        client._session = MagicMock()
+        client._session.request.side_effect = [get_response(200, [{"id": 1}]) for _ in range(2)]
+        stream = Conversations(client, MagicMock())
+        ticket = {"id": 7, "updated_at": "2024-01-11T00:00:00Z"}
+
+        stream.fetch(ticket)
+        stream.fetch(dict(ticket))
+        self.assertEqual(client._session.request.call_count, 1)
+
+        stream.fetch({**ticket, "updated_at": "2024-01-12T00:00:00Z"})
+        self.assertEqual(client._session.request.call_count, 2)
@@ -0,0 +1,106 @@
+import io
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from helpers import get_response
+from tap_freshdesk.client import Client, raise_for_error
+from tap_freshdesk.exceptions import freshdeskNotFoundError, freshdeskRateLimitError
+
+CONFIG = {"api_key": "key", "domain": "test", "start_date": "2024-01-01T00:00:00Z"}
+
+
+class TestRaiseForError(unittest.TestCase):
+    """Test cases for raise_for_error"""
+
+    def test_success_body_is_not_decoded(self):
+        response = MagicMock(status_code=200)
+        raise_for_error(response)
+        response.json.assert_not_called()
+
+    def test_error_message_from_body(self):
+        response = get_response(404, {"message": "Ticket not found"})
+        with self.assertRaises(freshdeskNotFoundError) as err:
+            raise_for_error(response)
+        self.assertEqual(err.exception.message, "HTTP-error-code: 404, Error: Ticket not found")
+
+    def test_error_message_from_mapping(self):
+        response = get_response(404)
+        with self.assertRaises(freshdeskNotFoundError) as err:
+            raise_for_error(response)
+        self.assertIn("cannot be found", err.exception.message)
+
+
+class TestClientGet(unittest.TestCase):
+    """Test cases for Client.get"""
+
+    def setUp(self):
+        self.client = Client(CONFIG)
+        self.client._session = MagicMock(headers=self.client._session.headers)
+
+    def test_body_is_decoded_once(self):
+        self.client._session.request.return_value = get_response(200, [{"id": 1}])
+        self.client.decode_json = MagicMock(wraps=self.client.decode_json)
+
+        result = self.client.get("https://test.freshdesk.com/api/v2/tickets", {}, {})
+
+        self.assertEqual(result, [{"id": 1}])
+        self.client.decode_json.assert_called_once()
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    @patch("time.sleep")
+    def test_rate_limit_error_is_retried(self, _mock_backoff_sleep, _mock_sleep):
+        self.client._session.request.side_effect = [
+            get_response(429, {}, {"Retry-After": "1"}),
+            get_response(200, [{"id": 1}]),
+        ]
+        result = self.client.get("https://test.freshdesk.com/api/v2/tickets", {}, {})
+        self.assertEqual(result, [{"id": 1}])
+        self.assertEqual(self.client._session.request.call_count, 2)
+
+        summary = self.client.request_stats.summary()["tickets"]
+        self.assertEqual(summary["status_codes"], {200: 1, 429: 1})
+        self.assertEqual(summary["retries"], 1)
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    @patch("time.sleep")
+    def test_rate_limit_error_raised_after_max_tries(self, _mock_backoff_sleep, _mock_sleep):
+        self.client._session.request.return_value = get_response(429, {})
+        with self.assertRaises(freshdeskRateLimitError):
+            self.client.get("https://test.freshdesk.com/api/v2/tickets", {}, {})
+        self.assertEqual(self.client._session.request.call_count, 5)
+
+    def test_unknown_json_decoder(self):
+        with self.assertRaises(ValueError):
+            Client({**CONFIG, "json_decoder": "unknown"})
+
+    def test_stream_page_streams_the_body(self):
+        response = get_response(200)
+        response.raw = io.BytesIO(json.dumps([{"id": 1}, {"id": 2}]).encode("utf-8"))
+        self.client._session.request.return_value = response
+
+        page = self.client.stream_page("https://test.freshdesk.com/api/v2/tickets", {}, {})
+
+        self.assertEqual(list(page.records), [{"id": 1}, {"id": 2}])
+        self.assertTrue(self.client._session.request.call_args.kwargs["stream"])
+
+    def test_compression_is_negotiated_and_accounted(self):
+        self.assertIn("gzip", self.client._session.headers["Accept-Encoding"])
+        self.client._session.request.return_value = get_response(200, [{"id": 1}])
+
+        self.client.get("https://test.freshdesk.com/api/v2/tickets/7/conversations", {}, {})
+
+        self.assertEqual(
+            self.client.transfer_stats.totals(["tickets/{}/conversations"])["decoded_bytes"],
+            len(b'[{"id": 1}]'),
+        )
+
+    def test_get_page_reads_next_link(self):
+        self.client._session.request.return_value = get_response(
+            200,
+            [{"id": 1}],
+            {"Link": '<https://test.freshdesk.com/api/v2/tickets?page=2>; rel="next"'},
+        )
+        page = self.client.get_page("https://test.freshdesk.com/api/v2/tickets", {}, {})
+        self.assertEqual(page.records, [{"id": 1}])
+        self.assertEqual(page.next_url, "https://test.freshdesk.com/api/v2/tickets?page=2")
@@ -0,0 +1,79 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tap_freshdesk.concurrency import BackgroundIterator, imap_ordered
+
+
+class TestBackgroundIterator(unittest.TestCase):
+    """Test cases for BackgroundIterator"""
+
+    def test_items_are_produced_by_the_worker(self):
+        threads = set()
+
+        def produce():
+            for item in range(5):
+                threads.add(threading.current_thread().name)
+                yield item
+
+        iterator = BackgroundIterator(produce, maxsize=2)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="worker") as executor:
+            iterator.submit(executor)
+            self.assertEqual(list(iterator), [0, 1, 2, 3, 4])
+        self.assertTrue(all(name.startswith("worker") for name in threads))
+
+    def test_unclaimed_iterator_runs_inline(self):
+        iterator = BackgroundIterator(lambda: iter([1, 2]), maxsize=1)
+        self.assertEqual(list(iterator), [1, 2])
+
+    def test_worker_error_is_raised_to_consumer(self):
+        def produce():
+            yield 1
+            raise ValueError("boom")
+
+        iterator = BackgroundIterator(produce, maxsize=1)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            iterator.submit(executor)
+            with self.assertRaises(ValueError):
+                list(iterator)
+
+    def test_close_stops_a_blocked_worker(self):
+        iterator = BackgroundIterator(lambda: iter(range(100)), maxsize=1)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            iterator.submit(executor)
+            self.assertEqual(next(iter(iterator)), 0)
+            iterator.close()
+        # Leaving the executor block means the worker returned
+
+
+class TestImapOrdered(unittest.TestCase):
+    """Test cases for imap_ordered"""
+
+    def test_results_keep_input_order(self):
+        def slow_square(item):
+            time.sleep(0.01 * (5 - item))
+            return item * item
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(imap_ordered(slow_square, range(5), executor, window=4))
+        self.assertEqual(results, [(i, i * i) for i in range(5)])
+
+    def test_calls_are_bounded_by_window(self):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def track(item):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return item
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(imap_ordered(track, range(20), executor, window=3))
+        self.assertLessEqual(peak[0], 3)
+
+    def test_runs_inline_without_executor(self):
+        self.assertEqual(list(imap_ordered(str, [1, 2])), [(1, "1"), (2, "2")])
@@ -0,0 +1,74 @@
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tap_freshdesk.client import Client
+from tap_freshdesk.connection_pool import get_keepalive_socket_options
+
+CONFIG = {"api_key": "key", "domain": "test", "start_date": "2024-01-01T00:00:00Z"}
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test cases for the pooled requests session"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), JsonHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_pool_size_from_config(self):
+        client = Client({**CONFIG, "pool_maxsize": 25, "pool_connections": 3})
+        self.assertEqual(client._adapter._pool_maxsize, 25)
+        self.assertEqual(client._adapter._pool_connections, 3)
+
+    def test_pool_size_from_concurrency(self):
+        self.assertEqual(Client(CONFIG)._adapter._pool_maxsize, 10)
+        client = Client(
+            {
+                **CONFIG,
+                "concurrent_ticket_filters": True,
+                "ticket_shards": 4,
+                "child_fetch_concurrency": 8,
+            }
+        )
+        # 5 request workers, 3 listings of 5 shard threads, 8 child threads
+        self.assertEqual(client._adapter._pool_maxsize, 28)
+
+    def test_connections_are_reused(self):
+        client = Client(CONFIG)
+        for page in range(3):
+            client.get(f"{self.url}/tickets", {"page": page}, {})
+        self.assertEqual(client._adapter.connection_stats(), {"new": 1, "reused": 2})
+
+    def test_prewarmed_connections_are_reused(self):
+        client = Client({**CONFIG, "prewarm_connections": 2})
+        client.base_url = self.url
+        client.prewarm_connections()
+        client.get(f"{self.url}/tickets", {}, {})
+        self.assertEqual(client._adapter.connection_stats(), {"new": 2, "reused": 0})
+
+    def test_keepalive_socket_options(self):
+        options = get_keepalive_socket_options(60)
+        self.assertIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), options)
+        client = Client({**CONFIG, "tcp_keepalive_idle": 60})
+        self.assertEqual(client._adapter.socket_options, options)
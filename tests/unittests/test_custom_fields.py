@@ -0,0 +1,135 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from singer import Transformer, metadata
+
+from tap_freshdesk.custom_fields import (
+    CustomFieldCache,
+    get_custom_field_table,
+    get_field_definitions,
+)
+from tap_freshdesk.schema import get_schemas
+from tap_freshdesk.streams.tickets import Tickets
+from tap_freshdesk.transform import RecordTransform
+
+TICKET_FIELDS = [
+    {"name": "requester", "type": "default_requester", "default": True},
+    {"name": "cf_escalated", "type": "custom_checkbox", "default": False},
+    {"name": "cf_units", "type": "custom_number", "default": False},
+    {"name": "cf_cost", "type": "custom_decimal", "default": False},
+    {"name": "cf_due", "type": "custom_date", "default": False},
+    {
+        "name": "cf_region",
+        "type": "nested_field",
+        "default": False,
+        "nested_ticket_fields": [{"name": "cf_country", "level": 2}],
+    },
+]
+
+CONTACT_FIELDS = [{"name": "department", "type": "custom_text", "default": False}]
+
+
+class TestTypedCustomFields(unittest.TestCase):
+    """Test cases for the typed custom field properties"""
+
+    def setUp(self):
+        schemas, field_metadata = get_schemas(
+            {"tickets": TICKET_FIELDS, "contacts": CONTACT_FIELDS}
+        )
+        self.schemas = schemas
+        self.mdata = {name: metadata.to_map(mdata) for name, mdata in field_metadata.items()}
+
+    def test_schema_has_a_property_per_custom_field(self):
+        properties = self.schemas["tickets"]["properties"]
+        self.assertNotIn("custom_fields", properties)
+        self.assertEqual(properties["cf_escalated"], {"type": ["null", "boolean"]})
+        self.assertEqual(properties["cf_units"], {"type": ["null", "integer"]})
+        self.assertEqual(properties["cf_cost"], {"type": ["null", "number"]})
+        self.assertEqual(properties["cf_due"]["format"], "date-time")
+        self.assertEqual(properties["cf_country"], {"type": ["null", "string"]})
+        self.assertIn("cf_department", self.schemas["contacts"]["properties"])
+        self.assertIn("custom_fields", self.schemas["companies"]["properties"])
+
+    def test_table_follows_selection(self):
+        mdata = self.mdata["tickets"]
+        mdata[("properties", "cf_cost")]["selected"] = False
+        table = dict(get_custom_field_table(mdata))
+        self.assertEqual(table["cf_units"], "cf_units")
+        self.assertNotIn("cf_cost", table)
+        self.assertEqual(get_custom_field_table(self.mdata["contacts"]), [("department", "cf_department")])
+        self.assertIsNone(get_custom_field_table(self.mdata["companies"]))
+
+    def test_custom_fields_are_flattened_and_typed(self):
+        catalog = MagicMock()
+        catalog.schema.to_dict.return_value = self.schemas["tickets"]
+        catalog.metadata = metadata.to_list(self.mdata["tickets"])
+        stream = Tickets(client=MagicMock(), catalog=catalog)
+        record = {
+            "id": 1,
+            "updated_at": "2024-01-02T00:00:00Z",
+            "custom_fields": {
+                "cf_escalated": True,
+                "cf_units": "3",
+                "cf_cost": 1.5,
+                "cf_due": "2024-01-05",
+                "cf_region": "EMEA",
+                "cf_retired": "dropped",
+            },
+        }
+
+        [record] = stream.modify_page_custom_fields([record])
+        transformed = RecordTransform(stream.schema, stream.metadata)(Transformer(), record)
+
+        self.assertNotIn("custom_fields", transformed)
+        self.assertTrue(transformed["cf_escalated"])
+        self.assertEqual(transformed["cf_units"], 3)
+        self.assertEqual(transformed["cf_cost"], 1.5)
+        self.assertEqual(transformed["cf_due"], "2024-01-05T00:00:00.000000Z")
+        self.assertEqual(transformed["cf_region"], "EMEA")
+        self.assertIsNone(transformed["cf_country"])
+        self.assertNotIn("cf_retired", transformed)
+
+
+class TestFieldDefinitions(unittest.TestCase):
+    """Test cases for get_field_definitions and CustomFieldCache"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fields", "custom_fields.json")
+        self.client = MagicMock(
+            config={"custom_fields_cache": self.path},
+            base_url="https://first.freshdesk.com/api/v2",
+        )
+        self.client.get.side_effect = [TICKET_FIELDS, CONTACT_FIELDS, []]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_definitions_are_cached(self):
+        definitions = get_field_definitions(self.client)
+        self.assertEqual(definitions["tickets"], TICKET_FIELDS)
+        self.assertEqual(self.client.get.call_count, 3)
+
+        self.assertEqual(get_field_definitions(self.client), definitions)
+        self.assertEqual(self.client.get.call_count, 3)
+
+    def test_expired_definitions_are_listed_again(self):
+        CustomFieldCache(self.path).put(self.client.base_url, {"tickets": []})
+        with patch("tap_freshdesk.custom_fields.time.time", return_value=time.time() + 2 * 86400):
+            definitions = get_field_definitions(self.client)
+        self.assertEqual(definitions["contacts"], CONTACT_FIELDS)
+
+    def test_definitions_are_cached_per_account(self):
+        get_field_definitions(self.client)
+        other = MagicMock(
+            config=self.client.config, base_url="https://second.freshdesk.com/api/v2"
+        )
+        other.get.side_effect = [[], CONTACT_FIELDS, []]
+
+        self.assertEqual(get_field_definitions(other)["tickets"], [])
+        self.assertEqual(other.get.call_count, 3)
+        self.assertEqual(get_field_definitions(self.client)["tickets"], TICKET_FIELDS)
+        self.assertEqual(self.client.get.call_count, 3)
@@ -0,0 +1,53 @@
+import json
+import unittest
+
+from tap_freshdesk.decoding import get_json_decoder, iter_json_array
+
+RECORDS = [
+    {"id": 1, "subject": "Crème brûlée ✓", "tags": ["a", "b"], "stats": {"closed_at": None}},
+    {"id": 2, "subject": "commas, [brackets] and \"quotes\"", "custom_fields": {}},
+    {"id": 3, "count": 12345, "nested": [[1, 2], {"x": "]"}]},
+]
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Test cases for iter_json_array"""
+
+    def test_every_chunk_size(self):
+        body = json.dumps(RECORDS, ensure_ascii=False).encode("utf-8")
+        for size in range(1, len(body) + 1):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_json_array(chunked(body, size))), RECORDS)
+
+    def test_scalars_split_across_chunks(self):
+        self.assertEqual(list(iter_json_array([b"[12", b"34, 5", b"6 ]"])), [1234, 56])
+
+    def test_whitespace_and_empty_array(self):
+        self.assertEqual(list(iter_json_array([b" \n[ ", b" ]\n"])), [])
+
+    def test_records_are_yielded_before_the_body_ends(self):
+        records = iter_json_array(iter([b'[{"id": 1},', b'{"id"']))
+        self.assertEqual(next(records), {"id": 1})
+
+    def test_truncated_body(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[{"id": 1}, {"id": 2']))
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"id": 1}']))
+
+
+class TestGetJsonDecoder(unittest.TestCase):
+    """Test cases for get_json_decoder"""
+
+    def test_stdlib_decoder(self):
+        self.assertEqual(get_json_decoder("json")(b'[{"id": 1}]'), [{"id": 1}])
+
+    def test_unknown_decoder(self):
+        with self.assertRaises(ValueError):
+            get_json_decoder("simdjson")
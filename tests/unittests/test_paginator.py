@@ -0,0 +1,88 @@
+import unittest
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+
+from tap_freshdesk.client import Page
+from tap_freshdesk.paginator import Paginator
+from tap_freshdesk.telemetry import PaginationStats
+
+BASE_URL = "https://test.freshdesk.com/api/v2"
+URL = f"{BASE_URL}/tickets"
+NEXT = f"{URL}?page=next"
+
+
+class TestPaginator(unittest.TestCase):
+    """Test cases for Paginator"""
+
+    def setUp(self):
+        self.pages = {}
+        self.client = MagicMock(
+            base_url=BASE_URL,
+            response_cache=None,
+            stream_records=False,
+            prefetch_pages=0,
+            pagination_stats=PaginationStats(),
+        )
+        self.client.get_page.side_effect = self.get_page
+        self.client.submit.side_effect = self.submit
+
+    def get_page(self, url, params, *args, **kwargs):
+        return self.pages.get(params["page"], Page([]))
+
+    def submit(self, url, params, *args, **kwargs):
+        future = Future()
+        future.set_result(self.get_page(url, params))
+        return future
+
+    def paginate(self):
+        paginator = Paginator(self.client, URL, {"page": 1}, {}, "tickets", page_size=2)
+        return [record["id"] for record in paginator]
+
+    def requested_pages(self, method):
+        return [call.args[1]["page"] for call in method.call_args_list]
+
+    def test_stops_at_short_page(self):
+        self.pages = {1: Page([{"id": 1}, {"id": 2}]), 2: Page([{"id": 3}])}
+        self.assertEqual(self.paginate(), [1, 2, 3])
+        self.assertEqual(self.requested_pages(self.client.get_page), [1, 2])
+
+    def test_full_last_page_without_links_requests_empty_page(self):
+        self.pages = {1: Page([{"id": 1}, {"id": 2}])}
+        self.assertEqual(self.paginate(), [1, 2])
+        self.assertEqual(self.requested_pages(self.client.get_page), [1, 2])
+
+    def test_missing_next_link_ends_pagination(self):
+        self.pages = {
+            1: Page([{"id": 1}, {"id": 2}], NEXT),
+            2: Page([{"id": 3}, {"id": 4}]),
+        }
+        self.assertEqual(self.paginate(), [1, 2, 3, 4])
+        self.assertEqual(self.requested_pages(self.client.get_page), [1, 2])
+        self.assertEqual(
+            self.client.pagination_stats.log_stream_totals("tickets", ["tickets"]),
+            {"pages_fetched": 2, "empty_pages_avoided": 1},
+        )
+
+    def test_prefetch_keeps_order_and_cancels_extra_requests(self):
+        self.client.prefetch_pages = 2
+        self.pages = {
+            1: Page([{"id": 1}, {"id": 2}]),
+            2: Page([{"id": 3}, {"id": 4}]),
+            3: Page([{"id": 5}]),
+        }
+        self.assertEqual(self.paginate(), [1, 2, 3, 4, 5])
+        self.assertEqual(self.requested_pages(self.client.get_page), [1])
+        # At most `prefetch_pages` requests are sent past the last page
+        self.assertEqual(self.requested_pages(self.client.submit), [2, 3, 4, 5])
+
+    def test_single_page_listing_is_not_prefetched(self):
+        self.client.prefetch_pages = 2
+        self.pages = {1: Page([{"id": 1}])}
+        self.assertEqual(self.paginate(), [1])
+        self.assertEqual(self.client.get_page.call_count + self.client.submit.call_count, 1)
+
+    def test_stream_records(self):
+        self.client.stream_records = True
+        self.client.stream_page.return_value = Page(iter([{"id": 1}]))
+        self.assertEqual(self.paginate(), [1])
+        self.client.get_page.assert_not_called()
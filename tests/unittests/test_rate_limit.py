@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from helpers import get_response
+from tap_freshdesk.rate_limit import (
+    RateLimitGovernor,
+    SharedTokenBucket,
+    get_shared_rate_limiter,
+    parse_retry_after,
+)
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    """Test cases for parse_retry_after"""
+
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after("30"), 30.0)
+
+    def test_missing(self):
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_invalid(self):
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_http_date_in_the_past(self):
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+
+class TestRateLimitGovernor(unittest.TestCase):
+    """Test cases for RateLimitGovernor"""
+
+    def setUp(self):
+        self.governor = RateLimitGovernor(window=60, reserve_ratio=0.1)
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    def test_no_wait_without_headers(self, mock_sleep):
+        self.assertEqual(self.governor.wait(), 0)
+        self.assertEqual(self.governor.wait(), 0)
+        mock_sleep.assert_not_called()
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    def test_no_wait_above_reserve(self, mock_sleep):
+        self.governor.update(
+            get_response(headers={"X-RateLimit-Total": "600", "X-RateLimit-Remaining": "500"})
+        )
+        self.governor.wait()
+        self.governor.wait()
+        mock_sleep.assert_not_called()
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    def test_paces_at_plan_rate_below_reserve(self, mock_sleep):
+        self.governor.update(
+            get_response(headers={"X-RateLimit-Total": "600", "X-RateLimit-Remaining": "20"})
+        )
+        self.governor.wait()
+        delay = self.governor.wait()
+        self.assertAlmostEqual(delay, 0.1, places=2)
+        self.assertEqual(self.governor.throttled_counter.value, 1)
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    def test_waits_for_reserve_when_exhausted(self, mock_sleep):
+        self.governor.update(
+            get_response(headers={"X-RateLimit-Total": "600", "X-RateLimit-Remaining": "0"})
+        )
+        self.governor.wait()
+        delay = self.governor.wait()
+        self.assertAlmostEqual(delay, 6.0, places=1)
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    def test_retry_after_blocks_requests(self, mock_sleep):
+        self.governor.update(get_response(headers={"Retry-After": "15"}))
+        delay = self.governor.wait()
+        self.assertAlmostEqual(delay, 15, places=1)
+        self.assertEqual(self.governor.retry_after_counter.value, 1)
+
+
+class TestSharedTokenBucket(unittest.TestCase):
+    """Test cases for SharedTokenBucket"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "freshdesk.bucket")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    def test_burst_is_served_without_waiting(self, mock_sleep):
+        bucket = SharedTokenBucket(self.path, 600)
+        for _ in range(60):
+            self.assertEqual(bucket.acquire(), 0)
+        mock_sleep.assert_not_called()
+
+    @patch("tap_freshdesk.rate_limit.time.sleep")
+    @patch("tap_freshdesk.rate_limit.time.time")
+    def test_budget_is_shared_between_buckets(self, mock_time, mock_sleep):
+        clock = [1000.0]
+        mock_time.side_effect = lambda: clock[0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        mock_sleep.side_effect = sleep
+
+        first = SharedTokenBucket(self.path, 600)
+        second = SharedTokenBucket(self.path, 600)
+        for _ in range(30):
+            first.acquire()
+            second.acquire()
+        mock_sleep.assert_not_called()
+
+        waited = second.acquire()
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(waited, 60 / 540)
+
+    def test_get_shared_rate_limiter_requires_rate(self):
+        with self.assertRaises(ValueError):
+            get_shared_rate_limiter({"rate_limit_file": self.path})
+
+    def test_get_shared_rate_limiter_disabled(self):
+        self.assertIsNone(get_shared_rate_limiter({}))
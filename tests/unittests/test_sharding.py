@@ -0,0 +1,124 @@
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from singer.utils import strptime_to_utc
+
+from tap_freshdesk.client import Page
+from tap_freshdesk.paginator import Paginator
+from tap_freshdesk.sharding import ShardedListing
+from tap_freshdesk.telemetry import PaginationStats
+from tap_freshdesk.utils import strftime
+
+BASE_URL = "https://test.freshdesk.com/api/v2"
+START = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=10)
+
+
+class FakeTicketsClient:
+    """Serves `records` like the tickets listing ordered by `updated_at`."""
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda r: (r["updated_at"], r["id"]))
+        self.base_url = BASE_URL
+        self.stream_records = False
+        self.prefetch_pages = 0
+        self.response_cache = None
+        self.pagination_stats = PaginationStats()
+        self.lock = threading.Lock()
+        self.requests = []
+
+    def get_page(self, url, params, headers, path=None, use_cache=False, memo_version=None):
+        with self.lock:
+            self.requests.append(params)
+        since = params["updated_since"]
+        matching = [r for r in self.records if r["updated_at"] >= since]
+        offset = (params["page"] - 1) * params["per_page"]
+        return Page([dict(r) for r in matching[offset:offset + params["per_page"]]])
+
+
+def make_records(timestamps):
+    return [
+        {"id": index, "updated_at": strftime(timestamp)}
+        for index, timestamp in enumerate(timestamps)
+    ]
+
+
+class TestShardedListing(unittest.TestCase):
+    """Test cases for ShardedListing"""
+
+    def list_records(self, records, shards, **kwargs):
+        client = FakeTicketsClient(records)
+        stream = MagicMock(
+            client=client,
+            page_size=10,
+            replication_keys=["updated_at"],
+            paginator_class=Paginator,
+            headers={},
+            path="tickets",
+            tap_stream_id="tickets",
+        )
+        listing = ShardedListing(
+            stream, f"{BASE_URL}/tickets", {"order_type": "asc"}, strftime(START), shards, **kwargs
+        )
+        return listing, [record["id"] for record in listing], client
+
+    def expected_ids(self, records):
+        return [r["id"] for r in sorted(records, key=lambda r: (r["updated_at"], r["id"]))]
+
+    def test_shards_merge_in_listing_order(self):
+        records = make_records(START + timedelta(hours=2 * i) for i in range(100))
+        listing, ids, _client = self.list_records(records, shards=4, workers=3)
+
+        self.assertEqual(len(listing.shards), 4)
+        self.assertEqual(ids, self.expected_ids(records))
+
+    def test_dense_shard_is_split(self):
+        # Most records are updated within the first hour of the window
+        timestamps = [START + timedelta(seconds=10 * i) for i in range(300)]
+        timestamps += [START + timedelta(days=5 + i) for i in range(3)]
+        records = make_records(timestamps)
+        listing, ids, _client = self.list_records(records, shards=2, max_records=50, workers=4)
+
+        self.assertGreater(len(listing.shards), 2)
+        starts = [shard.start for shard in listing.shards]
+        self.assertEqual(starts, sorted(starts))
+        self.assertEqual(ids, self.expected_ids(records))
+
+    @patch("tap_freshdesk.sharding.MAX_LIST_PAGES", 2)
+    def test_deep_listing_is_restarted_without_duplicates(self):
+        # Records share timestamps across the page boundaries
+        records = make_records(START + timedelta(minutes=i // 3) for i in range(75))
+        _listing, ids, client = self.list_records(records, shards=1)
+
+        self.assertEqual(ids, self.expected_ids(records))
+        self.assertGreater(
+            len({params["updated_since"] for params in client.requests}), 1
+        )
+
+    def test_errors_are_raised_to_the_consumer(self):
+        records = make_records(START + timedelta(hours=i) for i in range(50))
+        client = FakeTicketsClient(records)
+        client.get_page = MagicMock(side_effect=ValueError("boom"))
+        stream = MagicMock(
+            client=client, page_size=10, replication_keys=["updated_at"],
+            paginator_class=Paginator, headers={}, path="tickets",
+        )
+        listing = ShardedListing(stream, f"{BASE_URL}/tickets", {}, strftime(START), 3, workers=2)
+        with self.assertRaises(ValueError):
+            list(listing)
+
+
+class TestShardPlan(unittest.TestCase):
+    """Test cases for ShardedListing.plan"""
+
+    def test_windows_cover_the_range(self):
+        stream = MagicMock(replication_keys=["updated_at"])
+        listing = ShardedListing(stream, "", {}, strftime(START), 5)
+        shards = listing.plan(START, 5)
+
+        self.assertEqual(shards[0].start, START)
+        self.assertIsNone(shards[-1].end)
+        for previous, shard in zip(shards, shards[1:]):
+            self.assertEqual(previous.end, shard.start)
+        self.assertTrue(all(strptime_to_utc(strftime(s.start)) == s.start for s in shards))
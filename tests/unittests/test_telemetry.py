@@ -0,0 +1,91 @@
+import unittest
+
+from tap_freshdesk.telemetry import (
+    LatencyHistogram,
+    RequestStats,
+    TransferStats,
+    endpoint_template,
+)
+
+BASE_URL = "https://test.freshdesk.com/api/v2"
+
+
+class TestEndpointTemplate(unittest.TestCase):
+    """Test cases for endpoint_template"""
+
+    def test_list_endpoint(self):
+        self.assertEqual(endpoint_template(f"{BASE_URL}/tickets?page=2", BASE_URL), "tickets")
+
+    def test_child_endpoint(self):
+        self.assertEqual(
+            endpoint_template(f"{BASE_URL}/tickets/1234/conversations", BASE_URL),
+            "tickets/{}/conversations",
+        )
+
+    def test_without_base_url(self):
+        self.assertEqual(endpoint_template("/api/v2/tickets/1/time_entries"), "api/v2/tickets/{}/time_entries")
+
+
+class TestTransferStats(unittest.TestCase):
+    """Test cases for TransferStats"""
+
+    def test_totals(self):
+        stats = TransferStats()
+        stats.record("tickets", 100, 400)
+        stats.record("tickets", 50, 200)
+        stats.record("tickets/{}/conversations", 10, 30)
+
+        self.assertEqual(
+            stats.totals(["tickets"]),
+            {"responses": 2, "wire_bytes": 150, "decoded_bytes": 600, "unmeasured_responses": 0},
+        )
+        self.assertEqual(
+            stats.log_stream_totals("conversations", ["tickets/{}/conversations"]),
+            {"responses": 1, "wire_bytes": 10, "decoded_bytes": 30, "unmeasured_responses": 0},
+        )
+
+    def test_unknown_wire_size_is_not_faked(self):
+        stats = TransferStats()
+        stats.record("tickets", 100, 400)
+        stats.record("tickets", None, 200)
+
+        self.assertEqual(
+            stats.log_stream_totals("tickets", ["tickets"]),
+            {"responses": 2, "wire_bytes": 100, "decoded_bytes": 600, "unmeasured_responses": 1},
+        )
+
+    def test_no_responses(self):
+        self.assertIsNone(TransferStats().log_stream_totals("agents", ["agents"]))
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test cases for LatencyHistogram"""
+
+    def test_percentiles_are_within_bucket_precision(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.record(millis / 1000)
+
+        for percent, expected in ((50, 0.5), (95, 0.95), (99, 0.99)):
+            self.assertAlmostEqual(histogram.percentile(percent), expected, delta=expected * 0.1)
+        self.assertEqual(histogram.percentile(100), 1.0)
+
+    def test_empty(self):
+        self.assertEqual(LatencyHistogram().percentile(95), 0.0)
+
+
+class TestRequestStats(unittest.TestCase):
+    """Test cases for RequestStats"""
+
+    def test_summary(self):
+        stats = RequestStats()
+        stats.record_response("tickets/{}/conversations", 200, 0.2, remaining=500, total=1000)
+        stats.record_response("tickets/{}/conversations", 429, 0.1, remaining=0, total=1000)
+        stats.record_retry("tickets/{}/conversations")
+
+        summary = stats.summary()["tickets/{}/conversations"]
+        self.assertEqual(summary["requests"], 2)
+        self.assertEqual(summary["status_codes"], {200: 1, 429: 1})
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(summary["min_rate_limit_headroom"], 0.0)
+        self.assertEqual(len(stats.log_summary()), 1)
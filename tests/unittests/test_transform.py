@@ -0,0 +1,250 @@
+import copy
+import itertools
+import random
+import unittest
+from unittest.mock import MagicMock
+
+from singer import Transformer, metadata, resolve_schema_references
+from singer.transform import SchemaMismatch
+
+from tap_freshdesk.schema import get_schemas, load_schema_references
+from tap_freshdesk.transform import RecordTransform, copy_on_write, get_mutated_paths
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": ["null", "string"]},
+        "tags": {"type": ["null", "array"], "items": {"type": "string"}},
+        "stats": {
+            "type": ["null", "object"],
+            "properties": {
+                "closed_at": {"type": ["null", "string"]},
+                "resolved_at": {"type": ["null", "string"]},
+            },
+        },
+    },
+}
+
+RECORD = {
+    "id": 1,
+    "name": "Contact",
+    "tags": ["vip"],
+    "stats": {"closed_at": None, "resolved_at": "2024-01-02T00:00:00Z"},
+}
+
+
+class TestCopyOnWrite(unittest.TestCase):
+    """Test cases for copy_on_write"""
+
+    def transform(self, mdata):
+        record = copy.deepcopy(RECORD)
+        with Transformer() as transformer:
+            expected = transformer.transform(copy.deepcopy(record), SCHEMA, mdata)
+            actual = transformer.transform(
+                copy_on_write(record, get_mutated_paths(mdata)), SCHEMA, mdata
+            )
+        self.assertEqual(actual, expected)
+        self.assertEqual(record, RECORD)
+        return record
+
+    def test_nothing_deselected_shares_nested_values(self):
+        mdata = {(): {"selected": True}, ("properties", "name"): {"selected": True}}
+        self.assertEqual(get_mutated_paths(mdata), frozenset())
+
+        copied = copy_on_write(RECORD, frozenset())
+        self.assertIsNot(copied, RECORD)
+        self.assertIs(copied["stats"], RECORD["stats"])
+        self.transform(mdata)
+
+    def test_deselected_top_level_field(self):
+        mdata = {(): {"selected": True}, ("properties", "name"): {"selected": False}}
+        self.transform(mdata)
+
+    def test_deselected_nested_field_copies_its_object_only(self):
+        mdata = {
+            (): {"selected": True},
+            ("properties", "stats", "properties", "closed_at"): {"inclusion": "unsupported"},
+        }
+        paths = get_mutated_paths(mdata)
+
+        copied = copy_on_write(RECORD, paths)
+        self.assertIsNot(copied["stats"], RECORD["stats"])
+        self.assertIs(copied["tags"], RECORD["tags"])
+        self.transform(mdata)
+
+    def test_automatic_fields_are_never_removed(self):
+        mdata = {("properties", "id"): {"inclusion": "automatic", "selected": False}}
+        self.assertEqual(get_mutated_paths(mdata), frozenset())
+
+
+def sample_value(rnd, schema, invalid_rate=0.005):
+    """A value for `schema`, in one of the shapes the transformer coerces,
+    and now and then one it rejects."""
+    if rnd.random() < invalid_rate:
+        return rnd.choice(INVALID)
+    if "anyOf" in schema:
+        return sample_value(rnd, rnd.choice(schema["anyOf"]), invalid_rate)
+    if "type" not in schema:
+        return rnd.choice([1, "text", {"a": 1}])
+    types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+    typ = rnd.choice(types)
+    if schema.get("format") == "date-time" and typ != "null":
+        return rnd.choice(DATETIMES)
+    if typ == "object":
+        if not schema.get("properties"):
+            return {"a": 1, "b": [1]}
+        record = {
+            name: sample_value(rnd, subschema, invalid_rate)
+            for name, subschema in schema["properties"].items()
+            if rnd.random() < 0.9
+        }
+        if rnd.random() < 0.2:
+            record["unknown_field"] = "value"
+        return record
+    if typ == "array":
+        return [
+            sample_value(rnd, schema["items"], invalid_rate) for _ in range(rnd.randint(0, 3))
+        ]
+    return rnd.choice(SCALARS[typ])
+
+
+DATETIMES = [
+    "2024-01-02T03:04:05Z",
+    "2024-01-02T03:04:05.123Z",
+    "2024-01-02T03:04:05+00:00",
+    "2024-01-02T03:04:05+05:30",
+    "2024-01-02",
+    "",
+]
+
+SCALARS = {
+    "null": [None, ""],
+    "string": ["text", 12, 1.5, True, ""],
+    "integer": [3, "12", "1,234", 2.7, True],
+    "number": [1.5, 3, "1,234.5"],
+    "boolean": [True, False, "false", "False", "true", 0, None, ""],
+}
+
+INVALID = [{"nested": 1}, ["item"], "garbage", "2024-02-30T00:00:00Z", 1700000000]
+
+
+class TestRecordTransform(unittest.TestCase):
+    """Conformance of RecordTransform with singer.Transformer"""
+
+    RECORDS_PER_CASE = 300
+
+    @classmethod
+    def setUpClass(cls):
+        cls.schemas, cls.field_metadata = get_schemas()
+        refs = load_schema_references()
+        for schema in cls.schemas.values():
+            resolve_schema_references(schema, refs)
+
+    def get_metadata_variants(self, stream_name, rnd):
+        mdata = metadata.to_map(self.field_metadata[stream_name])
+        yield "default", mdata
+
+        deselected = copy.deepcopy(mdata)
+        for breadcrumb, entry in deselected.items():
+            if breadcrumb and rnd.random() < 0.3:
+                entry["selected"] = False
+            elif breadcrumb:
+                entry["selected"] = True
+        yield "deselected", deselected
+
+        nested = copy.deepcopy(mdata)
+        for name, subschema in self.schemas[stream_name]["properties"].items():
+            for field in subschema.get("properties", {}):
+                nested[("properties", name, "properties", field)] = {"inclusion": "unsupported"}
+        yield "nested unsupported", nested
+
+        yield "none", {}
+
+    def assert_conforms(self, schema, mdata, record):
+        original = copy.deepcopy(record)
+        record_transform = RecordTransform(schema, mdata)
+
+        expected_transformer = Transformer()
+        try:
+            expected = expected_transformer.transform(copy.deepcopy(record), schema, mdata)
+        except SchemaMismatch as err:
+            expected = str(err)
+
+        transformer = Transformer()
+        try:
+            actual = record_transform(transformer, record)
+        except SchemaMismatch as err:
+            actual = str(err)
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(transformer.filtered, expected_transformer.filtered)
+        self.assertEqual(transformer.removed, expected_transformer.removed)
+        self.assertEqual(record, original)
+
+    def test_conforms_with_singer_transformer(self):
+        rnd = random.Random(7)
+        self.assertEqual(len(self.schemas), 9)
+        for stream_name, schema in sorted(self.schemas.items()):
+            for label, mdata in self.get_metadata_variants(stream_name, rnd):
+                self.assertIsNotNone(RecordTransform(schema, mdata).convert)
+                with self.subTest(stream=stream_name, metadata=label):
+                    for _ in range(self.RECORDS_PER_CASE):
+                        record = sample_value(rnd, {"type": "object", **schema})
+                        self.assert_conforms(schema, mdata, record)
+
+    def test_pages_conform_with_singer_transformer(self):
+        rnd = random.Random(11)
+        for stream_name, schema in sorted(self.schemas.items()):
+            for label, mdata in self.get_metadata_variants(stream_name, rnd):
+                record_transform = RecordTransform(schema, mdata)
+                self.assertIsNotNone(record_transform.convert_page)
+                with self.subTest(stream=stream_name, metadata=label):
+                    for extra_fields, invalid_rate in itertools.product(
+                        ({}, {"unknown_field": "value"}), (0, 0.005)
+                    ):
+                        # Records listed by the API share their field order
+                        page = [
+                            {
+                                **{
+                                    name: sample_value(rnd, subschema, invalid_rate)
+                                    for name, subschema in schema["properties"].items()
+                                },
+                                **extra_fields,
+                            }
+                            for _ in range(20)
+                        ]
+                        original = copy.deepcopy(page)
+                        expected_transformer = Transformer()
+                        expected = []
+                        try:
+                            for record in copy.deepcopy(page):
+                                expected.append(
+                                    expected_transformer.transform(record, schema, mdata)
+                                )
+                        except SchemaMismatch:
+                            # The messages differ: the transformer keeps the
+                            # errors of every type it tried on earlier records
+                            expected.append(SchemaMismatch)
+
+                        transformer = Transformer()
+                        actual = []
+                        try:
+                            for record in record_transform.transform_page(transformer, page):
+                                actual.append(record)
+                        except SchemaMismatch:
+                            actual.append(SchemaMismatch)
+
+                        self.assertEqual(actual, expected)
+                        self.assertEqual(transformer.filtered, expected_transformer.filtered)
+                        self.assertEqual(transformer.removed, expected_transformer.removed)
+                        self.assertEqual(page, original)
+
+    def test_transformer_options_use_singer_transformer(self):
+        schema = self.schemas["contacts"]
+        record_transform = RecordTransform(schema, {})
+        transformer = Transformer(pre_hook=lambda data, typ, schema: data)
+        transformer.transform = MagicMock(return_value={"id": 1})
+
+        self.assertEqual(record_transform(transformer, {"id": 1}), {"id": 1})
+        transformer.transform.assert_called_once()